@@ -0,0 +1,262 @@
+# async_solver.py
+"""
+API asyncio per risolvere molte interrogazioni SAT indipendenti senza
+bloccare l'event loop.
+
+I job (codifica CNF + risoluzione) girano su processi worker riusati,
+avviati via forkserver (o spawn dove forkserver non esiste): non si esegue
+mai fork dall'interno del loop, dove ci sono thread attivi. Ogni worker
+riceve un job alla volta su una pipe. Allo scadere del timeout, o se il job
+viene cancellato, il worker viene terminato con kill (il solver si ferma
+subito, qualunque sia il backend) e sostituito al job successivo.
+AsyncSolverPool limita i job in esecuzione (max_workers) e i job ammessi in
+totale (max_pending): quando la coda è piena submit() attende, rallentando
+chi produce i job (backpressure).
+
+Esempio:
+    async with AsyncSolverPool(max_workers=4) as pool:
+        results = await asyncio.gather(*(pool.solve(c, fi, fo) for c, fi, fo in jobs))
+"""
+import asyncio
+import multiprocessing as mp
+import os
+from typing import Dict, List, Optional, Tuple
+
+from cardinality import CardinalityConstraint
+from new_circuit_to_cnf import circuit_to_cnf
+from new_ExtendedCircuitgraph import Circuit
+from portfolio import solve_with_backend
+from solver import UNKNOWN
+
+# Pool condiviso usato da solve_async quando non se ne passa uno
+_DEFAULT_POOL: Optional['AsyncSolverPool'] = None
+
+
+def _worker_main(conn) -> None:
+    """
+    Ciclo del processo worker: riceve job (circuito, vincoli, backend) e
+    risponde con (errore, risultato); None chiude il worker.
+    """
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        circuit, fixed_inputs, fixed_outputs, constraints, backend = job
+        try:
+            _, clauses = circuit_to_cnf(circuit, fixed_inputs, fixed_outputs, constraints=constraints)
+            conn.send((None, solve_with_backend(backend, clauses)))
+        except Exception as e:
+            conn.send((repr(e), None))
+    conn.close()
+
+
+async def _wait_readable(conn) -> None:
+    """Attende, senza bloccare l'event loop, che la pipe abbia dati (o sia chiusa)."""
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    fd = conn.fileno()
+    loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+    try:
+        await ready
+    finally:
+        loop.remove_reader(fd)
+
+
+def _mp_context():
+    """forkserver se disponibile, altrimenti spawn: mai fork dal loop."""
+    methods = mp.get_all_start_methods()
+    return mp.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class _Worker:
+    """Processo worker con la sua pipe bidirezionale."""
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def kill(self) -> None:
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Chiusura ordinata di un worker inattivo."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+
+class AsyncSolverPool:
+    """
+    Esecutore asincrono di job SAT su un pool di processi riusati.
+    Attributes:
+        max_workers: numero massimo di job in esecuzione contemporaneamente
+            (e di processi del pool)
+        max_pending: numero massimo di job ammessi (in esecuzione + in attesa)
+        running: job attualmente in esecuzione
+        pending: job ammessi e non ancora terminati
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.max_workers
+        if self.max_pending < self.max_workers:
+            raise ValueError("max_pending deve essere almeno max_workers")
+        self._ctx = _mp_context()
+        self._idle: List[_Worker] = []
+        self._workers: Optional[asyncio.Semaphore] = None
+        self._admission: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+        self.running = 0
+        self.pending = 0
+
+    def _semaphores(self) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        # Creati al primo uso dentro l'event loop che li userà, e ricreati se
+        # il pool viene riusato da un nuovo loop (es. più chiamate asyncio.run)
+        loop = asyncio.get_running_loop()
+        if self._workers is None or self._loop is not loop:
+            self._loop = loop
+            self._workers = asyncio.Semaphore(self.max_workers)
+            self._admission = asyncio.Semaphore(self.max_pending)
+        return self._workers, self._admission
+
+    def _acquire_worker(self) -> _Worker:
+        """Worker inattivo e ancora vivo, oppure uno nuovo."""
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.proc.is_alive():
+                return worker
+            worker.kill()
+        return _Worker(self._ctx)
+
+    async def _run(
+        self,
+        circuit: Circuit,
+        fixed_inputs: Optional[Dict[str, bool]],
+        fixed_outputs: Optional[Dict[str, bool]],
+        constraints: Optional[List[CardinalityConstraint]],
+        backend: str,
+        timeout: Optional[float]
+    ) -> Tuple[Optional[bool], Optional[List[int]]]:
+        workers, _ = self._semaphores()
+        async with workers:
+            worker = self._acquire_worker()
+            self.running += 1
+            reusable = False
+            try:
+                worker.conn.send((circuit, fixed_inputs, fixed_outputs, constraints, backend))
+                try:
+                    await asyncio.wait_for(_wait_readable(worker.conn), timeout)
+                except asyncio.TimeoutError:
+                    return UNKNOWN, None
+                try:
+                    error, result = worker.conn.recv()
+                except EOFError:
+                    raise RuntimeError(f"Il processo del solver è terminato (exit code {worker.proc.exitcode})")
+                reusable = True
+                if error is not None:
+                    raise RuntimeError(f"Errore nel job SAT: {error}")
+                return result
+            finally:
+                # Timeout, cancellazione o errore del processo: il worker viene
+                # terminato subito e sostituito al prossimo job
+                self.running -= 1
+                if reusable:
+                    self._idle.append(worker)
+                else:
+                    worker.kill()
+                    await asyncio.get_running_loop().run_in_executor(None, worker.proc.join)
+
+    async def submit(
+        self,
+        circuit: Circuit,
+        fixed_inputs: Optional[Dict[str, bool]] = None,
+        fixed_outputs: Optional[Dict[str, bool]] = None,
+        constraints: Optional[List[CardinalityConstraint]] = None,
+        backend: str = 'pycosat',
+        timeout: Optional[float] = None
+    ) -> 'asyncio.Task':
+        """
+        Ammette un job e ritorna il Task che lo risolve. Se ci sono già
+        max_pending job attende che uno termini (backpressure).
+        Cancellare il Task termina il processo del job.
+
+        Args:
+            circuit: istanza di Circuit
+            fixed_inputs: mappa wire->bool per fissare alcuni input
+            fixed_outputs: mappa wire->bool per fissare alcuni output
+            constraints: vincoli di cardinalità/pseudo-booleani sui wire
+            backend: 'pycosat' oppure un nome di solver pysat
+            timeout: tempo massimo in secondi del solo job, attesa esclusa
+        Returns:
+            Task il cui risultato è (is_sat, model) come in is_satisfiable
+            (is_sat = UNKNOWN allo scadere del timeout)
+        """
+        _, admission = self._semaphores()
+        await admission.acquire()
+        self.pending += 1
+        task = asyncio.ensure_future(
+            self._run(circuit, fixed_inputs, fixed_outputs, constraints, backend, timeout)
+        )
+        self._tasks.add(task)
+
+        def done(t: 'asyncio.Task') -> None:
+            self._tasks.discard(t)
+            self.pending -= 1
+            admission.release()
+
+        task.add_done_callback(done)
+        return task
+
+    async def solve(self, *args, **kwargs) -> Tuple[Optional[bool], Optional[List[int]]]:
+        """Come submit, ma attende direttamente il risultato."""
+        return await (await self.submit(*args, **kwargs))
+
+    async def close(self) -> None:
+        """
+        Cancella i job ancora attivi (terminandone i processi) e chiude i
+        worker inattivi; il pool resta utilizzabile.
+        """
+        tasks = list(self._tasks)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+        for worker in idle:
+            await asyncio.get_running_loop().run_in_executor(None, worker.proc.join)
+
+    async def __aenter__(self) -> 'AsyncSolverPool':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+async def solve_async(
+    circuit: Circuit,
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    constraints: Optional[List[CardinalityConstraint]] = None,
+    backend: str = 'pycosat',
+    timeout: Optional[float] = None,
+    pool: Optional[AsyncSolverPool] = None
+) -> Tuple[Optional[bool], Optional[List[int]]]:
+    """
+    Versione asincrona di solver.is_satisfiable.
+    Senza `pool` usa un pool condiviso con un processo per core.
+    """
+    global _DEFAULT_POOL
+    if pool is None:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = AsyncSolverPool()
+        pool = _DEFAULT_POOL
+    return await pool.solve(circuit, fixed_inputs, fixed_outputs, constraints, backend, timeout)
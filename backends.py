@@ -0,0 +1,200 @@
+# backends.py
+"""
+Registro dei backend SAT e selezione del backend per singola chiamata.
+
+Un backend è un oggetto con un metodo
+    solve(clauses) -> List[int] | 'UNSAT' | 'UNKNOWN'
+(la stessa convenzione di pycosat). I parametri opzionali prop_limit,
+conf_limit e phases vengono passati solo ai backend che li dichiarano
+nell'attributo `options`. Il registro associa un nome a una factory;
+BackendPool conserva le istanze create e le presta in esclusiva a un thread
+alla volta, così backend con uno stato interno (come il solver pysat vivo di
+PysatBackend) vengono riusati senza condividerli tra thread.
+
+Il backend di una chiamata a is_satisfiable si sceglie, in ordine di
+priorità: argomento `backend`, contesto corrente (use_backend) e infine la
+variabile globale solver.SOLVER. Il contesto è per thread/task asyncio
+(contextvars): thread diversi possono usare backend diversi in parallelo.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import pycosat
+from pysat.solvers import Solver, SolverNames
+
+
+class PycosatBackend:
+    """
+    Backend pycosat: supporta solo il limite di propagazioni; le polarità
+    iniziali (phases) non sono esposte da picosat e vengono ignorate.
+    """
+    name = 'pycosat'
+    options = frozenset({'prop_limit'})
+
+    def __init__(self):
+        self.last_stats: Dict[str, int] = {}
+
+    def solve(self, clauses: List[List[int]], prop_limit: Optional[int] = None,
+              conf_limit: Optional[int] = None, phases: Optional[List[int]] = None):
+        if conf_limit is not None:
+            raise ValueError("pycosat non supporta un budget di conflitti")
+        return pycosat.solve(clauses, prop_limit=prop_limit or 0)
+
+
+class PysatBackend:
+    """
+    Backend basato su un solver pysat che resta vivo tra le chiamate.
+    Le clausole unitarie (es. ingressi e uscite fissati) diventano
+    assunzioni: se il resto della formula e le polarità coincidono con la
+    chiamata precedente il solver viene riusato, con le clausole apprese,
+    altrimenti viene ricreato. `phases` sono letterali con la polarità da
+    provare per prima (set_phases). last_stats contiene i contatori della
+    sola ultima chiamata.
+    Attributes:
+        reused: numero di chiamate risolte sul solver già caricato
+    """
+    options = frozenset({'prop_limit', 'conf_limit', 'phases'})
+
+    def __init__(self, name: str):
+        self.name = name
+        self.last_stats: Dict[str, int] = {}
+        self.reused = 0
+        self._solver: Optional[Solver] = None
+        self._key = None
+
+    def _load(self, base: List[List[int]], phases: Optional[List[int]]) -> Solver:
+        """Solver con la parte non unitaria `base`, ricreato se cambia."""
+        key = (base, phases)
+        if self._solver is not None and self._key == key:
+            self.reused += 1
+            return self._solver
+        self.close()
+        self._solver = Solver(name=self.name, bootstrap_with=base)
+        if phases:
+            self._solver.set_phases(phases)
+        self._key = key
+        return self._solver
+
+    def solve(self, clauses: List[List[int]], prop_limit: Optional[int] = None,
+              conf_limit: Optional[int] = None, phases: Optional[List[int]] = None):
+        base = [c for c in clauses if len(c) != 1]
+        assumptions = [c[0] for c in clauses if len(c) == 1]
+        s = self._load(base, list(phases) if phases else None)
+        before = dict(s.accum_stats() or {})
+        if prop_limit is None and conf_limit is None:
+            sat = s.solve(assumptions=assumptions)
+        else:
+            if conf_limit is not None:
+                s.conf_budget(conf_limit)
+            if prop_limit is not None:
+                s.prop_budget(prop_limit)
+            sat = s.solve_limited(assumptions=assumptions)
+        self.last_stats = {k: v - before.get(k, 0) for k, v in (s.accum_stats() or {}).items()}
+        if sat is None:
+            return 'UNKNOWN'
+        return s.get_model() if sat else 'UNSAT'
+
+    def close(self) -> None:
+        """Libera il solver pysat (il prossimo solve ne crea uno nuovo)."""
+        if self._solver is not None:
+            self._solver.delete()
+            self._solver = None
+            self._key = None
+
+    def __getstate__(self):
+        # Il solver pysat non è serializzabile: un processo figlio avviato
+        # con spawn ricrea il proprio
+        state = dict(self.__dict__)
+        state['_solver'] = state['_key'] = None
+        return state
+
+
+# Nome -> factory che crea una nuova istanza del backend
+_REGISTRY: Dict[str, Callable[[], object]] = {'pycosat': PycosatBackend}
+
+
+def register_backend(name: str, factory: Callable[[], object]) -> None:
+    """Registra (o sostituisce) un backend con il nome dato."""
+    _REGISTRY[name] = factory
+
+
+def available_backends() -> List[str]:
+    """Nomi dei backend registrati più quelli pysat riconosciuti."""
+    pysat_names = sorted({n for names in vars(SolverNames).values()
+                          if isinstance(names, tuple) for n in names})
+    return sorted(_REGISTRY) + [n for n in pysat_names if n not in _REGISTRY]
+
+
+def create_backend(name: str):
+    """Crea una nuova istanza del backend `name` (registrato o solver pysat)."""
+    if name in _REGISTRY:
+        return _REGISTRY[name]()
+    if name in available_backends():
+        return PysatBackend(name)
+    raise KeyError(f"Backend {name} non registrato")
+
+
+class BackendPool:
+    """
+    Pool thread-safe di istanze di backend, riusate tra le chiamate: ogni
+    PysatBackend prestato porta con sé il proprio solver già caricato.
+    Attributes:
+        created: numero di istanze create per nome
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._free: Dict[str, List[object]] = {}
+        self.created: Dict[str, int] = {}
+
+    def acquire(self, name: str):
+        """Istanza libera del backend, creandone una nuova se serve."""
+        with self._lock:
+            free = self._free.setdefault(name, [])
+            if free:
+                return free.pop()
+        instance = create_backend(name)
+        with self._lock:
+            self.created[name] = self.created.get(name, 0) + 1
+        return instance
+
+    def release(self, name: str, instance) -> None:
+        """Restituisce un'istanza al pool."""
+        with self._lock:
+            self._free.setdefault(name, []).append(instance)
+
+    @contextmanager
+    def borrow(self, name: str) -> Iterator[object]:
+        """Presta un'istanza in esclusiva per la durata del blocco with."""
+        instance = self.acquire(name)
+        try:
+            yield instance
+        finally:
+            self.release(name, instance)
+
+
+# Pool condiviso dal processo
+DEFAULT_POOL = BackendPool()
+
+# Backend del contesto corrente: nome registrato oppure oggetto con solve()
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar('sat_backend', default=None)
+
+
+def current_backend() -> Optional[Union[str, object]]:
+    """Backend impostato nel contesto corrente con use_backend (None se assente)."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def use_backend(backend: Union[str, object]) -> Iterator[None]:
+    """
+    Imposta il backend per il solo contesto corrente (thread o task asyncio):
+        with use_backend('cd19'):
+            is_satisfiable(circuit, ...)
+    """
+    token = _CURRENT.set(backend)
+    try:
+        yield
+    finally:
+        _CURRENT.reset(token)
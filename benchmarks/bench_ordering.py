@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# bench_ordering.py
+"""
+Confronto dei tempi di risoluzione di DES a round ridotti al variare
+della numerazione delle variabili (index_wires: 'name', 'topo', 'bfs').
+
+Uso: python benchmarks/bench_ordering.py [--rounds 3 4] [--pairs 3] [--trials 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pysat.solvers import Solver
+from multi_des import build_multi_des, random_des_pairs
+from new_circuit_to_cnf import circuit_to_cnf, index_wires
+
+ORDERS = ['name', 'topo', 'bfs']
+
+
+def solve_time(clauses, backend):
+    """Risolve le clausole con il backend pysat indicato e ritorna (sat, secondi)."""
+    start = time.perf_counter()
+    with Solver(name=backend, bootstrap_with=clauses) as s:
+        sat = s.solve()
+    return sat, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, nargs='+', default=[3, 4])
+    parser.add_argument('--pairs', type=int, default=3)
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--backend', default='g3')
+    args = parser.parse_args()
+
+    print(f"{'round':>5} {'ordine':>6} {'mediana[s]':>11} {'min[s]':>8} {'max[s]':>8}")
+    for n_rounds in args.rounds:
+        times = {order: [] for order in ORDERS}
+        for trial in range(args.trials):
+            key = 0x0123456789ABCDEF ^ (trial * 0x1111111111111111)
+            pairs = random_des_pairs(key, args.pairs, n_rounds, seed=trial)
+            circ, fixed_in, fixed_out = build_multi_des(pairs, n_rounds)
+            for order in ORDERS:
+                wire2idx = index_wires(circ, order)
+                _, clauses = circuit_to_cnf(circ, fixed_in, fixed_out, order=order, wire2idx=wire2idx)
+                sat, elapsed = solve_time(clauses, args.backend)
+                assert sat, "l'istanza con la chiave corretta deve essere SAT"
+                times[order].append(elapsed)
+        for order in ORDERS:
+            t = times[order]
+            print(f"{n_rounds:>5} {order:>6} {statistics.median(t):>11.3f} {min(t):>8.3f} {max(t):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# bench_portfolio.py
+"""
+Confronto tra i singoli backend e il portfolio parallelo su DES a round
+ridotti: per ogni istanza si misura il tempo di ciascun membro da solo
+(con timeout) e quello del portfolio completo. Il confronto ha senso solo
+con almeno tanti core quanti membri del portfolio.
+
+Uso: python benchmarks/bench_portfolio.py [--rounds 4] [--pairs 3] [--instances 3] [--timeout 120]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_des import build_multi_des, random_des_pairs
+from new_circuit_to_cnf import circuit_to_cnf
+from portfolio import DEFAULT_PORTFOLIO, member_label, solve_portfolio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--pairs', type=int, default=3)
+    parser.add_argument('--instances', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    labels = [member_label(m) for m in DEFAULT_PORTFOLIO]
+    print("istanza " + " ".join(f"{l:>9}" for l in labels) + f" {'migliore':>9} {'portfolio':>9}")
+    for inst in range(args.instances):
+        key = 0x0123456789ABCDEF ^ (inst * 0x1111111111111111)
+        pairs = random_des_pairs(key, args.pairs, args.rounds, seed=inst)
+        circ, fixed_in, fixed_out = build_multi_des(pairs, args.rounds)
+        _, clauses = circuit_to_cnf(circ, fixed_in, fixed_out)
+
+        single = []
+        for member in DEFAULT_PORTFOLIO:
+            sat, _, report = solve_portfolio(clauses, [member], timeout=args.timeout)
+            t = report['times'][member_label(member)]
+            single.append(t if sat is not None else float('inf'))
+
+        start = time.perf_counter()
+        sat, _, report = solve_portfolio(clauses, DEFAULT_PORTFOLIO, timeout=args.timeout)
+        wall = time.perf_counter() - start
+        print(f"{inst:>7} " + " ".join(f"{t:>9.2f}" for t in single)
+              + f" {min(single):>9.2f} {wall:>9.2f}  ({report['winner']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# bitsim.py
+"""
+Simulatore bit-parallelo di Circuit basato su NumPy.
+
+Gli N vettori di ingresso vengono impacchettati in parole uint64 (il bit j
+della parola w è il vettore 64*w + j). Il circuito viene diviso in livelli
+(ogni gate dopo tutte quelle che la pilotano) e, dentro un livello, le gate
+dello stesso tipo e con lo stesso numero di ingressi vengono valutate con
+una sola operazione NumPy su tutte le gate e tutte le parole insieme.
+
+Per batch molto grandi la simulazione procede a blocchi di parole, così la
+memoria occupata resta (numero di wire) x chunk_words x 8 byte.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from new_ExtendedCircuitgraph import Circuit, Gate
+
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Gate n-arie: (riduzione NumPy, uscita negata)
+_REDUCE = {
+    'AND': (np.bitwise_and, False),
+    'NAND': (np.bitwise_and, True),
+    'OR': (np.bitwise_or, False),
+    'NOR': (np.bitwise_or, True),
+    'XOR': (np.bitwise_xor, False),
+    'XNOR': (np.bitwise_xor, True),
+}
+
+
+def levelize(circuit: Circuit) -> List[List[Gate]]:
+    """
+    Divide le gate in livelli: il livello di una gate è 1 + il livello
+    massimo delle gate che ne pilotano gli ingressi (0 per gli ingressi primari).
+    """
+    level: Dict[str, int] = {}
+    levels: List[List[Gate]] = []
+    for gate in circuit.topo_sort():
+        lv = max((level.get(w, 0) for w in gate.inputs), default=0)
+        level[gate.output] = lv + 1
+        while len(levels) <= lv:
+            levels.append([])
+        levels[lv].append(gate)
+    return levels
+
+
+def pack_vectors(bits: np.ndarray) -> np.ndarray:
+    """
+    Impacchetta vettori booleani in parole uint64 lungo l'ultimo asse:
+    shape (..., N) -> (..., ceil(N/64)).
+    """
+    bits = np.asarray(bits, dtype=bool)
+    n = bits.shape[-1]
+    n_words = (n + 63) // 64
+    pad = n_words * 64 - n
+    if pad:
+        bits = np.concatenate([bits, np.zeros(bits.shape[:-1] + (pad,), dtype=bool)], axis=-1)
+    packed = np.packbits(bits, axis=-1, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8').astype(np.uint64, copy=False)
+
+
+def unpack_words(words: np.ndarray, n: int) -> np.ndarray:
+    """Inversa di pack_vectors: shape (..., W) -> (..., n) booleani."""
+    words = np.ascontiguousarray(words, dtype='<u8')
+    bits = np.unpackbits(words.view(np.uint8), axis=-1, bitorder='little')
+    return bits[..., :n].astype(bool)
+
+
+class BitSimulator:
+    """
+    Simulatore compilato una volta per circuito e riutilizzabile.
+    Attributes:
+        inputs: ingressi primari, nell'ordine delle righe di run()
+        wires: tutte le wire, nell'ordine delle righe del risultato di run()
+        index: mappa wire -> riga
+        depth: numero di livelli del circuito
+    """
+    def __init__(self, circuit: Circuit):
+        self.inputs = circuit.inputs()
+        levels = levelize(circuit)
+        self.wires = list(self.inputs) + [g.output for lv in levels for g in lv]
+        self.index = {w: i for i, w in enumerate(self.wires)}
+        self.depth = len(levels)
+        # Per ogni livello: (tipo, righe di uscita, righe di ingresso [arità x gate])
+        self._plan: List[List[Tuple[str, np.ndarray, np.ndarray]]] = []
+        for lv in levels:
+            groups: Dict[Tuple[str, int], List[Gate]] = {}
+            for g in lv:
+                groups.setdefault((g.gate_type, len(g.inputs)), []).append(g)
+            steps = []
+            for (gate_type, arity), gates in groups.items():
+                if gate_type not in _REDUCE and gate_type not in ('NOT', 'BUF', 'MUX', 'MAJ', 'CONST0', 'CONST1'):
+                    raise ValueError(f"Tipo di porta {gate_type} non supportato")
+                outs = np.array([self.index[g.output] for g in gates], dtype=np.intp)
+                ins = np.array([[self.index[w] for w in g.inputs] for g in gates],
+                               dtype=np.intp).reshape(len(gates), arity).T
+                steps.append((gate_type, outs, ins))
+            self._plan.append(steps)
+
+    def run(self, input_words: np.ndarray) -> np.ndarray:
+        """
+        Valuta il circuito su parole già impacchettate.
+
+        Args:
+            input_words: array uint64 di shape (len(inputs), W)
+        Returns:
+            array uint64 di shape (len(wires), W) con il valore di ogni wire
+        """
+        input_words = np.asarray(input_words, dtype=np.uint64)
+        n_words = input_words.shape[1]
+        vals = np.empty((len(self.wires), n_words), dtype=np.uint64)
+        vals[:len(self.inputs)] = input_words
+        for steps in self._plan:
+            for gate_type, outs, ins in steps:
+                if gate_type in _REDUCE:
+                    op, negate = _REDUCE[gate_type]
+                    res = op.reduce(vals[ins], axis=0)
+                    if negate:
+                        np.invert(res, out=res)
+                elif gate_type == 'NOT':
+                    res = ~vals[ins[0]]
+                elif gate_type == 'BUF':
+                    res = vals[ins[0]]
+                elif gate_type == 'MUX':
+                    s, a, b = vals[ins[0]], vals[ins[1]], vals[ins[2]]
+                    res = (s & a) | (~s & b)
+                elif gate_type == 'MAJ':
+                    a, b, c = vals[ins[0]], vals[ins[1]], vals[ins[2]]
+                    res = (a & b) | (a & c) | (b & c)
+                else:
+                    res = ALL_ONES if gate_type == 'CONST1' else np.uint64(0)
+                vals[outs] = res
+        return vals
+
+    def simulate(
+        self,
+        input_vectors: Dict[str, Union[bool, Sequence[bool], np.ndarray]],
+        outputs: Optional[Iterable[str]] = None,
+        chunk_words: int = 1024
+    ) -> Dict[str, np.ndarray]:
+        """
+        Simula N vettori di ingresso.
+
+        Args:
+            input_vectors: mappa ingresso -> array di N booleani; un valore
+                scalare vale per tutti i vettori (es. una chiave fissata)
+            outputs: wire di cui ritornare il valore (default: tutte)
+            chunk_words: parole simulate per blocco (64 vettori per parola)
+        Returns:
+            mappa wire -> array di N booleani
+        """
+        for w in self.inputs:
+            if w not in input_vectors:
+                raise KeyError(f"Valore mancante per l'ingresso {w}")
+        arrays = {w: np.asarray(input_vectors[w], dtype=bool) for w in self.inputs}
+        n = max((a.size for a in arrays.values() if a.ndim), default=1)
+        packed = np.empty((len(self.inputs), (n + 63) // 64), dtype=np.uint64)
+        for i, w in enumerate(self.inputs):
+            packed[i] = pack_vectors(np.broadcast_to(arrays[w], (n,)))
+        rows = [self.index[w] for w in (self.wires if outputs is None else outputs)]
+        result = np.empty((len(rows), packed.shape[1]), dtype=np.uint64)
+        for start in range(0, packed.shape[1], chunk_words):
+            stop = start + chunk_words
+            result[:, start:stop] = self.run(packed[:, start:stop])[rows]
+        bits = unpack_words(result, n)
+        names = self.wires if outputs is None else list(outputs)
+        return {w: bits[i] for i, w in enumerate(names)}
+
+
+def simulate_batch(
+    circuit: Circuit,
+    input_vectors: Dict[str, Union[bool, Sequence[bool], np.ndarray]],
+    outputs: Optional[Iterable[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Versione in un colpo solo di BitSimulator(circuit).simulate(...):
+    per simulare più batch sullo stesso circuito conviene riusare il simulatore.
+    """
+    return BitSimulator(circuit).simulate(input_vectors, outputs)
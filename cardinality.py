@@ -0,0 +1,429 @@
+# cardinality.py
+"""
+Codifiche CNF di vincoli di cardinalità e pseudo-booleani su insiemi di wire.
+
+Le funzioni di basso livello lavorano su letterali interi e allocano variabili
+ausiliarie a partire da `top` (ultimo indice già usato), ritornando le clausole
+e il nuovo `top`. La codifica di cardinalità viene scelta tra sequential
+counter, totalizer e rete di ordinamento (cardinality network) in base al
+numero di clausole prodotte.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Clauses = List[List[int]]
+
+
+# ---------------------------------------------------------------------------
+# At-most-k su letterali
+# ---------------------------------------------------------------------------
+
+def seqcounter_atmost(lits: Sequence[int], k: int, top: int) -> Tuple[Clauses, int]:
+    """
+    Sequential counter (Sinz 2005) per sum(lits) <= k, con 1 <= k < len(lits).
+    s[i][j] vale 1 se tra i primi i+1 letterali almeno j+1 sono veri.
+    """
+    n = len(lits)
+    s = [[top + i * k + j + 1 for j in range(k)] for i in range(n - 1)]
+    top += (n - 1) * k
+    clauses: Clauses = [[-lits[0], s[0][0]]]
+    clauses.extend([-s[0][j]] for j in range(1, k))
+    for i in range(1, n - 1):
+        clauses.append([-lits[i], s[i][0]])
+        clauses.append([-s[i - 1][0], s[i][0]])
+        for j in range(1, k):
+            clauses.append([-lits[i], -s[i - 1][j - 1], s[i][j]])
+            clauses.append([-s[i - 1][j], s[i][j]])
+        clauses.append([-lits[i], -s[i - 1][k - 1]])
+    clauses.append([-lits[n - 1], -s[n - 2][k - 1]])
+    return clauses, top
+
+
+def _totalizer_tree(lits: Sequence[int], k: int, top: int) -> Tuple[Clauses, List[int], int]:
+    """
+    Costruisce l'albero del totalizer (Bailleux-Boufkhad) troncato a k+1
+    uscite e ritorna (clausole, uscite unarie, top).
+    """
+    if len(lits) == 1:
+        return [], [lits[0]], top
+    mid = len(lits) // 2
+    left_cls, left, top = _totalizer_tree(lits[:mid], k, top)
+    right_cls, right, top = _totalizer_tree(lits[mid:], k, top)
+    width = min(len(left) + len(right), k + 1)
+    out = list(range(top + 1, top + width + 1))
+    top += width
+    clauses = left_cls + right_cls
+    # out[a+b-1] vale 1 se almeno a uscite sinistre e b destre valgono 1
+    for a in range(len(left) + 1):
+        for b in range(len(right) + 1):
+            if a + b == 0 or a + b > width:
+                continue
+            clause = [out[a + b - 1]]
+            if a:
+                clause.append(-left[a - 1])
+            if b:
+                clause.append(-right[b - 1])
+            clauses.append(clause)
+    return clauses, out, top
+
+
+def totalizer_atmost(lits: Sequence[int], k: int, top: int) -> Tuple[Clauses, int]:
+    """
+    Totalizer per sum(lits) <= k: conta in unario con un albero di somme
+    e vieta l'uscita k+1.
+    """
+    clauses, out, top = _totalizer_tree(lits, k, top)
+    clauses.append([-out[k]])
+    return clauses, top
+
+
+def _oddeven_merge_sort(n: int) -> List[Tuple[int, int]]:
+    """
+    Comparatori della rete di Batcher (odd-even merge sort) su n posizioni,
+    con n arrotondato alla potenza di 2 successiva; i comparatori che toccano
+    posizioni >= n vengono scartati (equivalgono a ingressi costanti a 0).
+    """
+    size = 1
+    while size < n:
+        size *= 2
+    comparators = []
+    p = 1
+    while p < size:
+        k = p
+        while k >= 1:
+            for j in range(k % p, size - k, 2 * k):
+                for i in range(min(k, size - j - k)):
+                    a, b = i + j, i + j + k
+                    if (a // (2 * p)) == (b // (2 * p)) and b < n:
+                        comparators.append((a, b))
+            k //= 2
+        p *= 2
+    return comparators
+
+
+def _prune_network(comparators: List[Tuple[int, int]], k: int) -> List[Tuple[int, int]]:
+    """
+    Tiene solo i comparatori che influenzano le prime k+1 uscite.
+    """
+    needed = set(range(k + 1))
+    kept = []
+    for a, b in reversed(comparators):
+        if a in needed or b in needed:
+            kept.append((a, b))
+            needed.update((a, b))
+    kept.reverse()
+    return kept
+
+
+def cardnet_atmost(lits: Sequence[int], k: int, top: int) -> Tuple[Clauses, int]:
+    """
+    Rete di ordinamento troncata alle prime k+1 uscite: ogni comparatore
+    (a, b) produce max = a ∨ b e min = a ∧ b, codificati solo nella direzione
+    necessaria per un limite superiore.
+    """
+    wires = list(lits)
+    clauses: Clauses = []
+    for a, b in _prune_network(_oddeven_merge_sort(len(wires)), k):
+        hi, lo = top + 1, top + 2
+        top += 2
+        x, y = wires[a], wires[b]
+        clauses.extend([[-x, hi], [-y, hi], [-x, -y, lo]])
+        wires[a], wires[b] = hi, lo
+    clauses.append([-wires[k]])
+    return clauses, top
+
+
+def _estimate_sizes(n: int, k: int) -> Dict[str, int]:
+    """Numero di clausole prodotto da ciascuna codifica at-most-k."""
+    sizes = {'seqcounter': 2 * n * k + n - 3 * k - 1}
+
+    def tot(m: int) -> Tuple[int, int]:
+        # (clausole, uscite) del sottoalbero su m letterali
+        if m == 1:
+            return 0, 1
+        lc, lo = tot(m // 2)
+        rc, ro = tot(m - m // 2)
+        width = min(lo + ro, k + 1)
+        own = sum(1 for a in range(lo + 1) for b in range(ro + 1) if 0 < a + b <= width)
+        return lc + rc + own, width
+
+    sizes['totalizer'] = tot(n)[0] + 1
+    sizes['cardnet'] = 3 * len(_prune_network(_oddeven_merge_sort(n), k)) + 1
+    return sizes
+
+
+CARD_ENCODERS = {
+    'seqcounter': seqcounter_atmost,
+    'totalizer': totalizer_atmost,
+    'cardnet': cardnet_atmost,
+}
+
+
+def encode_atmost(
+    lits: Sequence[int],
+    k: int,
+    top: int,
+    encoding: Optional[str] = None
+) -> Tuple[Clauses, int]:
+    """
+    Clausole per sum(lits) <= k.
+
+    Args:
+        lits: letterali (interi non nulli)
+        k: limite superiore
+        top: ultima variabile già in uso
+        encoding: 'seqcounter', 'totalizer', 'cardnet' oppure None per
+            scegliere la codifica con meno clausole
+    Returns:
+        (clausole, nuovo top)
+    """
+    n = len(lits)
+    if k < 0:
+        return [[]], top
+    if k >= n:
+        return [], top
+    if k == 0:
+        return [[-l] for l in lits], top
+    if encoding is None:
+        sizes = _estimate_sizes(n, k)
+        encoding = min(sizes, key=sizes.get)
+    if encoding not in CARD_ENCODERS:
+        raise ValueError(f"Codifica {encoding} non supportata")
+    return CARD_ENCODERS[encoding](list(lits), k, top)
+
+
+def encode_atleast(lits: Sequence[int], k: int, top: int,
+                   encoding: Optional[str] = None) -> Tuple[Clauses, int]:
+    """Clausole per sum(lits) >= k, come at-most-(n-k) sui letterali negati."""
+    if k <= 0:
+        return [], top
+    if k == 1:
+        return [list(lits)], top
+    return encode_atmost([-l for l in lits], len(lits) - k, top, encoding)
+
+
+def encode_exactly(lits: Sequence[int], k: int, top: int,
+                   encoding: Optional[str] = None) -> Tuple[Clauses, int]:
+    """Clausole per sum(lits) == k."""
+    upper, top = encode_atmost(lits, k, top, encoding)
+    lower, top = encode_atleast(lits, k, top, encoding)
+    return upper + lower, top
+
+
+# ---------------------------------------------------------------------------
+# Vincoli pseudo-booleani: sum(w_i * l_i) <= bound
+# ---------------------------------------------------------------------------
+
+def _normalize_pb(weights: Sequence[int], lits: Sequence[int], bound: int) -> Tuple[List[int], List[int], int]:
+    """
+    Porta il vincolo in forma con pesi positivi: w·l con w < 0 diventa
+    |w|·¬l - |w|, quindi il termine costante si sposta sul bound.
+    Ordina i termini per peso decrescente e scarta i pesi nulli.
+    """
+    terms = []
+    for w, l in zip(weights, lits):
+        if w < 0:
+            bound -= w
+            w, l = -w, -l
+        if w:
+            terms.append((w, l))
+    terms.sort(key=lambda t: -t[0])
+    return [w for w, _ in terms], [l for _, l in terms], bound
+
+
+def bdd_pb_atmost(weights: Sequence[int], lits: Sequence[int], bound: int, top: int) -> Tuple[Clauses, int]:
+    """
+    Codifica BDD (Eén-Sörensson) di sum(w_i * l_i) <= bound con pesi positivi.
+    Il nodo (i, r) è vero se i termini da i in poi rispettano il residuo r;
+    i nodi con lo stesso i e residuo oltre la somma rimanente coincidono.
+    """
+    n = len(lits)
+    suffix = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix[i] = suffix[i + 1] + weights[i]
+    clauses: Clauses = []
+    memo: Dict[Tuple[int, int], Optional[int]] = {}
+    counter = [top]
+
+    # Visita iterativa: il valore di un nodo è None (sempre vero),
+    # 0 (sempre falso) oppure la variabile che lo rappresenta
+    def node(i: int, r: int) -> Optional[int]:
+        stack = [(i, r)]
+        while stack:
+            ci, cr = stack[-1]
+            key = (ci, min(cr, suffix[ci]))
+            if key in memo:
+                stack.pop()
+                continue
+            if cr < 0:
+                memo[key] = 0
+                stack.pop()
+                continue
+            if cr >= suffix[ci]:
+                memo[key] = None
+                stack.pop()
+                continue
+            hi_key = (ci + 1, min(cr - weights[ci], suffix[ci + 1]))
+            lo_key = (ci + 1, min(cr, suffix[ci + 1]))
+            pending = [k for k in (hi_key, lo_key) if k not in memo and not k[1] < 0]
+            if pending:
+                stack.extend(pending)
+                continue
+            hi = 0 if hi_key[1] < 0 else memo[hi_key]
+            lo = memo[lo_key]
+            counter[0] += 1
+            v = counter[0]
+            memo[key] = v
+            if hi == 0:
+                clauses.append([-v, -lits[ci]])
+            elif hi is not None:
+                clauses.append([-v, -lits[ci], hi])
+            if lo == 0:
+                clauses.append([-v])
+            elif lo is not None:
+                clauses.append([-v, lo])
+            stack.pop()
+        return memo[(i, min(r, suffix[i]))]
+
+    root = node(0, bound)
+    if root == 0:
+        return [[]], top
+    if root is None:
+        return [], top
+    clauses.append([root])
+    return clauses, counter[0]
+
+
+def swc_pb_atmost(weights: Sequence[int], lits: Sequence[int], bound: int, top: int) -> Tuple[Clauses, int]:
+    """
+    Sequential weight counter (Hölldobler et al. 2012) per
+    sum(w_i * l_i) <= bound con pesi positivi e 0 < bound:
+    s[i][j] vale 1 se i primi i+1 termini sommano almeno j+1.
+    """
+    n = len(lits)
+    k = bound
+    s = [[top + i * k + j + 1 for j in range(k)] for i in range(n)]
+    top += n * k
+    clauses: Clauses = []
+    for i in range(n):
+        w, l = weights[i], lits[i]
+        for j in range(min(w, k)):
+            clauses.append([-l, s[i][j]])
+        if i > 0:
+            for j in range(k):
+                clauses.append([-s[i - 1][j], s[i][j]])
+            for j in range(k - w):
+                clauses.append([-l, -s[i - 1][j], s[i][j + w]])
+            clauses.append([-l, -s[i - 1][k - w]] if w <= k else [-l])
+        elif w > k:
+            clauses.append([-l])
+    return clauses, top
+
+
+def encode_pb_atmost(
+    weights: Sequence[int],
+    lits: Sequence[int],
+    bound: int,
+    top: int
+) -> Tuple[Clauses, int]:
+    """
+    Clausole per sum(w_i * l_i) <= bound (pesi interi anche negativi).
+    Se tutti i pesi valgono 1 si usa la codifica di cardinalità; altrimenti
+    si sceglie tra BDD e sequential weight counter quella con meno clausole.
+    """
+    weights, lits, bound = _normalize_pb(weights, lits, bound)
+    if bound < 0:
+        return [[]], top
+    if bound >= sum(weights):
+        return [], top
+    if all(w == 1 for w in weights):
+        return encode_atmost(lits, bound, top)
+    if bound == 0:
+        return [[-l] for l in lits], top
+    bdd = bdd_pb_atmost(weights, lits, bound, top)
+    # Il SWC produce circa 3·n·bound clausole: lo si costruisce solo se può vincere
+    if 3 * len(lits) * bound < len(bdd[0]):
+        swc = swc_pb_atmost(weights, lits, bound, top)
+        if len(swc[0]) < len(bdd[0]):
+            return swc
+    return bdd
+
+
+# ---------------------------------------------------------------------------
+# Vincoli sui wire di un Circuit
+# ---------------------------------------------------------------------------
+
+class CardinalityConstraint:
+    """
+    Vincolo sum(weights[i] * wires[i]) <relation> bound su wire di un Circuit.
+    Attributes:
+        wires: nomi dei wire coinvolti
+        bound: termine noto
+        relation: '<=', '>=' oppure '=='
+        weights: pesi interi (None = tutti 1, vincolo di cardinalità)
+        encoding: codifica di cardinalità forzata (None = scelta automatica)
+    """
+    def __init__(self, wires: Sequence[str], bound: int, relation: str = '<=',
+                 weights: Optional[Sequence[int]] = None, encoding: Optional[str] = None):
+        if relation not in ('<=', '>=', '=='):
+            raise ValueError(f"Relazione {relation} non supportata")
+        if weights is not None and len(weights) != len(wires):
+            raise ValueError("wires e weights devono avere la stessa lunghezza")
+        self.wires = list(wires)
+        self.bound = bound
+        self.relation = relation
+        self.weights = list(weights) if weights is not None else None
+        self.encoding = encoding
+
+    def encode(self, wire2idx: Dict[str, int], top: int) -> Tuple[Clauses, int]:
+        """
+        Traduce il vincolo in clausole usando la mappa wire->variabile.
+        Returns:
+            (clausole, nuovo top)
+        """
+        lits = []
+        for w in self.wires:
+            idx = wire2idx.get(w)
+            if idx is None:
+                raise KeyError(f"Wire {w} non trovato nella mappatura")
+            lits.append(idx)
+
+        if self.weights is None:
+            if self.relation == '<=':
+                return encode_atmost(lits, self.bound, top, self.encoding)
+            if self.relation == '>=':
+                return encode_atleast(lits, self.bound, top, self.encoding)
+            return encode_exactly(lits, self.bound, top, self.encoding)
+
+        clauses: Clauses = []
+        if self.relation in ('<=', '=='):
+            cls, top = encode_pb_atmost(self.weights, lits, self.bound, top)
+            clauses += cls
+        if self.relation in ('>=', '=='):
+            # sum(w·x) >= b  <=>  sum(-w·x) <= -b
+            cls, top = encode_pb_atmost([-w for w in self.weights], lits, -self.bound, top)
+            clauses += cls
+        return clauses, top
+
+    def __repr__(self) -> str:
+        terms = self.wires if self.weights is None else [f"{w}*{x}" for w, x in zip(self.weights, self.wires)]
+        return f"CardinalityConstraint({' + '.join(terms)} {self.relation} {self.bound})"
+
+
+def at_most(wires: Sequence[str], k: int, encoding: Optional[str] = None) -> CardinalityConstraint:
+    """Al più k wire tra `wires` valgono 1."""
+    return CardinalityConstraint(wires, k, '<=', encoding=encoding)
+
+
+def at_least(wires: Sequence[str], k: int, encoding: Optional[str] = None) -> CardinalityConstraint:
+    """Almeno k wire tra `wires` valgono 1."""
+    return CardinalityConstraint(wires, k, '>=', encoding=encoding)
+
+
+def exactly(wires: Sequence[str], k: int, encoding: Optional[str] = None) -> CardinalityConstraint:
+    """Esattamente k wire tra `wires` valgono 1."""
+    return CardinalityConstraint(wires, k, '==', encoding=encoding)
+
+
+def pseudo_boolean(weights: Dict[str, int], relation: str, bound: int) -> CardinalityConstraint:
+    """Vincolo pesato sum(weights[w] * w) <relation> bound."""
+    return CardinalityConstraint(list(weights), bound, relation, weights=list(weights.values()))
@@ -0,0 +1,180 @@
+# cube_and_conquer.py
+"""
+Ricerca della chiave con cube-and-conquer.
+
+Si scelgono alcuni bit di chiave (con un'euristica di lookahead o di
+attività), si generano tutti i cubi che li fissano e li si risolvono come
+assunzioni in un pool di processi. Ogni processo mantiene un solver già
+caricato con la formula, riutilizzato per tutti i cubi che riceve; i cubi
+vengono distribuiti uno alla volta, così i processi liberi prendono subito
+il successivo. La ricerca si ferma al primo cubo SAT.
+"""
+import itertools
+import multiprocessing as mp
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pysat.solvers import Solver
+
+from new_circuit_to_cnf import circuit_to_cnf, index_wires
+from new_ExtendedCircuitgraph import Circuit
+
+# Solver caricato in ciascun processo del pool
+_WORKER_SOLVER = None
+
+
+def activity_scores(clauses: List[List[int]], variables: Sequence[int]) -> Dict[int, float]:
+    """
+    Punteggio di attività statica: numero di occorrenze della variabile,
+    pesato per la lunghezza delle clausole (le clausole corte contano di più).
+    """
+    wanted = set(variables)
+    score: Counter = Counter()
+    for cl in clauses:
+        weight = 2.0 ** -len(cl)
+        for lit in cl:
+            if abs(lit) in wanted:
+                score[abs(lit)] += weight
+    return {v: score[v] for v in variables}
+
+
+def lookahead_scores(clauses: List[List[int]], variables: Sequence[int],
+                     backend: str = 'g3') -> Dict[int, float]:
+    """
+    Punteggio di lookahead: per ogni variabile si propagano entrambe le
+    polarità e si usa il prodotto del numero di letterali implicati.
+    Una polarità che porta a conflitto rende la variabile molto attraente.
+    """
+    scores = {}
+    with Solver(name=backend, bootstrap_with=clauses) as s:
+        for v in variables:
+            counts = []
+            for lit in (v, -v):
+                ok, implied = s.propagate(assumptions=[lit])
+                counts.append(len(implied) if ok else float('inf'))
+            scores[v] = (counts[0] + 1) * (counts[1] + 1)
+    return scores
+
+
+def select_cube_variables(
+    clauses: List[List[int]],
+    candidates: Sequence[int],
+    n_vars: int,
+    heuristic: str = 'lookahead',
+    backend: str = 'g3'
+) -> List[int]:
+    """
+    Sceglie le n_vars variabili su cui dividere lo spazio di ricerca.
+    """
+    if heuristic == 'lookahead':
+        scores = lookahead_scores(clauses, candidates, backend)
+    elif heuristic == 'activity':
+        scores = activity_scores(clauses, candidates)
+    else:
+        raise ValueError(f"Euristica {heuristic} non supportata")
+    return sorted(candidates, key=lambda v: -scores[v])[:n_vars]
+
+
+def generate_cubes(clauses: List[List[int]], variables: Sequence[int],
+                   backend: str = 'g3') -> Tuple[List[List[int]], int]:
+    """
+    Tutti i cubi sulle variabili scelte, scartando quelli che falliscono
+    già per propagazione unitaria.
+    Returns:
+        (cubi, numero di cubi scartati)
+    """
+    cubes = []
+    pruned = 0
+    with Solver(name=backend, bootstrap_with=clauses) as s:
+        for signs in itertools.product((1, -1), repeat=len(variables)):
+            cube = [sign * v for sign, v in zip(signs, variables)]
+            ok, _ = s.propagate(assumptions=cube)
+            if ok:
+                cubes.append(cube)
+            else:
+                pruned += 1
+    return cubes, pruned
+
+
+def _init_worker(clauses: List[List[int]], backend: str) -> None:
+    global _WORKER_SOLVER
+    _WORKER_SOLVER = Solver(name=backend, bootstrap_with=clauses)
+
+
+def _solve_cube(cube: List[int]) -> Tuple[List[int], bool, Optional[List[int]], float]:
+    start = time.perf_counter()
+    sat = _WORKER_SOLVER.solve(assumptions=cube)
+    model = _WORKER_SOLVER.get_model() if sat else None
+    return cube, sat, model, time.perf_counter() - start
+
+
+def solve_cubes(
+    clauses: List[List[int]],
+    cubes: List[List[int]],
+    processes: Optional[int] = None,
+    backend: str = 'g3'
+) -> Tuple[bool, Optional[List[int]], Dict[str, object]]:
+    """
+    Risolve i cubi in un pool di processi e si ferma al primo SAT.
+
+    Returns:
+        (is_sat, model, report) con report = {'solved': cubi risolti,
+        'sat_cube': cubo soddisfacibile o None, 'cube_times': tempi per cubo}
+    """
+    cube_times: List[float] = []
+    ctx = mp.get_context()
+    pool = ctx.Pool(processes=processes, initializer=_init_worker, initargs=(clauses, backend))
+    sat_cube, model = None, None
+    try:
+        for cube, sat, cube_model, elapsed in pool.imap_unordered(_solve_cube, cubes, chunksize=1):
+            cube_times.append(elapsed)
+            if sat:
+                sat_cube, model = cube, cube_model
+                break
+    finally:
+        # terminate interrompe anche i cubi ancora in corso negli altri processi
+        pool.terminate()
+        pool.join()
+    report = {'solved': len(cube_times), 'sat_cube': sat_cube, 'cube_times': cube_times}
+    return sat_cube is not None, model, report
+
+
+def cube_and_conquer(
+    circuit: Circuit,
+    key_wires: Sequence[str],
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    n_cube_vars: int = 6,
+    heuristic: str = 'lookahead',
+    processes: Optional[int] = None,
+    backend: str = 'g3'
+) -> Tuple[bool, Optional[List[int]], Dict[str, object]]:
+    """
+    Recupero della chiave con cube-and-conquer.
+
+    Args:
+        circuit: istanza di Circuit (es. costruita con build_multi_des)
+        key_wires: wire candidati per i cubi (tipicamente i bit di chiave)
+        fixed_inputs: mappa wire->bool per fissare alcuni input
+        fixed_outputs: mappa wire->bool per fissare alcuni output
+        n_cube_vars: numero di bit fissati da ogni cubo (2^n cubi)
+        heuristic: 'lookahead' oppure 'activity'
+        processes: numero di processi (default os.cpu_count())
+        backend: solver pysat usato dai processi
+    Returns:
+        (is_sat, model, report): il report contiene anche le variabili scelte
+        ('cube_vars'), i cubi totali e quelli scartati per propagazione
+    """
+    wire2idx = index_wires(circuit)
+    _, clauses = circuit_to_cnf(circuit, fixed_inputs, fixed_outputs, wire2idx=wire2idx)
+    candidates = [wire2idx[w] for w in key_wires if w in wire2idx]
+    cube_vars = select_cube_variables(clauses, candidates, n_cube_vars, heuristic, backend)
+    cubes, pruned = generate_cubes(clauses, cube_vars, backend)
+    inv = {v: w for w, v in wire2idx.items()}
+    if not cubes:
+        return False, None, {'cube_vars': [inv[v] for v in cube_vars], 'cubes': 0, 'pruned': pruned,
+                             'solved': 0, 'sat_cube': None, 'cube_times': []}
+    sat, model, report = solve_cubes(clauses, cubes, processes, backend)
+    report.update({'cube_vars': [inv[v] for v in cube_vars], 'cubes': len(cubes), 'pruned': pruned})
+    return sat, model, report
@@ -0,0 +1,176 @@
+# decoding.py
+"""
+Decodifica vettorizzata dei modelli SAT.
+
+Un modello (lista di letterali, come quelli di pycosat e pysat) viene
+convertito una sola volta in un array booleano indicizzato per variabile;
+da lì i gruppi di wire (plaintext, chiave, ciphertext, ...) si estraggono
+con un'unica indicizzazione NumPy, invece di cercare `var in model` wire
+per wire (una scansione della lista per ogni wire).
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from new_ExtendedCircuitgraph import Circuit
+from new_circuit_to_cnf import index_wires
+
+
+def model_bits(model: Sequence[int], num_vars: Optional[int] = None) -> np.ndarray:
+    """
+    Array booleano indicizzato per variabile: bits[v] è True se il letterale
+    v compare positivo nel modello (l'indice 0 non è usato).
+
+    Args:
+        model: lista di letterali
+        num_vars: numero di variabili (default: il massimo nel modello)
+    """
+    lits = np.asarray(model, dtype=np.int64)
+    n = int(np.abs(lits).max(initial=0)) if num_vars is None else num_vars
+    bits = np.zeros(n + 1, dtype=bool)
+    bits[np.abs(lits)] = lits > 0
+    return bits
+
+
+def bits_to_int(bits: np.ndarray) -> int:
+    """Intero con il primo elemento come bit più significativo."""
+    bits = np.asarray(bits, dtype=bool)
+    pad = (-len(bits)) % 8
+    if pad:
+        bits = np.concatenate([np.zeros(pad, dtype=bool), bits])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class ModelDecoder:
+    """
+    Decodificatore legato a una numerazione wire -> variabile (es. var_map
+    di SolverSession o index_wires). Gli indici dei gruppi di wire vengono
+    calcolati una volta e riusati per tutti i modelli.
+
+    Esempio:
+        dec = ModelDecoder(session.var_map)
+        key = dec.word(model, [f"k{i}" for i in range(64)], missing=False)
+    Attributes:
+        var_map: mappa wire -> variabile
+        num_vars: variabile più alta nella mappa
+    """
+    def __init__(self, var_map: Dict[str, int]):
+        self.var_map = var_map
+        self.num_vars = max(var_map.values(), default=0)
+        self._groups: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _indices(self, wires: Sequence[str], missing: Optional[bool]) -> Tuple[np.ndarray, np.ndarray]:
+        """Indici delle variabili del gruppo e maschera delle wire assenti dalla mappa."""
+        key = tuple(wires)
+        group = self._groups.get(key)
+        if group is None:
+            # Le wire assenti puntano all'indice 0 e vengono poi sovrascritte
+            idx = np.array([self.var_map.get(w, 0) for w in wires], dtype=np.intp)
+            group = (idx, idx == 0)
+            self._groups[key] = group
+        if missing is None and group[1].any():
+            absent = [w for w, a in zip(wires, group[1]) if a]
+            raise KeyError(f"Wire {absent[0]} non trovato nella mappa delle variabili")
+        return group
+
+    def bits(self, model: Sequence[int]) -> np.ndarray:
+        """Array booleano per variabile (vedi model_bits)."""
+        lits = np.asarray(model, dtype=np.int64)
+        n = max(self.num_vars, int(np.abs(lits).max(initial=0)))
+        return model_bits(lits, n)
+
+    def wires(self, model, wires: Sequence[str], missing: Optional[bool] = None) -> np.ndarray:
+        """
+        Valori delle wire nel modello, nell'ordine dato.
+
+        Args:
+            model: lista di letterali oppure array già prodotto da bits()
+            wires: wire da estrarre
+            missing: valore delle wire assenti dalla mappa (es. i bit di
+                parità della chiave DES); None = KeyError
+        Returns:
+            array booleano di len(wires) elementi
+        """
+        bits = model if isinstance(model, np.ndarray) and model.dtype == bool else self.bits(model)
+        idx, absent = self._indices(wires, missing)
+        values = bits[idx]
+        values[absent] = bool(missing)
+        return values
+
+    def values(self, model, wires: Sequence[str], missing: Optional[bool] = None) -> Dict[str, bool]:
+        """Come wires(), ma ritorna il dizionario wire -> bool."""
+        return dict(zip(wires, self.wires(model, wires, missing).tolist()))
+
+    def word(self, model, wires: Sequence[str], missing: Optional[bool] = None) -> int:
+        """Intero formato dalle wire (la prima è il bit più significativo)."""
+        return bits_to_int(self.wires(model, wires, missing))
+
+    def hex(self, model, wires: Sequence[str], missing: Optional[bool] = None) -> str:
+        """Come word(), in esadecimale maiuscolo con una cifra ogni 4 wire."""
+        return format(self.word(model, wires, missing), f"0{(len(wires) + 3) // 4}X")
+
+    def decode(self, model, groups: Dict[str, Sequence[str]], missing: Optional[bool] = None) -> Dict[str, int]:
+        """
+        Decodifica più gruppi di wire dallo stesso modello.
+
+        Args:
+            groups: nome -> wire del gruppo (es. {'key': [...], 'pt': [...]})
+        Returns:
+            nome -> intero
+        """
+        bits = self.bits(model)
+        return {name: self.word(bits, wires, missing) for name, wires in groups.items()}
+
+    def words_many(self, models: Sequence[Sequence[int]], wires: Sequence[str],
+                   missing: Optional[bool] = None) -> List[int]:
+        """
+        Decodifica lo stesso gruppo di wire da molti modelli (es. tutte le
+        chiavi enumerate) con un'unica matrice modelli x variabili.
+        """
+        if not models:
+            return []
+        arrays = [np.asarray(m, dtype=np.int64) for m in models]
+        n = max([self.num_vars] + [int(np.abs(a).max(initial=0)) for a in arrays])
+        matrix = np.zeros((len(models), n + 1), dtype=bool)
+        for row, lits in zip(matrix, arrays):
+            row[np.abs(lits)] = lits > 0
+        idx, absent = self._indices(wires, missing)
+        cols = matrix[:, idx]
+        cols[:, absent] = bool(missing)
+        pad = (-len(wires)) % 8
+        if pad:
+            cols = np.concatenate([np.zeros((len(models), pad), dtype=bool), cols], axis=1)
+        packed = np.packbits(cols, axis=1)
+        return [int.from_bytes(r.tobytes(), 'big') for r in packed]
+
+
+def decode_block(model: Sequence[int], var_map: Dict[str, int], prefix: str, width: int = 64) -> int:
+    """
+    Blocco a `width` bit formato dalle wire prefix0..prefix{width-1} (come
+    multi_des.wires_to_block: prefix0 è il bit più significativo, le wire
+    assenti valgono 0).
+    """
+    return ModelDecoder(var_map).word(model, [f"{prefix}{i}" for i in range(width)], missing=False)
+
+
+def decode_probes(
+    circuit: Circuit,
+    model: Sequence[int],
+    var_map: Optional[Dict[str, int]] = None,
+    names: Optional[Sequence[str]] = None
+) -> Dict[str, List[bool]]:
+    """
+    Valori delle sonde del circuito (Circuit.add_probe) in un modello SAT.
+
+    Args:
+        circuit: circuito con le sonde
+        model: modello SAT
+        var_map: numerazione usata nella codifica (default: index_wires(circuit))
+        names: sonde da leggere (default: tutte)
+    Returns:
+        sonda -> lista di bool (per un intero: ModelDecoder.decode(model, circuit.probes))
+    """
+    decoder = ModelDecoder(index_wires(circuit) if var_map is None else var_map)
+    bits = decoder.bits(model)
+    names = list(circuit.probes) if names is None else names
+    return {n: decoder.wires(bits, circuit.probes[n]).tolist() for n in names}
@@ -1,5 +1,7 @@
+import functools
 import circuitgraph as cg
-from archive.ExtendedCircuitgraph_0 import manual_tseitin_cnf, simulate_circuit
+from archive.ExtendedCircuitgraph_0 import manual_tseitin_cnf
+from new_ExtendedCircuitgraph import Circuit
 
 DEBUG = True
 
@@ -287,21 +289,73 @@ def create_des_circuit(plaintext_hex, key_hex):
     # debug_print("[DEBUG] Circuit creato con", len(circuit.nodes()), "nodi.")
     return circuit, input_wires, output_wires
 
+@functools.lru_cache(maxsize=None)
+def des_structure():
+    """
+    Circuito DES indipendente da plaintext e chiave (Circuit di
+    new_ExtendedCircuitgraph), costruito una sola volta e condiviso:
+    plaintext e chiave sono solo ingressi della simulazione.
+    Il circuito restituito non va modificato.
+
+    Returns:
+        (circuit, input_wires, key_wires, output_wires)
+    """
+    circuit = Circuit()
+    input_wires = [f"plaintext_{i}" for i in range(64)]
+    key_wires = [f"key_{i}" for i in range(64)]
+    for wire in input_wires + key_wires:
+        circuit.wires.setdefault(wire, {})
+    output_wires = des_block(circuit, input_wires, key_wires)
+    return circuit, input_wires, key_wires, output_wires
+
+@functools.lru_cache(maxsize=None)
+def _des_function():
+    # Simulatore compilato del circuito DES (vedi Circuit.compile)
+    circuit, _, _, output_wires = des_structure()
+    return circuit.compile(output_wires)
+
+def _bit_words(values, wires, width):
+    # Parole bit-sliced: il bit j della parola del wire i è il bit i (MSB
+    # first) del j-esimo valore
+    words = {}
+    for i, wire in enumerate(wires):
+        shift = 63 - i
+        words[wire] = sum(((v >> shift) & 1) << j for j, v in enumerate(values)) if width > 1 \
+            else (values[0] >> shift) & 1
+    return words
+
 def des_encrypt(plaintext_hex, key_hex):
-    circuit, input_wires, output_wires = create_des_circuit(plaintext_hex, key_hex)
-    plaintext_bin = bin(int(plaintext_hex, 16))[2:].zfill(64)
-    key_bin = bin(int(key_hex, 16))[2:].zfill(64)
-    input_values = {}
-    # Assegna valori costanti globali
-    input_values["CONST0"] = False
-    input_values["CONST1"] = True
-    for i, bit in enumerate(plaintext_bin):
-        input_values[f"plaintext_{i}"] = (bit == '1')
-    for i, bit in enumerate(key_bin):
-        input_values[f"key_{i}"] = (bit == '1')
-    sim_results = simulate_circuit(circuit, input_values)
-    debug_round1 = {node: sim_results[node] for node in sim_results if node.startswith("r1_")}
-    # debug_print("[DEBUG] Stato simulazione round 1:", debug_round1)
-    output_bits = "".join("1" if sim_results[wire] else "0" for wire in output_wires)
-    ciphertext_hex = hex(int(output_bits, 2))[2:].upper().zfill(16)
-    return ciphertext_hex
+    return des_encrypt_batch([plaintext_hex], key_hex)[0]
+
+def des_encrypt_batch(plaintexts_hex, key_hex):
+    """
+    Cifra molti blocchi in una sola simulazione bit-sliced del circuito DES:
+    ogni wire porta un intero con un bit per blocco.
+
+    Args:
+        plaintexts_hex: lista di plaintext esadecimali (16 cifre)
+        key_hex: chiave esadecimale comune, oppure lista di chiavi (una per blocco)
+    Returns:
+        lista dei ciphertext esadecimali in maiuscolo
+    """
+    n = len(plaintexts_hex)
+    if n == 0:
+        return []
+    keys_hex = [key_hex] * n if isinstance(key_hex, str) else list(key_hex)
+    if len(keys_hex) != n:
+        raise ValueError("Servono tante chiavi quanti plaintext")
+    circuit, input_wires, key_wires, output_wires = des_structure()
+    words = _bit_words([int(p, 16) for p in plaintexts_hex], input_wires, n)
+    words.update(_bit_words([int(k, 16) for k in keys_hex], key_wires, n))
+    # Costanti globali usate dalle S-Box con colonne nulle
+    words["CONST0"] = 0
+    words["CONST1"] = (1 << n) - 1
+    out = _des_function()(words, n)
+    out_words = [out[wire] for wire in output_wires]
+    ciphertexts = []
+    for j in range(n):
+        value = 0
+        for word in out_words:
+            value = (value << 1) | ((word >> j) & 1)
+        ciphertexts.append(f"{value:016X}")
+    return ciphertexts
@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+import numpy as np
+
 # Funzioni di utilità per conversione tra esadecimale e binario
 def hex_to_bin(hexstr):
     """Converte una stringa esadecimale in una stringa binaria con padding opportuno."""
@@ -209,17 +213,26 @@ def f_function(R, subkey):
     final_result = permute(sbox_result, P_TABLE)
     return final_result
 
-def des_encrypt(plaintext_hex, key_hex):
+def _check_rounds(n_rounds):
+    """Il DES ha 16 sottochiavi: n_rounds deve stare tra 0 e 16."""
+    if not 0 <= n_rounds <= 16:
+        raise ValueError(f"n_rounds deve essere compreso tra 0 e 16, non {n_rounds}")
+
+def des_encrypt_reference(plaintext_hex, key_hex, n_rounds=16):
     """
-    Esegue l'encryption DES su un blocco di 64 bit.
+    Esegue l'encryption DES su un blocco di 64 bit, rappresentando lo stato
+    come stringhe di bit (implementazione di riferimento, lenta).
     
     Parametri:
       - plaintext_hex: stringa esadecimale di 16 caratteri (64 bit).
       - key_hex: stringa esadecimale di 16 caratteri (64 bit).
+      - n_rounds: numero di round (16 per il DES completo); con meno round
+        si applicano comunque lo swap finale e la permutazione FP.
     
     Ritorna:
       - ciphertext_hex: stringa esadecimale di 16 caratteri con il ciphertext.
     """
+    _check_rounds(n_rounds)
     # Conversione in binario a 64 bit
     plaintext_bin = hex_to_bin(plaintext_hex)
     key_bin = hex_to_bin(key_hex)
@@ -232,15 +245,15 @@ def des_encrypt(plaintext_hex, key_hex):
     # Genera le 16 sottochiavi (48 bit ciascuna)
     subkeys = generate_subkeys(key_bin)
     
-    # Esegue 16 round
-    for i in range(16):
+    # Esegue n_rounds round
+    for i in range(n_rounds):
         temp = R
         # Calcola f(R, subkey)
         f_out = f_function(R, subkeys[i])
         # Nuovo R è dato da L XOR f(R, subkey)
         R = xor(L, f_out)
         L = temp
-    # Dopo 16 round, il preoutput è la concatenazione di R e L (swap finale)
+    # Dopo l'ultimo round, il preoutput è la concatenazione di R e L (swap finale)
     preoutput = R + L
     # Applica la permutazione finale (FP)
     cipher_bin = permute(preoutput, FP)
@@ -249,6 +262,263 @@ def des_encrypt(plaintext_hex, key_hex):
     ciphertext_hex = bin_to_hex(cipher_bin)
     return ciphertext_hex
 
+############################################
+# DES SU INTERI CON TABELLE PRECALCOLATE
+############################################
+#
+# Lo stato è un intero (bit 1 delle tabelle DES = bit più significativo).
+# Ogni permutazione è precalcolata byte per byte: per il byte b dell'ingresso
+# e ogni suo valore v, la tabella contiene i bit d'uscita prodotti da v, e la
+# permutazione è l'OR di una lettura per byte. Le S-Box sono fuse con la
+# permutazione P (tabelle SP): 8 letture danno direttamente l'uscita di f.
+
+def _permute_int(x, table, in_bits):
+    """Permutazione bit a bit di un intero di in_bits bit (tabella 1-indexed)."""
+    out = 0
+    for pos in table:
+        out = (out << 1) | ((x >> (in_bits - pos)) & 1)
+    return out
+
+def _byte_tables(table, in_bits):
+    """Tabelle per byte della permutazione: lista di (shift, tabella da 256 voci)."""
+    tables = []
+    for b in range(in_bits // 8):
+        shift = in_bits - 8 * (b + 1)
+        tables.append((shift, [_permute_int(v << shift, table, in_bits) for v in range(256)]))
+    return tables
+
+def _apply_tables(tables, x):
+    out = 0
+    for shift, t in tables:
+        out |= t[(x >> shift) & 0xFF]
+    return out
+
+_IP_TABLES = _byte_tables(IP, 64)
+_FP_TABLES = _byte_tables(FP, 64)
+_PC1_TABLES = _byte_tables(PC1, 64)
+_PC2_TABLES = _byte_tables(PC2, 56)
+_E_TABLES = _byte_tables(EXPANSION, 32)
+# _SP[i][x]: uscita di f (dopo P) dovuta alla sola S-Box i con ingresso x a 6 bit
+_SP = [
+    [_permute_int(box[((x >> 4) & 2) | (x & 1)][(x >> 1) & 15] << (28 - 4 * i), P_TABLE, 32)
+     for x in range(64)]
+    for i, box in enumerate(S_BOX)
+]
+
+@lru_cache(maxsize=4096)
+def key_schedule(key):
+    """
+    Le 16 sottochiavi (interi a 48 bit) della chiave intera a 64 bit.
+    Il risultato è in cache: cifrare molti blocchi con la stessa chiave
+    calcola il key schedule una sola volta.
+    """
+    key56 = _apply_tables(_PC1_TABLES, key)
+    C, D = key56 >> 28, key56 & 0xFFFFFFF
+    subkeys = []
+    for shift in SHIFT_SCHEDULE:
+        C = ((C << shift) | (C >> (28 - shift))) & 0xFFFFFFF
+        D = ((D << shift) | (D >> (28 - shift))) & 0xFFFFFFF
+        subkeys.append(_apply_tables(_PC2_TABLES, (C << 28) | D))
+    return tuple(subkeys)
+
+def des_encrypt_block(plaintext, key, n_rounds=16):
+    """
+    Variante di des_encrypt su interi a 64 bit (bit 63 = primo bit del blocco).
+
+    Parametri:
+      - plaintext: intero a 64 bit.
+      - key: intero a 64 bit.
+      - n_rounds: numero di round.
+
+    Ritorna:
+      - ciphertext come intero a 64 bit.
+    """
+    _check_rounds(n_rounds)
+    sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = _SP
+    e_tables = _E_TABLES
+    block = _apply_tables(_IP_TABLES, plaintext)
+    L, R = block >> 32, block & 0xFFFFFFFF
+    for k in key_schedule(key)[:n_rounds]:
+        e = k
+        for shift, t in e_tables:
+            e ^= t[(R >> shift) & 0xFF]
+        f = (sp0[e >> 42] | sp1[(e >> 36) & 63] | sp2[(e >> 30) & 63] | sp3[(e >> 24) & 63] |
+             sp4[(e >> 18) & 63] | sp5[(e >> 12) & 63] | sp6[(e >> 6) & 63] | sp7[e & 63])
+        L, R = R, L ^ f
+    return _apply_tables(_FP_TABLES, (R << 32) | L)
+
+def des_encrypt(plaintext_hex, key_hex, n_rounds=16):
+    """
+    Esegue l'encryption DES su un blocco di 64 bit (implementazione su interi,
+    stesso risultato di des_encrypt_reference).
+
+    Parametri:
+      - plaintext_hex: stringa esadecimale di 16 caratteri (64 bit).
+      - key_hex: stringa esadecimale di 16 caratteri (64 bit).
+      - n_rounds: numero di round (16 per il DES completo); con meno round
+        si applicano comunque lo swap finale e la permutazione FP.
+
+    Ritorna:
+      - ciphertext_hex: stringa esadecimale di 16 caratteri con il ciphertext.
+    """
+    ciphertext = des_encrypt_block(int(plaintext_hex, 16), int(key_hex, 16), n_rounds)
+    return format(ciphertext, '016X')
+
+############################################
+# DES BITSLICED SU NUMPY (MOLTI BLOCCHI INSIEME)
+############################################
+#
+# Lo stato è una matrice di 64 righe (una per bit del blocco, riga 0 = bit 1
+# delle tabelle DES) di parole uint64: il bit j della parola w della riga i
+# è il bit i del blocco 64*w + j. Le permutazioni diventano semplici
+# riordinamenti di righe e le S-Box vengono valutate come funzioni booleane
+# dei 6 bit di ingresso, così ogni operazione NumPy lavora su 64 blocchi per
+# parola.
+
+def _subkey_bit_indices():
+    """
+    Per ogni round, gli indici (0-based) dei bit della chiave a 64 bit che
+    formano i 48 bit della sottochiave: il key schedule senza la chiave.
+    """
+    key56 = [i - 1 for i in PC1]
+    C, D = key56[:28], key56[28:]
+    schedule = []
+    for shift in SHIFT_SCHEDULE:
+        C = left_shift(C, shift)
+        D = left_shift(D, shift)
+        combined = C + D
+        schedule.append([combined[i - 1] for i in PC2])
+    return schedule
+
+def _sbox_plan(box):
+    """
+    Forma somma di prodotti di una S-Box: l'ingresso x = b0..b5 (b0 più
+    significativo) è diviso in h = b0b1b2 e l = b3b4b5. Per ogni bit di
+    uscita (0 = più significativo) ritorna le coppie (h, maschera degli l)
+    per cui il bit vale 1.
+    """
+    table = [box[((x >> 4) & 2) | (x & 1)][(x >> 1) & 15] for x in range(64)]
+    plan = []
+    for k in range(4):
+        terms = []
+        for h in range(8):
+            mask = sum(1 << l for l in range(8) if (table[(h << 3) | l] >> (3 - k)) & 1)
+            if mask:
+                terms.append((h, mask))
+        plan.append(terms)
+    return plan
+
+_SUBKEY_BITS = _subkey_bit_indices()
+_SBOX_PLANS = [_sbox_plan(box) for box in S_BOX]
+
+def _decode3(x, y, z):
+    """I mintermini di tre bit: l'elemento i vale 1 dove (x, y, z) = i (x più significativo)."""
+    nx, ny, nz = ~x, ~y, ~z
+    pairs = [nx & ny, nx & y, x & ny, x & y]
+    out = []
+    for p in pairs:
+        out.append(p & nz)
+        out.append(p & z)
+    return out
+
+def _sbox_bitsliced(plan, b):
+    """Valuta una S-Box sui 6 bit b (righe uint64); ritorna i 4 bit di uscita."""
+    hi = _decode3(b[0], b[1], b[2])
+    lo = _decode3(b[3], b[4], b[5])
+    lo_or = {}
+
+    def lo_union(mask):
+        # OR dei mintermini bassi in mask; per maschere grandi conviene il
+        # complemento dell'OR degli altri (i mintermini sono disgiunti)
+        if mask not in lo_or:
+            if mask == 255:
+                lo_or[mask] = None
+            else:
+                members = mask if bin(mask).count('1') <= 4 else 255 ^ mask
+                acc = None
+                for l in range(8):
+                    if (members >> l) & 1:
+                        acc = lo[l] if acc is None else acc | lo[l]
+                lo_or[mask] = acc if members == mask else ~acc
+        return lo_or[mask]
+
+    outs = []
+    for terms in plan:
+        acc = np.zeros_like(b[0])
+        for h, mask in terms:
+            sel = lo_union(mask)
+            acc |= hi[h] if sel is None else hi[h] & sel
+        outs.append(acc)
+    return outs
+
+def _to_bitslices(blocks, n_words):
+    """Blocchi uint64 (N,) -> matrice (64, n_words) di bit-slice."""
+    bits = np.unpackbits(blocks.astype('>u8').view(np.uint8).reshape(-1, 8), axis=1)
+    padded = np.zeros((64, n_words * 64), dtype=np.uint8)
+    padded[:, :len(blocks)] = bits.T
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+def _from_bitslices(slices, n):
+    """Inversa di _to_bitslices: matrice (64, W) -> blocchi uint64 (N,)."""
+    bits = np.unpackbits(np.ascontiguousarray(slices, dtype='<u8').view(np.uint8),
+                         axis=1, bitorder='little')[:, :n]
+    return np.packbits(np.ascontiguousarray(bits.T), axis=1).view('>u8').reshape(-1).astype(np.uint64)
+
+def _des_bitsliced_words(pt_rows, key_rows, n_rounds):
+    """
+    Cifratura sulle bit-slice. pt_rows: 64 righe del plaintext; key_rows: 64
+    righe della chiave (array o scalari uint64 se la chiave è unica).
+    Ritorna le 64 righe del ciphertext.
+    """
+    state = [pt_rows[i - 1] for i in IP]
+    L, R = state[:32], state[32:]
+    for rnd in range(n_rounds):
+        sub = _SUBKEY_BITS[rnd]
+        expanded = [R[e - 1] ^ key_rows[sub[j]] for j, e in enumerate(EXPANSION)]
+        sbox_out = []
+        for i, plan in enumerate(_SBOX_PLANS):
+            sbox_out.extend(_sbox_bitsliced(plan, expanded[6 * i:6 * i + 6]))
+        L, R = R, [L[j] ^ sbox_out[p - 1] for j, p in enumerate(P_TABLE)]
+    preoutput = R + L
+    return [preoutput[i - 1] for i in FP]
+
+def des_encrypt_bitsliced(plaintexts, keys, n_rounds=16, chunk_words=1024):
+    """
+    Cifra N blocchi insieme con DES bitsliced (64 blocchi per parola uint64).
+
+    Parametri:
+      - plaintexts: sequenza o array di N interi a 64 bit (come des_encrypt_block).
+      - keys: un'unica chiave intera a 64 bit oppure N chiavi.
+      - n_rounds: numero di round.
+      - chunk_words: parole (da 64 blocchi) elaborate per volta.
+
+    Ritorna:
+      - array uint64 di N ciphertext.
+    """
+    _check_rounds(n_rounds)
+    blocks = np.asarray(plaintexts, dtype=np.uint64).reshape(-1)
+    n = len(blocks)
+    single_key = np.ndim(keys) == 0
+    if single_key:
+        key = int(keys)
+        ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+        key_rows = [ones if (key >> (63 - i)) & 1 else np.uint64(0) for i in range(64)]
+    else:
+        key_blocks = np.asarray(keys, dtype=np.uint64).reshape(-1)
+        if len(key_blocks) != n:
+            raise ValueError("keys deve contenere una chiave o una chiave per blocco")
+    out = np.empty(n, dtype=np.uint64)
+    step = chunk_words * 64
+    for start in range(0, n, step):
+        chunk = blocks[start:start + step]
+        n_words = (len(chunk) + 63) // 64
+        pt_rows = _to_bitslices(chunk, n_words)
+        if not single_key:
+            key_rows = _to_bitslices(key_blocks[start:start + step], n_words)
+        ct_rows = _des_bitsliced_words(pt_rows, key_rows, n_rounds)
+        out[start:start + step] = _from_bitslices(np.stack(ct_rows), len(chunk))
+    return out
+
 ############################################
 # ESECUZIONE DI UN TEST DI DES
 ############################################
@@ -0,0 +1,250 @@
+# equivalence.py
+"""
+Verifica di equivalenza tra due Circuit tramite miter.
+
+Il miter collega gli ingressi corrispondenti dei due circuiti e confronta
+ogni coppia di uscite con una XOR (wire di differenza): i circuiti sono
+equivalenti se nessuna differenza può valere 1. La verifica procede in quattro
+passi, dal più economico al più costoso:
+
+1. simulazione bit-parallela casuale (BitSimulator): una differenza a 1
+   fornisce subito un controesempio;
+2. hashing strutturale del miter: gate con lo stesso tipo e gli stessi
+   ingressi vengono fuse, e le uscite che finiscono sullo stesso
+   rappresentante sono equivalenti senza bisogno del solver;
+3. SAT sweeping (sweeping.py) del miter ridotto: le equivalenze tra wire
+   interne dei due circuiti vengono dimostrate dal basso verso l'alto, così
+   le differenze in uscita diventano costanti senza prove profonde;
+4. SAT incrementale sulle differenze rimaste, una per volta su un'unica
+   SolverSession; ogni equivalenza dimostrata viene aggiunta come vincolo
+   e aiuta le prove successive.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bitsim import BitSimulator
+from new_ExtendedCircuitgraph import Circuit
+from solver import SolverSession, UNKNOWN
+from sweeping import CONST, apply_equivalences, sweep_equivalences
+
+# Gate il cui valore non dipende dall'ordine degli ingressi
+_COMMUTATIVE = {'AND', 'OR', 'XOR', 'NAND', 'NOR', 'XNOR', 'MAJ'}
+
+
+class EquivalenceResult:
+    """
+    Esito di check_equivalence; vale True solo se l'equivalenza è dimostrata.
+    Attributes:
+        equivalent: True, False oppure UNKNOWN (None) se qualche prova SAT
+            ha superato il timeout
+        counterexample: ingressi del miter (nomi del circuito a) che
+            distinguono i circuiti, None se equivalenti
+        differing: coppie di uscite (a, b) diverse sul controesempio, oppure
+            non decise se equivalent è UNKNOWN
+        method: passo che ha deciso ('simulazione', 'strutturale',
+            'sweeping', 'sat')
+        proved: numero di coppie di uscite dimostrate per ciascun passo
+    """
+    def __init__(self, equivalent: Optional[bool], counterexample: Optional[Dict[str, bool]],
+                 differing: List[Tuple[str, str]], method: str, proved: Dict[str, int]):
+        self.equivalent = equivalent
+        self.counterexample = counterexample
+        self.differing = differing
+        self.method = method
+        self.proved = proved
+
+    def __bool__(self) -> bool:
+        return self.equivalent is True
+
+    def __repr__(self) -> str:
+        label = {True: 'equivalenti', False: 'diversi', None: 'UNKNOWN'}[self.equivalent]
+        return f"EquivalenceResult({label}, metodo={self.method}, dimostrate={self.proved}, diverse={self.differing[:5]})"
+
+
+def build_miter(
+    a: Circuit,
+    b: Circuit,
+    input_map: Optional[Dict[str, str]] = None,
+    output_map: Optional[Sequence[Tuple[str, str]]] = None
+) -> Tuple[Circuit, List[Tuple[str, str, str]]]:
+    """
+    Costruisce il miter di due circuiti.
+
+    Args:
+        a, b: circuiti da confrontare
+        input_map: ingresso di a -> ingresso di b collegati insieme
+            (default: gli ingressi con lo stesso nome); gli ingressi non
+            collegati restano liberi
+        output_map: coppie (uscita di a, uscita di b) da confrontare
+            (default: le uscite con lo stesso nome)
+    Returns:
+        (miter, lista di (wire di differenza, uscita di a, uscita di b));
+        gli ingressi collegati mantengono il nome che hanno in a, le altre
+        wire sono prefissate con 'a:' e 'b:'
+    """
+    if input_map is None:
+        b_inputs = set(b.inputs())
+        input_map = {w: w for w in a.inputs() if w in b_inputs}
+    if output_map is None:
+        b_outputs = set(b.outputs())
+        output_map = [(w, w) for w in a.outputs() if w in b_outputs]
+    if not output_map:
+        raise ValueError("Nessuna coppia di uscite da confrontare")
+    for w in list(input_map) + [o for o, _ in output_map]:
+        if w not in a.wires:
+            raise KeyError(f"Wire {w} non trovato nel circuito a")
+    for w in list(input_map.values()) + [o for _, o in output_map]:
+        if w not in b.wires:
+            raise KeyError(f"Wire {w} non trovato nel circuito b")
+    b_to_a = {wb: wa for wa, wb in input_map.items()}
+
+    def name_a(w: str) -> str:
+        return w if w in input_map else f"a:{w}"
+
+    def name_b(w: str) -> str:
+        return b_to_a.get(w, f"b:{w}")
+
+    miter = Circuit()
+    for circuit, rename in ((a, name_a), (b, name_b)):
+        for w in circuit.wires:
+            miter.wires.setdefault(rename(w), {})
+        for g in circuit.gates:
+            miter.add_gate(g.gate_type, [rename(w) for w in g.inputs], rename(g.output))
+    diffs = []
+    for i, (wa, wb) in enumerate(output_map):
+        diff = f"miter_diff{i}"
+        miter.add_gate('XOR', [name_a(wa), name_b(wb)], diff)
+        diffs.append((diff, wa, wb))
+    return miter, diffs
+
+
+def strash(circuit: Circuit) -> Tuple[Circuit, Dict[str, str]]:
+    """
+    Hashing strutturale: fonde le gate con lo stesso tipo e gli stessi
+    ingressi (a meno dell'ordine per le gate commutative) e salta le BUF.
+
+    Returns:
+        (circuito ridotto, mappa wire -> rappresentante nel circuito ridotto)
+    """
+    rep: Dict[str, str] = {w: w for w in circuit.inputs()}
+    table: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+    reduced = Circuit()
+    for w in circuit.inputs():
+        reduced.wires.setdefault(w, {})
+    for g in circuit.topo_sort():
+        ins = [rep[w] for w in g.inputs]
+        if g.gate_type == 'BUF':
+            rep[g.output] = ins[0]
+            continue
+        key = (g.gate_type, tuple(sorted(ins) if g.gate_type in _COMMUTATIVE else ins))
+        if key not in table:
+            table[key] = g.output
+            reduced.add_gate(g.gate_type, ins, g.output)
+        rep[g.output] = table[key]
+    return reduced, rep
+
+
+def _random_counterexample(
+    miter: Circuit,
+    diffs: List[Tuple[str, str, str]],
+    n_vectors: int,
+    seed: Optional[int]
+) -> Optional[Tuple[Dict[str, bool], List[Tuple[str, str]]]]:
+    """Simulazione casuale del miter: primo vettore che distingue i circuiti."""
+    sim = BitSimulator(miter)
+    rng = np.random.default_rng(seed)
+    vectors = {w: rng.random(n_vectors) < 0.5 for w in sim.inputs}
+    values = sim.simulate(vectors, [d for d, _, _ in diffs])
+    hits = np.zeros(n_vectors, dtype=bool)
+    for d, _, _ in diffs:
+        hits |= values[d]
+    if not hits.any():
+        return None
+    j = int(np.argmax(hits))
+    cex = {w: bool(vectors[w][j]) for w in sim.inputs}
+    return cex, [(wa, wb) for d, wa, wb in diffs if values[d][j]]
+
+
+def check_equivalence(
+    a: Circuit,
+    b: Circuit,
+    input_map: Optional[Dict[str, str]] = None,
+    output_map: Optional[Sequence[Tuple[str, str]]] = None,
+    n_vectors: int = 4096,
+    seed: Optional[int] = None,
+    backend: str = 'g3',
+    timeout: Optional[float] = None,
+    sweep: bool = True
+) -> EquivalenceResult:
+    """
+    Decide se due circuiti sono equivalenti sulle uscite corrispondenti.
+
+    Args:
+        a, b: circuiti da confrontare
+        input_map, output_map: corrispondenze di ingressi e uscite (vedi build_miter)
+        n_vectors: vettori della simulazione casuale iniziale (0 = nessuna)
+        seed: seme della simulazione
+        backend: solver pysat della fase SAT
+        timeout: tempo massimo in secondi per ciascuna prova SAT
+        sweep: se True, prima delle prove per uscita esegue lo SAT sweeping
+            (sweeping.py) sul miter ridotto
+    Returns:
+        EquivalenceResult
+    """
+    miter, diffs = build_miter(a, b, input_map, output_map)
+    proved = {'strutturale': 0, 'sweeping': 0, 'sat': 0}
+
+    # 1) Simulazione casuale
+    if n_vectors:
+        found = _random_counterexample(miter, diffs, n_vectors, seed)
+        if found is not None:
+            return EquivalenceResult(False, found[0], found[1], 'simulazione', proved)
+
+    # 2) Hashing strutturale: uscite che coincidono nel circuito ridotto
+    reduced, rep = strash(miter)
+    diff_inputs = {g.output: g.inputs for g in miter.gates[-len(diffs):]}
+    pending = []
+    for diff, wa, wb in diffs:
+        ra, rb = (rep[w] for w in diff_inputs[diff])
+        if ra == rb:
+            proved['strutturale'] += 1
+        else:
+            pending.append((rep[diff], wa, wb))
+    if not pending:
+        return EquivalenceResult(True, None, [], 'strutturale', proved)
+
+    # 3) SAT sweeping del miter ridotto: le equivalenze interne dimostrate
+    #    dal basso verso l'alto rendono banali le differenze in uscita
+    circuit = reduced
+    if sweep:
+        equivalences = sweep_equivalences(reduced, seed=seed, backend=backend)
+        still = []
+        for diff, wa, wb in pending:
+            if equivalences.get(diff) == (CONST, False):
+                proved['sweeping'] += 1
+            else:
+                still.append((diff, wa, wb))
+        pending = still
+        if not pending:
+            return EquivalenceResult(True, None, [], 'sweeping', proved)
+        circuit = apply_equivalences(reduced, equivalences, keep=[d for d, _, _ in pending])
+
+    # 4) SAT incrementale su ogni differenza rimasta
+    undecided = []
+    with SolverSession(circuit, backend) as session:
+        for diff, wa, wb in pending:
+            sat, model = session.solve(fixed_outputs={diff: True}, timeout=timeout)
+            if sat is UNKNOWN:
+                undecided.append((wa, wb))
+            elif sat:
+                cex = {w: session.value(model, w) if w in session.var_map else False
+                       for w in miter.inputs()}
+                differing = [(xa, xb) for d, xa, xb in pending if session.value(model, d)]
+                return EquivalenceResult(False, cex, differing, 'sat', proved)
+            else:
+                proved['sat'] += 1
+                session.add_constraint({diff: False})
+    if undecided:
+        return EquivalenceResult(UNKNOWN, None, undecided, 'sat', proved)
+    return EquivalenceResult(True, None, [], 'sat', proved)
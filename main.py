@@ -1,33 +1,57 @@
 #!/usr/bin/env python3
 # main.py
 
-import sys
-from multi_des_cnf import create_multi_des_cnf
-from partial_sat_solver import solve_partial
+import argparse
+import time
+from multi_des import build_multi_des, random_des_pairs
+from solver import is_satisfiable, UNKNOWN
+from solve_stats import write_jsonl
+from sat_cache import SatCache
+from validation import validate_model
+from decoding import decode_block
+from new_circuit_to_cnf import index_wires
 
-def run_experiment(pairs, rounds):
-    print(f"\n--- Esperimento DES x{len(pairs)} con {rounds} round ---")
-    cnf = create_multi_des_cnf(pairs, rounds)
-    # qui non ci sono variabili “remaining” da fissare, salvo la chiave,
-    # perciò passiamo un dict vuoto: vogliamo sapere se esiste k.
-    sat, rem = solve_partial(lambda: cnf, {})
-    if sat:
-        print("→ SAT: esiste chiave k compatibile!")
-        print("   Assegnamento parziale chiave:", rem)
+def run_experiment(key, n_pairs, rounds, timeout, stats_file=None, cache=None):
+    print(f"\n--- Esperimento DES x{n_pairs} con {rounds} round ---")
+    pairs = random_des_pairs(key, n_pairs, rounds, seed=rounds)
+    circ, fixed_in, fixed_out = build_multi_des(pairs, rounds)
+    # La chiave resta libera: vogliamo sapere se esiste k compatibile con
+    # tutte le coppie entro il tempo concesso.
+    start = time.perf_counter()
+    sat, model, stats = is_satisfiable(circ, fixed_in, fixed_out, timeout=timeout,
+                                      return_stats=True, cache=cache)
+    elapsed = time.perf_counter() - start
+    if stats_file:
+        stats.tags.update({'rounds': rounds, 'pairs': n_pairs, 'timeout': timeout})
+        write_jsonl([stats], stats_file)
+    if sat is UNKNOWN:
+        print(f"→ UNKNOWN: nessuna risposta entro {timeout:.0f} s")
+    elif sat:
+        found = decode_block(model, index_wires(circ), 'k')
+        print(f"→ SAT: esiste chiave k compatibile! ({elapsed:.2f} s) k={found:016X}")
+        # Il modello viene confermato simulando il circuito con la chiave trovata
+        report = validate_model(circ, model, fixed_in, fixed_out)
+        print(f"  modello verificato su {report.checked} vincoli" if report else f"  ATTENZIONE: {report}")
     else:
-        print("→ UNSAT: non si riesce a forzare DES in", rounds, "round.")
+        print(f"→ UNSAT: nessuna chiave compatibile in {rounds} round ({elapsed:.2f} s)")
 
 if __name__ == "__main__":
-    # Esempio di coppie generate dal tuo encrypt DES
-    sample_pairs = [
-        ("0123456789ABCDEF", "85E813540F0AB405"),
-        ("1111111111111111", "F40379AB9E0EC533"),
-        # aggiungi fino a n
-    ]
+    parser = argparse.ArgumentParser(description="Attacco SAT a DES con round ridotti")
+    parser.add_argument('--pairs', type=int, default=2)
+    parser.add_argument('--max-rounds', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help="tempo massimo per round in secondi")
+    parser.add_argument('--stats', default=None,
+                        help="file JSON lines a cui aggiungere le statistiche di ogni round")
+    parser.add_argument('--cache', default=None,
+                        help="database SQLite dei risultati già calcolati")
+    args = parser.parse_args()
 
-    # 1) 16 round “vero”:
-    run_experiment(sample_pairs, rounds=16)
-
-    # 2) giro di “round ridotti” da 1 a 15
-    for r in range(1, 16):
-        run_experiment(sample_pairs, rounds=r)
+    key = 0x133457799BBCDFF1
+    # giro di "round ridotti" da 1 a max-rounds: i round alti terminano
+    # con UNKNOWN allo scadere del timeout invece di bloccare il programma
+    cache = SatCache(args.cache) if args.cache else None
+    for r in range(1, args.max_rounds + 1):
+        run_experiment(key, args.pairs, r, args.timeout, args.stats, cache)
+    if cache is not None:
+        print("\nCache:", cache.stats())
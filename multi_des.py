@@ -4,20 +4,25 @@ Costruzione di un circuito composto da più istanze di DES
 sulla base della libreria Circuit e del builder build_des_instance.
 """
 
-from typing import List, Tuple, Dict
+import random
+from typing import Iterable, List, Optional, Tuple, Dict
 from new_ExtendedCircuitgraph import Circuit
 from multi_des_cnf import build_des_instance  # signature: (circuit, pt_wires, ct_wires, key_wires, rounds, inst_prefix)
 from solver import is_satisfiable
-from des_python import des_encrypt_block
+from des_python import des_encrypt_bitsliced, des_encrypt_block
 
-def clone_circuit_with_prefix(circuit: Circuit, prefix: str) -> Circuit:
+def clone_circuit_with_prefix(circuit: Circuit, prefix: str, shared: Iterable[str] = ()) -> Circuit:
     """
     Clona un circuito rinominando tutti i wire usando un prefisso.
+    I wire in `shared` (es. la chiave) mantengono il nome originale,
+    così da essere condivisi tra le copie.
     """
+    shared = set(shared)
+    rename = lambda w: w if w in shared else prefix + w
     new_circ = Circuit()
     for gate in circuit.gates:
-        new_inputs = [prefix + w for w in gate.inputs]
-        new_output = prefix + gate.output
+        new_inputs = [rename(w) for w in gate.inputs]
+        new_output = rename(gate.output)
         new_circ.add_gate(gate.gate_type, new_inputs, new_output)
     return new_circ
 
@@ -62,9 +67,10 @@ def build_multi_des(
             ""   # nessun prefix qui: lo gestiremo al passo successivo
         )
 
-        # 4) Rinomina i wire per evitare collisioni tra istanze
+        # 4) Rinomina i wire per evitare collisioni tra istanze;
+        #    la chiave è condivisa da tutte le istanze
         prefix = f"inst{idx}_"
-        inst = clone_circuit_with_prefix(base, prefix)
+        inst = clone_circuit_with_prefix(base, prefix, shared=key_wires)
 
         # 5) Unisci in parallelo questa istanza al circuito globale
         big_circuit = big_circuit.parallel_compose(inst)
@@ -74,9 +80,42 @@ def build_multi_des(
             fixed_inputs[prefix + w] = val
         for w, val in y_map.items():
             fixed_outputs[prefix + w] = val
+            # build_des_instance collega l'uscita del DES a ct tramite XNOR:
+            # il vincolo vale solo forzando a vero il relativo nodo eq_
+            fixed_outputs[prefix + f"eq_{w}"] = True
 
     return big_circuit, fixed_inputs, fixed_outputs
 
+def block_to_wires(value: int, prefix: str) -> Dict[str, bool]:
+    """
+    Converte un blocco a 64 bit nella mappa wire->bool (bit 63 su prefix+'0').
+    """
+    return {f"{prefix}{i}": bool(value & (1 << (63 - i))) for i in range(64)}
+
+
+def wires_to_block(values: Dict[str, bool], prefix: str) -> int:
+    """
+    Inversa di block_to_wires: ricompone il blocco a 64 bit; i wire assenti
+    (es. i bit di parità della chiave, non usati dal DES) valgono 0.
+    """
+    return sum(1 << (63 - i) for i in range(64) if values.get(f"{prefix}{i}", False))
+
+
+def random_des_pairs(
+    key: int,
+    n_pairs: int,
+    n_rounds: int = 16,
+    seed: Optional[int] = None
+) -> List[Tuple[Dict[str, bool], Dict[str, bool]]]:
+    """
+    Genera n_pairs coppie (plaintext, ciphertext) casuali cifrate con la stessa
+    chiave, nel formato accettato da build_multi_des.
+    """
+    rng = random.Random(seed)
+    pts = [rng.getrandbits(64) for _ in range(n_pairs)]
+    cts = des_encrypt_bitsliced(pts, key, n_rounds=n_rounds)
+    return [(block_to_wires(pt, "pt"), block_to_wires(int(ct), "ct")) for pt, ct in zip(pts, cts)]
+
 # Esempio di demo rapido
 # if __name__ == '__main__':
 #     example_pairs = [
@@ -2,30 +2,110 @@
 """
 Moduli per convertire un Circuit in CNF.
 """
-from typing import List, Tuple, Dict, Optional
+from collections import deque
+from typing import List, Tuple, Dict, Optional, Sequence
 from new_ExtendedCircuitgraph import Circuit  # Assicurati che il modulo sia nel PYTHONPATH
+from cardinality import CardinalityConstraint
 
 
-def index_wires(circuit: Circuit) -> Dict[str, int]:
+def index_wires(circuit: Circuit, order: str = 'name', priority: Sequence[str] = ()) -> Dict[str, int]:
     """
     Mappa ogni wire name a un indice intero 1-based.
+
+    Args:
+        circuit: istanza di Circuit
+        order: criterio di numerazione
+            - 'name': ordine alfabetico dei nomi (default)
+            - 'topo': ordine topologico; ogni cono di ingresso riceve indici
+              contigui, seguito dall'uscita della gate che pilota
+            - 'bfs': visita in ampiezza dagli ingressi primari
+              (Cuthill-McKee), che riduce la distanza tra wire adiacenti
+        priority: wire che ricevono i primi indici, nell'ordine dato (es. i
+            bit di chiave): a parità di attività i solver della famiglia
+            MiniSat decidono prima sulle variabili di indice più basso
+    Returns:
+        dizionario wire -> indice
     """
-    wires = set()
-    for gate in circuit.gates:
-        wires.update(gate.inputs)
-        wires.add(gate.output)
-    sorted_wires = sorted(wires)
+    if order == 'name':
+        wires = set(circuit.wires)
+        for gate in circuit.gates:
+            wires.update(gate.inputs)
+            wires.add(gate.output)
+        sorted_wires = sorted(wires)
+    elif order == 'topo':
+        sorted_wires = _topo_wire_order(circuit)
+    elif order == 'bfs':
+        sorted_wires = _bfs_wire_order(circuit)
+    else:
+        raise ValueError(f"Ordinamento {order} non supportato")
+    if order != 'name':
+        # Wire registrate ma non collegate ad alcuna gate, in coda
+        placed = set(sorted_wires)
+        sorted_wires += sorted(w for w in circuit.wires if w not in placed)
+    if priority:
+        first = list(dict.fromkeys(priority))
+        chosen = set(first)
+        missing = sorted(chosen - set(sorted_wires))
+        if missing:
+            raise KeyError(f"Wire {missing[0]} non trovato nel circuito")
+        sorted_wires = first + [w for w in sorted_wires if w not in chosen]
     return {w: i+1 for i, w in enumerate(sorted_wires)}
 
 
+def _topo_wire_order(circuit: Circuit) -> List[str]:
+    """
+    Ordine dei wire seguendo circuit.topo_sort(): gli ingressi di una gate
+    non ancora numerati precedono immediatamente la sua uscita.
+    """
+    seen = set()
+    ordered: List[str] = []
+    for gate in circuit.topo_sort():
+        for w in gate.inputs + [gate.output]:
+            if w not in seen:
+                seen.add(w)
+                ordered.append(w)
+    return ordered
+
+
+def _bfs_wire_order(circuit: Circuit) -> List[str]:
+    """
+    Ordine Cuthill-McKee sul grafo non orientato dei wire: visita in ampiezza
+    a partire dagli ingressi primari, espandendo prima i vicini di grado minore.
+    """
+    adjacency: Dict[str, List[str]] = {}
+    for gate in circuit.gates:
+        adjacency.setdefault(gate.output, [])
+        for w in gate.inputs:
+            adjacency.setdefault(w, []).append(gate.output)
+            adjacency[gate.output].append(w)
+    driven = {g.output for g in circuit.gates}
+    # Radici: prima gli ingressi primari, poi (per componenti senza ingressi) il resto
+    roots = [w for w in adjacency if w not in driven] + list(adjacency)
+
+    seen = set()
+    ordered: List[str] = []
+    for root in roots:
+        if root in seen:
+            continue
+        seen.add(root)
+        queue = deque([root])
+        while queue:
+            w = queue.popleft()
+            ordered.append(w)
+            for nb in sorted(adjacency[w], key=lambda x: len(adjacency[x])):
+                if nb not in seen:
+                    seen.add(nb)
+                    queue.append(nb)
+    return ordered
+
+
 def cnf_and(inputs: List[int], output: int) -> List[List[int]]:
     """
     Clausole CNF per gate AND n-ario: y = AND(inputs)
     """
     clauses: List[List[int]] = []
-    # (¬x_i ∨ y)
-    for xi in inputs:
-        clauses.append([-xi, output])
+    # (¬x_1 ∨ ... ∨ ¬x_n ∨ y)
+    clauses.append([-xi for xi in inputs] + [output])
     # (¬y ∨ x_1) ∧ ... ∧ (¬y ∨ x_n)
     for xi in inputs:
         clauses.append([-output, xi])
@@ -56,6 +136,24 @@ def cnf_xor(a: int, b: int, y: int) -> List[List[int]]:
         [ a, -b,  y],
     ]
 
+def cnf_xor3(a: int, b: int, c: int, y: int) -> List[List[int]]:
+    """
+    Clausole CNF per gate XOR a 3 ingressi: y = a ⊕ b ⊕ c
+    Una clausola per ogni assegnamento di (a, b, c) che esclude il valore
+    sbagliato di y: 8 clausole, senza variabili intermedie.
+    """
+    clauses: List[List[int]] = []
+    for bits in range(8):
+        va, vb, vc = (bits >> 2) & 1, (bits >> 1) & 1, bits & 1
+        parity = va ^ vb ^ vc
+        clauses.append([
+            -a if va else a,
+            -b if vb else b,
+            -c if vc else c,
+            y if parity else -y,
+        ])
+    return clauses
+
 def cnf_not(x: int, y: int) -> List[List[int]]:
     """
     Clausole CNF per gate NOT unario: y = ¬x
@@ -80,6 +178,62 @@ def cnf_xnor(a: int, b: int, y: int) -> List[List[int]]:
     ]
 
 
+def cnf_nand(inputs: List[int], output: int) -> List[List[int]]:
+    """
+    Clausole CNF per gate NAND n-ario: y = ¬AND(inputs)
+    """
+    clauses: List[List[int]] = []
+    # (¬x_1 ∨ ... ∨ ¬x_n ∨ ¬y)
+    clauses.append([-xi for xi in inputs] + [-output])
+    # (x_i ∨ y) per i
+    for xi in inputs:
+        clauses.append([xi, output])
+    return clauses
+
+
+def cnf_nor(inputs: List[int], output: int) -> List[List[int]]:
+    """
+    Clausole CNF per gate NOR n-ario: y = ¬OR(inputs)
+    """
+    clauses: List[List[int]] = []
+    # (x_1 ∨ ... ∨ x_n ∨ y)
+    clauses.append(inputs + [output])
+    # (¬y ∨ ¬x_i) per i
+    for xi in inputs:
+        clauses.append([-output, -xi])
+    return clauses
+
+
+def cnf_mux(s: int, a: int, b: int, y: int) -> List[List[int]]:
+    """
+    Clausole CNF per multiplexer: y = a se s altrimenti b  (ITE(s, a, b))
+    Le ultime due clausole sono ridondanti ma permettono alla propagazione
+    di dedurre y quando a == b anche senza conoscere s.
+    """
+    return [
+        [-s, -a,  y],
+        [-s,  a, -y],
+        [ s, -b,  y],
+        [ s,  b, -y],
+        [-a, -b,  y],
+        [ a,  b, -y],
+    ]
+
+
+def cnf_maj(a: int, b: int, c: int, y: int) -> List[List[int]]:
+    """
+    Clausole CNF per maggioranza a 3 ingressi: y = (a∧b) ∨ (a∧c) ∨ (b∧c)
+    """
+    return [
+        [-a, -b,  y],
+        [-a, -c,  y],
+        [-b, -c,  y],
+        [ a,  b, -y],
+        [ a,  c, -y],
+        [ b,  c, -y],
+    ]
+
+
 def cnf_buf(x: int, y: int) -> List[List[int]]:
     """
     Clausole CNF per buffer: y = x (usato per permutazioni)
@@ -105,7 +259,10 @@ def add_unit_clauses(
 def circuit_to_cnf(
     circuit: Circuit,
     fixed_inputs: Optional[Dict[str, bool]] = None,
-    fixed_outputs: Optional[Dict[str, bool]] = None
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    order: str = 'name',
+    wire2idx: Optional[Dict[str, int]] = None,
+    constraints: Optional[List[CardinalityConstraint]] = None
 ) -> Tuple[int, List[List[int]]]:
     """
     Genera CNF (num_vars, clausole) da un Circuit.
@@ -114,15 +271,27 @@ def circuit_to_cnf(
         circuit: istanza di Circuit da convertire
         fixed_inputs: dizionario wire->bool per fissare input
         fixed_outputs: dizionario wire->bool per fissare output
+        order: numerazione delle variabili (vedi index_wires); con un ordine
+            diverso da 'name' anche le clausole seguono la numerazione
+        wire2idx: mappa wire->indice già calcolata con index_wires, da
+            riusare per decodificare il modello
+        constraints: vincoli di cardinalità/pseudo-booleani sui wire
+            (vedi cardinality.py); le variabili ausiliarie seguono quelle dei wire
     Returns:
-        num_vars: numero totale di variabili
+        num_vars: numero totale di variabili (ausiliarie incluse)
         clauses: lista di clausole CNF (liste di int)
     """
-    wire2idx = index_wires(circuit)
+    if wire2idx is None:
+        wire2idx = index_wires(circuit, order)
     clauses: List[List[int]] = []
 
+    gates = circuit.gates
+    if order != 'name':
+        # Clausole vicine nella lista toccano variabili vicine
+        gates = sorted(gates, key=lambda g: wire2idx[g.output])
+
     # Traduci ogni gate
-    for gate in circuit.gates:
+    for gate in gates:
         out_idx = wire2idx[gate.output]
         in_idxs = [wire2idx[w] for w in gate.inputs]
 
@@ -131,9 +300,13 @@ def circuit_to_cnf(
         elif gate.gate_type == 'OR':
             clauses.extend(cnf_or(in_idxs, out_idx))
         elif gate.gate_type == 'XOR':
-            if len(in_idxs) != 2:
-                raise ValueError("XOR supporta solo 2 ingressi")
-            clauses.extend(cnf_xor(in_idxs[0], in_idxs[1], out_idx))
+            if len(in_idxs) == 3:
+                # XOR a 3 ingressi (somma dei sommatori completi)
+                clauses.extend(cnf_xor3(in_idxs[0], in_idxs[1], in_idxs[2], out_idx))
+            elif len(in_idxs) != 2:
+                raise ValueError("XOR supporta solo 2 o 3 ingressi")
+            else:
+                clauses.extend(cnf_xor(in_idxs[0], in_idxs[1], out_idx))
         elif gate.gate_type == 'BUF':
             if len(in_idxs) != 1:
                 raise ValueError("BUF supporta solo 1 ingresso")
@@ -148,6 +321,23 @@ def circuit_to_cnf(
             if len(in_idxs) != 2:
                 raise ValueError("XNOR supporta solo 2 ingressi")
             clauses.extend(cnf_xnor(in_idxs[0], in_idxs[1], out_idx))
+        elif gate.gate_type == 'NAND':
+            clauses.extend(cnf_nand(in_idxs, out_idx))
+        elif gate.gate_type == 'NOR':
+            clauses.extend(cnf_nor(in_idxs, out_idx))
+        elif gate.gate_type == 'MUX':
+            # MUX(s, a, b): selettore seguito dai due dati
+            if len(in_idxs) != 3:
+                raise ValueError("MUX supporta solo 3 ingressi (s, a, b)")
+            clauses.extend(cnf_mux(in_idxs[0], in_idxs[1], in_idxs[2], out_idx))
+        elif gate.gate_type == 'MAJ':
+            if len(in_idxs) != 3:
+                raise ValueError("MAJ supporta solo 3 ingressi")
+            clauses.extend(cnf_maj(in_idxs[0], in_idxs[1], in_idxs[2], out_idx))
+        elif gate.gate_type in ('CONST0', 'CONST1'):
+            if in_idxs:
+                raise ValueError(f"{gate.gate_type} non ha ingressi")
+            clauses.append([out_idx if gate.gate_type == 'CONST1' else -out_idx])
         else:
             raise ValueError(f"Gate type {gate.gate_type} non supportato")
 
@@ -158,6 +348,12 @@ def circuit_to_cnf(
         add_unit_clauses(clauses, fixed_outputs, wire2idx)
 
     num_vars = len(wire2idx)
+
+    # Vincoli di cardinalità: le variabili ausiliarie partono da num_vars + 1
+    for constraint in constraints or []:
+        card_clauses, num_vars = constraint.encode(wire2idx, num_vars)
+        clauses.extend(card_clauses)
+
     return num_vars, clauses
 
 
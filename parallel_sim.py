@@ -0,0 +1,158 @@
+# parallel_sim.py
+"""
+Simulazione parallela di circuiti su più processi.
+
+La simulazione è lavoro CPU in puro Python: con un ThreadPoolExecutor (come
+in archive/ExtendedCircuitgraph_0.simulate_multiple_circuits_parallel) il GIL
+la serializza. Qui ogni circuito viene serializzato in forma compatta
+(tabella dei nomi delle wire + gate come tuple di indici, compressa con zlib)
+e passato all'inizializzatore dei worker. Con i metodi di avvio spawn e
+forkserver il payload viene spedito a ogni worker una sola volta, all'avvio
+del pool; con fork (il default dove disponibile, come in solver.py) i worker
+lo ereditano dalla memoria del padre senza copia. In entrambi i casi ogni
+worker ricostruisce il circuito, lo compila con Circuit.compile e poi riceve
+solo batch di ingressi impacchettati (un intero per ingresso, il bit j è il
+vettore j) e restituisce le uscite nello stesso formato.
+"""
+import multiprocessing as mp
+import pickle
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from new_ExtendedCircuitgraph import Circuit
+
+# Un batch: (indice del circuito, ingressi impacchettati, numero di vettori)
+Batch = Tuple[int, Dict[str, int], int]
+
+# Funzioni compilate nel processo worker, nell'ordine dei circuiti del pool
+_WORKER_FUNCS: List[Callable[..., Dict[str, int]]] = []
+
+
+def serialize_circuit(circuit: Circuit, outputs: Optional[Sequence[str]] = None) -> bytes:
+    """
+    Forma compatta del circuito: nomi delle wire una sola volta, ogni gate
+    come (tipo, indici degli ingressi, indice dell'uscita).
+
+    Args:
+        circuit: circuito da serializzare
+        outputs: wire da calcolare nel worker (default: le uscite del circuito)
+    Returns:
+        bytes da passare a deserialize_circuit
+    """
+    names = list(circuit.wires)
+    index = {w: i for i, w in enumerate(names)}
+    gates = [(g.gate_type, tuple(index[w] for w in g.inputs), index[g.output])
+             for g in circuit.gates]
+    outs = [index[w] for w in (circuit.outputs() if outputs is None else outputs)]
+    payload = (names, gates, outs)
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def deserialize_circuit(data: bytes) -> Tuple[Circuit, List[str]]:
+    """Inversa di serialize_circuit: ritorna (circuito, uscite)."""
+    names, gates, outs = pickle.loads(zlib.decompress(data))
+    circuit = Circuit()
+    for w in names:
+        circuit.wires.setdefault(w, {})
+    for gate_type, ins, out in gates:
+        circuit.add_gate(gate_type, [names[i] for i in ins], names[out])
+    return circuit, [names[i] for i in outs]
+
+
+def _init_worker(payloads: Sequence[bytes]) -> None:
+    """Inizializzatore del worker: ricostruisce e compila tutti i circuiti."""
+    _WORKER_FUNCS.clear()
+    for data in payloads:
+        circuit, outputs = deserialize_circuit(data)
+        _WORKER_FUNCS.append(circuit.compile(outputs))
+
+
+def _simulate_batch(batch: Batch) -> Dict[str, int]:
+    idx, input_words, width = batch
+    return _WORKER_FUNCS[idx](input_words, width)
+
+
+class ParallelSimulator:
+    """
+    Pool di processi che simula un insieme fisso di circuiti.
+    I circuiti vengono inviati ai worker una volta sola; ogni richiesta
+    successiva trasporta solo gli ingressi impacchettati.
+
+    Esempio:
+        with ParallelSimulator([c1, c2]) as sim:
+            for out in sim.imap((i % 2, words, 64) for i, words in ...):
+                ...
+    Attributes:
+        processes: numero di processi worker
+        outputs: per ogni circuito, le wire ritornate
+        start_method: metodo di avvio dei worker ('fork', 'spawn',
+            'forkserver'; default: fork se disponibile, altrimenti quello
+            della piattaforma)
+    """
+    def __init__(
+        self,
+        circuits: Sequence[Circuit],
+        outputs: Optional[Sequence[Optional[Sequence[str]]]] = None,
+        processes: Optional[int] = None,
+        start_method: Optional[str] = None
+    ):
+        if outputs is None:
+            outputs = [None] * len(circuits)
+        if len(outputs) != len(circuits):
+            raise ValueError("outputs deve avere un elemento per circuito")
+        payloads = [serialize_circuit(c, o) for c, o in zip(circuits, outputs)]
+        self.outputs = [list(c.outputs() if o is None else o) for c, o in zip(circuits, outputs)]
+        self.processes = processes or mp.cpu_count()
+        if start_method is None and 'fork' in mp.get_all_start_methods():
+            start_method = 'fork'
+        ctx = mp.get_context(start_method)
+        self.start_method = ctx.get_start_method()
+        self._pool = ctx.Pool(
+            self.processes, initializer=_init_worker, initargs=(payloads,))
+
+    def imap(self, batches: Iterable[Batch], chunksize: int = 1) -> Iterator[Dict[str, int]]:
+        """
+        Simula un flusso di batch, ritornando le uscite nello stesso ordine.
+
+        Args:
+            batches: iterabile di (indice circuito, ingresso -> intero, numero di vettori)
+            chunksize: batch inviati a un worker per volta
+        Returns:
+            iteratore di dizionari wire -> intero impacchettato
+        """
+        return self._pool.imap(_simulate_batch, batches, chunksize)
+
+    def map(self, batches: Iterable[Batch], chunksize: int = 1) -> List[Dict[str, int]]:
+        """Come imap, ma ritorna la lista completa dei risultati."""
+        return list(self.imap(batches, chunksize))
+
+    def close(self) -> None:
+        """Termina i processi worker."""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self) -> "ParallelSimulator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def simulate_multiple_circuits_parallel(
+    circuits: Sequence[Circuit],
+    input_values_list: Sequence[Dict[str, int]],
+    processes: Optional[int] = None
+) -> List[Dict[str, int]]:
+    """
+    Sostituto su processi della versione con thread dell'archivio: simula
+    ogni circuito sul proprio vettore di ingresso (valori 0/1).
+
+    Args:
+        circuits: lista di circuiti
+        input_values_list: per ogni circuito, mappa ingresso -> 0/1
+        processes: numero di processi (default: numero di core)
+    Returns:
+        lista dei dizionari di uscita, nell'ordine dei circuiti
+    """
+    with ParallelSimulator(circuits, processes=processes) as sim:
+        return sim.map((i, dict(values), 1) for i, values in enumerate(input_values_list))
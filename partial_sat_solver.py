@@ -6,14 +6,18 @@ from pysat.formula import CNF
 from pysat.solvers import Glucose3
 from archive.ExtendedCircuitgraph_0 import manual_tseitin_cnf, create_simple_circuit
 from des_circuit import create_des_circuit
+from sat_cache import SatCache, formula_fingerprint
+from decoding import ModelDecoder
 
 
 def solve_partial(circuit: cg.Circuit,
                   fixed_inputs: dict[str, bool],
-                  fixed_outputs: dict[str, bool]) -> tuple[bool, list[int] | None, dict[str, int]]:
+                  fixed_outputs: dict[str, bool],
+                  cache: SatCache | None = None) -> tuple[bool, list[int] | None, dict[str, int]]:
     """
     Converte un circuito in CNF via codifica Tseitin e aggiunge clausole unitarie
     per fissare alcuni ingressi (fixed_inputs) e tutte le uscite (fixed_outputs).
+    Se è data una cache (SatCache) il risultato viene cercato/salvato in essa.
 
     Restituisce:
       - sat: True se l'istanza è soddisfacibile
@@ -30,13 +34,19 @@ def solve_partial(circuit: cg.Circuit,
         lit = var_map[name] if val else -var_map[name]
         cnf.append([lit])
 
-    # 3) Risoluzione SAT con Glucose3
+    # 3) Risoluzione SAT con Glucose3 (o risultato già in cache)
+    key = formula_fingerprint(cnf.clauses, backend='g3') if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return cached[0], cached[1], var_map
     solver = Glucose3()
     for clause in cnf.clauses:
         solver.add_clause(clause)
     sat = solver.solve()
     model = solver.get_model() if sat else None
     solver.delete()
+    if cache is not None:
+        cache.put(key, sat, model)
 
     return sat, model, var_map
 
@@ -99,9 +109,8 @@ if __name__ == "__main__":
             if sat:
                 print("SAT: esiste assegnamento compatibile.")
                 # Estrazione dei rimanenti input
-                remains = {inp: (var_map[inp] in model)
-                            for inp in circuit.inputs()
-                            if inp not in fin}
+                remains = ModelDecoder(var_map).values(
+                    model, [inp for inp in circuit.inputs() if inp not in fin])
                 print("Rimanenti input:", remains)
             else:
                 print("UNSAT: nessuna assegnazione possibile.")
@@ -0,0 +1,176 @@
+# portfolio.py
+"""
+Portfolio di SAT solver: la stessa formula viene risolta in parallelo da più
+backend (pycosat e i solver di pysat) in processi separati. Vince la prima
+risposta; gli altri processi vengono terminati.
+
+Un membro del portfolio è una coppia (backend, seed): il backend è 'pycosat'
+oppure un nome di solver pysat ('g3', 'g4', 'cd19', 'lgl', 'mcb', ...); il
+seed, se presente, rimescola l'ordine delle clausole e dei letterali per
+diversificare la ricerca di configurazioni altrimenti identiche.
+"""
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pycosat
+from pysat.solvers import Solver
+
+from new_circuit_to_cnf import circuit_to_cnf
+from new_ExtendedCircuitgraph import Circuit
+
+Member = Union[str, Tuple[str, Optional[int]]]
+
+# Portfolio di default: solver con euristiche diverse
+DEFAULT_PORTFOLIO: List[Member] = [
+    'pycosat',
+    'g4',
+    'cd19',
+    'lgl',
+    'mcb',
+    ('g4', 1),
+]
+
+
+def member_label(member: Member) -> str:
+    """Nome leggibile di un membro del portfolio, es. 'g4' o 'g4#1'."""
+    backend, seed = _split_member(member)
+    return backend if seed is None else f"{backend}#{seed}"
+
+
+def _split_member(member: Member) -> Tuple[str, Optional[int]]:
+    if isinstance(member, str):
+        return member, None
+    return member[0], member[1]
+
+
+def shuffle_clauses(clauses: List[List[int]], seed: int) -> List[List[int]]:
+    """
+    Copia delle clausole con ordine delle clausole e dei letterali rimescolato
+    (formula equivalente, diversa traiettoria del solver).
+    """
+    rng = random.Random(seed)
+    shuffled = [rng.sample(cl, len(cl)) for cl in clauses]
+    rng.shuffle(shuffled)
+    return shuffled
+
+
+def solve_with_backend(backend: str, clauses: List[List[int]]) -> Tuple[bool, Optional[List[int]]]:
+    """
+    Risolve le clausole con un singolo backend, nello stesso formato di
+    is_satisfiable: (is_sat, model).
+    """
+    if backend == 'pycosat':
+        result = pycosat.solve(clauses)
+        if isinstance(result, str):
+            return False, None
+        return True, result
+    with Solver(name=backend, bootstrap_with=clauses) as s:
+        if s.solve():
+            return True, s.get_model()
+        return False, None
+
+
+def _worker(member: Member, clauses: List[List[int]], results: 'mp.Queue') -> None:
+    backend, seed = _split_member(member)
+    start = time.perf_counter()
+    try:
+        if seed is not None:
+            clauses = shuffle_clauses(clauses, seed)
+        sat, model = solve_with_backend(backend, clauses)
+        results.put((member_label(member), sat, model, time.perf_counter() - start, None))
+    except Exception as e:  # backend non disponibile o errore interno
+        results.put((member_label(member), None, None, time.perf_counter() - start, repr(e)))
+
+
+def solve_portfolio(
+    clauses: List[List[int]],
+    members: Optional[Sequence[Member]] = None,
+    timeout: Optional[float] = None
+) -> Tuple[Optional[bool], Optional[List[int]], Dict[str, object]]:
+    """
+    Lancia un processo per membro del portfolio e ritorna la prima risposta.
+
+    Args:
+        clauses: formula CNF
+        members: membri del portfolio (default: i primi os.cpu_count()
+            membri di DEFAULT_PORTFOLIO, un processo per core)
+        timeout: tempo massimo in secondi (None = nessun limite)
+    Returns:
+        (is_sat, model, report)
+        - is_sat: True/False, oppure None se nessuno ha risposto entro il timeout
+        - model: modello del vincitore se SAT
+        - report: {'winner': etichetta o None,
+                   'times': etichetta -> secondi fino alla risposta o all'arresto,
+                   'status': etichetta -> 'sat' | 'unsat' | 'terminated' | 'error: ...'}
+    """
+    if members is None:
+        members = DEFAULT_PORTFOLIO[:max(1, os.cpu_count() or 1)]
+    members = list(members)
+    labels = [member_label(m) for m in members]
+    if len(set(labels)) != len(labels):
+        # Il report è indicizzato per etichetta: i duplicati si sovrascriverebbero
+        dup = next(l for l in labels if labels.count(l) > 1)
+        raise ValueError(f"Membro del portfolio duplicato: {dup}")
+    ctx = mp.get_context()
+    results = ctx.Queue()
+    procs = {}
+    start = time.perf_counter()
+    for member in members:
+        p = ctx.Process(target=_worker, args=(member, clauses, results), daemon=True)
+        p.start()
+        procs[member_label(member)] = p
+
+    times: Dict[str, float] = {}
+    status: Dict[str, str] = {}
+    winner = None
+    sat, model = None, None
+    try:
+        while len(status) < len(procs):
+            remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                label, res, res_model, elapsed, error = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            times[label] = elapsed
+            if error is not None:
+                status[label] = f"error: {error}"
+                continue
+            status[label] = 'sat' if res else 'unsat'
+            winner, sat, model = label, res, res_model
+            break
+    finally:
+        stopped = time.perf_counter() - start
+        for label, p in procs.items():
+            if p.is_alive():
+                p.terminate()
+            p.join()
+            if label not in status:
+                status[label] = 'terminated'
+                times[label] = stopped
+        results.close()
+        results.join_thread()
+
+    if winner is None and all(st.startswith('error') for st in status.values()):
+        raise RuntimeError(f"Nessun backend del portfolio è riuscito a risolvere: {status}")
+    return sat, model, {'winner': winner, 'times': times, 'status': status}
+
+
+def is_satisfiable_portfolio(
+    circuit: Circuit,
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    members: Optional[Sequence[Member]] = None,
+    timeout: Optional[float] = None
+) -> Tuple[Optional[bool], Optional[List[int]], Dict[str, object]]:
+    """
+    Variante di solver.is_satisfiable che usa il portfolio.
+    Ritorna (is_sat, model, report) come solve_portfolio.
+    """
+    _, clauses = circuit_to_cnf(circuit, fixed_inputs, fixed_outputs)
+    return solve_portfolio(clauses, members, timeout)
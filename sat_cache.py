@@ -0,0 +1,146 @@
+# sat_cache.py
+"""
+Cache persistente dei risultati SAT su SQLite.
+
+La chiave è un hash canonico della formula (letterali ordinati in ogni
+clausola, clausole ordinate e senza duplicati), delle assunzioni e del nome
+del backend: la stessa interrogazione ripetuta tra più esecuzioni degli
+script viene risolta una sola volta. Si memorizzano SAT/UNSAT e il modello;
+i risultati UNKNOWN (timeout, budget) non vengono salvati.
+
+Quando la dimensione delle voci salvate supera max_bytes si eliminano le
+voci usate meno di recente.
+"""
+import array
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def formula_fingerprint(
+    clauses: Iterable[Sequence[int]],
+    assumptions: Sequence[int] = (),
+    backend: str = ''
+) -> str:
+    """
+    Hash SHA-256 canonico di formula, assunzioni e backend: non dipende
+    dall'ordine delle clausole né da quello dei letterali al loro interno.
+    """
+    canon = sorted({tuple(sorted(set(cl))) for cl in clauses})
+    h = hashlib.sha256()
+    h.update(backend.encode() + b'|')
+    h.update(array.array('i', sorted(assumptions)).tobytes() + b'|')
+    for cl in canon:
+        h.update(array.array('i', cl).tobytes())
+        h.update(b'\0\0\0\0')
+    return h.hexdigest()
+
+
+def _pack_model(model: Optional[List[int]]) -> Optional[bytes]:
+    if model is None:
+        return None
+    return zlib.compress(array.array('i', model).tobytes())
+
+
+def _unpack_model(blob: Optional[bytes]) -> Optional[List[int]]:
+    if blob is None:
+        return None
+    model = array.array('i')
+    model.frombytes(zlib.decompress(blob))
+    return model.tolist()
+
+
+class SatCache:
+    """
+    Cache SQLite dei risultati (is_sat, model), utilizzabile da più thread.
+    Attributes:
+        path: file del database (':memory:' per una cache volatile)
+        max_bytes: dimensione massima delle voci (chiave + modello compresso)
+        hits: interrogazioni trovate in cache
+        misses: interrogazioni non trovate
+        evictions: voci eliminate per rispettare max_bytes
+    """
+    def __init__(self, path: str = ':memory:', max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, sat INTEGER NOT NULL, model BLOB,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[bool, Optional[List[int]]]]:
+        """(is_sat, model) salvato per la chiave, oppure None se assente."""
+        with self._lock:
+            row = self._conn.execute("SELECT sat, model FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return bool(row[0]), _unpack_model(row[1])
+
+    def put(self, key: str, sat: Optional[bool], model: Optional[List[int]]) -> None:
+        """Salva un risultato; gli UNKNOWN (sat=None) vengono ignorati."""
+        if sat is None:
+            return
+        blob = _pack_model(model if sat else None)
+        # Anche le voci UNSAT occupano spazio: si conta la chiave
+        size = len(key) + (len(blob) if blob is not None else 0)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, sat, model, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, int(bool(sat)), blob, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Elimina le voci meno recenti finché la dimensione rientra nel limite
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used, rowid").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Contatori della cache e numero di voci salvate."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': entries, 'bytes': size}
+
+    def clear(self) -> None:
+        """Svuota la cache (i contatori restano)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self.stats()['entries']
+
+    def __enter__(self) -> 'SatCache':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
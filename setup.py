@@ -4,6 +4,6 @@ from setuptools import setup
 setup(
     name="new_circuit_to_cnf",
     version="0.1.0",
-    py_modules=["new_circuit_to_cnf", "new_ExtendedCircuitgraph", "solver"],
-    install_requires=["pycosat"],
+    py_modules=["new_circuit_to_cnf", "new_ExtendedCircuitgraph", "solver", "cardinality", "sweeping", "portfolio", "cube_and_conquer", "solve_stats", "async_solver", "backends", "sat_cache", "bitsim", "parallel_sim", "validation", "equivalence", "decoding"],
+    install_requires=["pycosat", "python-sat", "numpy"],
 )
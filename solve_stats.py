@@ -0,0 +1,114 @@
+# solve_stats.py
+"""
+Statistiche delle risoluzioni SAT: dimensione della formula, tempi di
+codifica e di risoluzione e contatori del backend (conflitti, decisioni,
+propagazioni, restart) quando il solver li espone con accum_stats().
+
+I record si esportano in formato JSON lines, una riga per risoluzione,
+per aggregarli tra più campagne di esperimenti (es. con pandas.read_json(lines=True)).
+"""
+import json
+from typing import Any, Dict, IO, Iterable, List, Optional, Union
+
+
+def formula_size(clauses: List[List[int]]) -> Dict[str, int]:
+    """Numero di clausole e di letterali di una formula CNF."""
+    return {'num_clauses': len(clauses), 'num_literals': sum(len(cl) for cl in clauses)}
+
+
+def stats_delta(after: Dict[str, int], before: Dict[str, int]) -> Dict[str, int]:
+    """
+    Differenza tra due letture di accum_stats(): i contatori pysat sono
+    cumulativi sulla vita del solver, la differenza è il costo di una chiamata.
+    """
+    return {k: v - before.get(k, 0) for k, v in after.items()}
+
+
+class SolveStats:
+    """
+    Record di una singola risoluzione.
+    Attributes:
+        backend: nome del solver (es. 'pycosat', 'g3')
+        result: 'SAT', 'UNSAT' oppure 'UNKNOWN'
+        num_vars: numero di variabili della formula
+        num_clauses: numero di clausole
+        num_literals: numero totale di letterali
+        encode_time: secondi spesi per generare il CNF
+        solve_time: secondi spesi nel solver
+        solver_stats: contatori del backend (conflicts, decisions,
+            propagations, restarts); vuoto se il backend non li espone
+        tags: etichette libere dell'esperimento (es. round, coppie, ordine)
+    """
+    def __init__(
+        self,
+        backend: str,
+        result: str,
+        num_vars: int,
+        num_clauses: int,
+        num_literals: int,
+        encode_time: float,
+        solve_time: float,
+        solver_stats: Optional[Dict[str, int]] = None,
+        tags: Optional[Dict[str, Any]] = None
+    ):
+        self.backend = backend
+        self.result = result
+        self.num_vars = num_vars
+        self.num_clauses = num_clauses
+        self.num_literals = num_literals
+        self.encode_time = encode_time
+        self.solve_time = solve_time
+        self.solver_stats = dict(solver_stats or {})
+        self.tags = dict(tags or {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dizionario piatto, serializzabile in JSON."""
+        return {
+            'backend': self.backend,
+            'result': self.result,
+            'num_vars': self.num_vars,
+            'num_clauses': self.num_clauses,
+            'num_literals': self.num_literals,
+            'encode_time': self.encode_time,
+            'solve_time': self.solve_time,
+            'solver_stats': self.solver_stats,
+            'tags': self.tags,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SolveStats':
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return (f"SolveStats(backend={self.backend}, result={self.result}, "
+                f"vars={self.num_vars}, clauses={self.num_clauses}, "
+                f"encode={self.encode_time:.3f}s, solve={self.solve_time:.3f}s)")
+
+
+def write_jsonl(records: Iterable[SolveStats], dest: Union[str, IO[str]], append: bool = True) -> int:
+    """
+    Scrive i record come JSON lines.
+
+    Args:
+        records: record da esportare
+        dest: percorso del file oppure file già aperto in scrittura
+        append: se dest è un percorso, aggiunge in coda invece di sovrascrivere
+    Returns:
+        numero di righe scritte
+    """
+    if isinstance(dest, str):
+        with open(dest, 'a' if append else 'w', encoding='utf-8') as f:
+            return write_jsonl(records, f)
+    n = 0
+    for rec in records:
+        dest.write(json.dumps(rec.to_dict(), sort_keys=True) + '\n')
+        n += 1
+    return n
+
+
+def read_jsonl(src: Union[str, IO[str]]) -> List[SolveStats]:
+    """Legge i record scritti da write_jsonl (le righe vuote sono ignorate)."""
+    if isinstance(src, str):
+        with open(src, encoding='utf-8') as f:
+            return read_jsonl(f)
+    return [SolveStats.from_dict(json.loads(line)) for line in src if line.strip()]
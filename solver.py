@@ -2,31 +2,219 @@
 """
 Wrapper per risolvere un problema SAT generato da un oggetto Circuit.
 Il backend (ad es. pycosat) è configurabile tramite la variabile globale SOLVER.
+Per interrogare più volte lo stesso circuito si usa SolverSession, che
+mantiene un solver pysat incrementale.
+Entrambi accettano limiti di tempo e di budget: allo scadere la risposta è
+UNKNOWN invece di un verdetto SAT/UNSAT.
 """
-from typing import Dict, List, Optional, Tuple
+import multiprocessing as mp
+import signal
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import pycosat
-from new_circuit_to_cnf import circuit_to_cnf
+from pysat.solvers import Solver
+from new_circuit_to_cnf import circuit_to_cnf, index_wires
+from cardinality import CardinalityConstraint
 from new_ExtendedCircuitgraph import Circuit
+from solve_stats import SolveStats, formula_size, stats_delta
+from backends import DEFAULT_POOL, current_backend
+from sat_cache import SatCache, formula_fingerprint
+from decoding import decode_probes
 
-# Backend SAT: a chiunque voglia cambiare solver, basta riassegnare questa variabile
+# Backend SAT di default: a chiunque voglia cambiare solver, basta riassegnare questa variabile
 # Il solver deve esportare una funzione "solve(clauses: List[List[int]]) -> List[int] | str"
+# (per scelte per chiamata o per thread vedi backends.use_backend)
 SOLVER = pycosat
 
+# Terzo esito possibile di una risoluzione: limite di tempo/budget raggiunto
+# o interruzione esplicita. Vale None, quindi è falso in un contesto booleano.
+UNKNOWN = None
+
+
+class DecisionHints:
+    """
+    Suggerimenti per le decisioni del solver, es. nel recupero della chiave
+    di DES dove solo i bit di chiave sono vere decisioni.
+    Attributes:
+        priority: wire su cui decidere per primi: ricevono gli indici CNF più
+            bassi, che i solver della famiglia MiniSat scelgono per primi a
+            parità di attività
+        phases: polarità iniziale dei wire (es. una chiave ipotizzata);
+            applicata con set_phases dai backend pysat, ignorata da pycosat
+    """
+    def __init__(self, priority: Sequence[str] = (), phases: Optional[Dict[str, bool]] = None):
+        self.priority = list(priority)
+        self.phases = dict(phases or {})
+
+    def phase_literals(self, wire2idx: Dict[str, int]) -> List[int]:
+        """Polarità come letterali CNF secondo la mappatura data."""
+        lits = []
+        for wire, val in self.phases.items():
+            idx = wire2idx.get(wire)
+            if idx is None:
+                raise KeyError(f"Wire {wire} non trovato nella mappatura")
+            lits.append(idx if val else -idx)
+        return lits
+
+
+def _result_label(sat: Optional[bool]) -> str:
+    if sat is UNKNOWN:
+        return 'UNKNOWN'
+    return 'SAT' if sat else 'UNSAT'
+
+
+def _accum_stats(solver: Solver) -> Dict[str, int]:
+    """Contatori cumulativi del solver pysat ({} se il backend non li espone)."""
+    try:
+        return dict(solver.accum_stats() or {})
+    except (AttributeError, NotImplementedError):
+        return {}
+
 
 def set_solver(solver_module) -> None:
     """
-    Permette di cambiare il modulo di risoluzione SAT.
-    Il modulo deve fornire una funzione `solve(clauses)`.
+    Permette di cambiare il modulo di risoluzione SAT di default del processo.
+    Il modulo deve fornire una funzione `solve(clauses)`; si può passare anche
+    il nome di un backend registrato (vedi backends.py).
+    Per scegliere il backend di una singola chiamata, o di un solo thread,
+    usare l'argomento `backend` di is_satisfiable o backends.use_backend.
     """
     global SOLVER
     SOLVER = solver_module
 
 
+def _interpret(result) -> Tuple[Optional[bool], Optional[List[int]]]:
+    """Traduce la risposta grezza del backend in (is_sat, model)."""
+    if isinstance(result, str):
+        if result.upper().startswith('UNSAT'):
+            return False, None
+        if result.upper().startswith('UNKNOWN'):
+            return UNKNOWN, None
+    if isinstance(result, list):
+        return True, result
+    # Alcuni solver ritornano liste vuote per UNSAT, gestiamo genericamente:
+    return bool(result), result if result else None
+
+
+def _to_default_numbering(model: Optional[List[int]], wire2idx: Dict[str, int],
+                          default: Dict[str, int]) -> Optional[List[int]]:
+    """
+    Riporta un modello ottenuto con una numerazione diversa (es. con
+    DecisionHints.priority) alla numerazione di index_wires(circuit), quella
+    che si aspettano i decodificatori. Le variabili ausiliarie seguono le
+    wire in entrambe le numerazioni e restano invariate.
+    """
+    if model is None:
+        return None
+    # Le wire che non compaiono in nessuna clausola possono mancare dal
+    # modello: valgono False
+    size = max(len(model), max(default.values(), default=0))
+    remapped = list(model) + [-v for v in range(len(model) + 1, size + 1)]
+    for wire, old in wire2idx.items():
+        new = default[wire]
+        value = old <= len(model) and model[old - 1] > 0
+        remapped[new - 1] = new if value else -new
+    return remapped
+
+
+def _backend_kwargs(propagation_budget: Optional[int], conflict_budget: Optional[int]) -> Dict[str, int]:
+    """Parametri di budget per il metodo solve del backend."""
+    kwargs = {}
+    if propagation_budget is not None:
+        kwargs['prop_limit'] = propagation_budget
+    if conflict_budget is not None:
+        kwargs['conf_limit'] = conflict_budget
+    return kwargs
+
+
+def _supported_kwargs(instance, kwargs: Dict[str, object], name: str) -> Dict[str, object]:
+    """
+    Parametri da passare a instance.solve: solo quelli dichiarati
+    nell'attributo `options` (un modulo come pycosat riceve solo le
+    clausole). Le polarità sono un suggerimento e vengono scartate; un
+    budget non supportato è un errore.
+    """
+    options = getattr(instance, 'options', ())
+    unsupported = [k for k in kwargs if k not in options and k != 'phases']
+    if unsupported:
+        raise ValueError(f"Il backend {name} non supporta {', '.join(unsupported)}")
+    return {k: v for k, v in kwargs.items() if k in options}
+
+
+def _resolve_backend(backend: Optional[Union[str, object]]) -> Union[str, object]:
+    """
+    Backend della chiamata: argomento esplicito, poi contesto corrente
+    (use_backend), poi SOLVER. Il modulo pycosat viene sostituito dal
+    backend equivalente che supporta i budget.
+    """
+    for chosen in (backend, current_backend(), SOLVER):
+        if chosen is not None:
+            return 'pycosat' if chosen is pycosat else chosen
+    return 'pycosat'
+
+
+def _watchdog_target(backend, clauses: List[List[int]], kwargs: Dict[str, int], conn) -> None:
+    conn.send(backend.solve(clauses, **kwargs))
+    conn.close()
+
+
+def _solve_with_watchdog(
+    backend,
+    clauses: List[List[int]],
+    kwargs: Dict[str, int],
+    timeout: Optional[float],
+    cancel: Optional[threading.Event]
+):
+    """
+    Esegue backend.solve in un processo figlio e lo termina allo scadere del
+    timeout o quando `cancel` viene impostato. Ritorna la risposta grezza del
+    backend oppure 'UNKNOWN'.
+    """
+    methods = mp.get_all_start_methods()
+    ctx = mp.get_context('fork' if 'fork' in methods else None)
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_watchdog_target, args=(backend, clauses, kwargs, child), daemon=True)
+    proc.start()
+    child.close()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        # Attesa a piccoli passi: il thread chiamante resta reattivo ai segnali
+        while True:
+            step = 0.05 if deadline is None else min(0.05, max(0.0, deadline - time.monotonic()))
+            if parent.poll(step):
+                try:
+                    return parent.recv()
+                except EOFError:
+                    raise RuntimeError("Il processo del solver è terminato senza risposta")
+            if cancel is not None and cancel.is_set():
+                return 'UNKNOWN'
+            if deadline is not None and time.monotonic() >= deadline:
+                return 'UNKNOWN'
+            if not proc.is_alive() and not parent.poll():
+                raise RuntimeError("Il processo del solver è terminato senza risposta")
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        parent.close()
+
+
 def is_satisfiable(
     circuit: Circuit,
     fixed_inputs: Optional[Dict[str, bool]] = None,
-    fixed_outputs: Optional[Dict[str, bool]] = None
-) -> Tuple[bool, Optional[List[int]]]:
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    constraints: Optional[List[CardinalityConstraint]] = None,
+    timeout: Optional[float] = None,
+    propagation_budget: Optional[int] = None,
+    conflict_budget: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+    return_stats: bool = False,
+    backend: Optional[Union[str, object]] = None,
+    cache: Optional[SatCache] = None,
+    hints: Optional[DecisionHints] = None
+):
     """
     Determina se c'è un assegnamento degli input non fissati che renda vera la logica del circuito.
 
@@ -34,22 +222,370 @@ def is_satisfiable(
         circuit: istanza di Circuit
         fixed_inputs: mappa wire->bool per fissare alcuni input
         fixed_outputs: mappa wire->bool per fissare alcuni output
+        constraints: vincoli di cardinalità/pseudo-booleani sui wire
+        timeout: tempo massimo in secondi; il solver gira in un processo
+            figlio (watchdog) che viene terminato alla scadenza
+        propagation_budget: numero massimo di propagazioni
+        conflict_budget: numero massimo di conflitti (solo backend pysat)
+        cancel: evento che, se impostato da un altro thread, interrompe la
+            risoluzione (usa il watchdog come il timeout)
+        return_stats: se True ritorna anche un record SolveStats
+        backend: nome di un backend (vedi backends.py), preso in prestito
+            dal pool condiviso, oppure un oggetto con metodo solve; se None
+            si usa il backend del contesto (use_backend) o SOLVER
+        cache: SatCache in cui cercare/salvare il risultato, con chiave
+            data dall'hash della formula e dal nome del backend
+        hints: DecisionHints con variabili prioritarie e polarità iniziali;
+            il modello ritornato usa comunque la numerazione di
+            index_wires(circuit)
     Returns:
-        (is_sat, model)
-        - is_sat: True se il CNF è sat, False se unsat
+        (is_sat, model), oppure (is_sat, model, stats) con return_stats=True
+        - is_sat: True se il CNF è sat, False se unsat, UNKNOWN (None) se
+          il limite di tempo o di budget è stato raggiunto
         - model: lista di interi con assegnamenti (variabili positive=vero,
           negative=falso) se is_sat=True, altrimenti None
+        - stats: dimensione della formula e tempi di codifica/risoluzione
+          e contatori del backend se disponibili (non con timeout/cancel)
     """
     # 1) Genera CNF: num_vars, clausole
-    num_vars, clauses = circuit_to_cnf(circuit, fixed_inputs, fixed_outputs)
+    start = time.perf_counter()
+    wire2idx = index_wires(circuit, priority=hints.priority) if hints is not None else None
+    num_vars, clauses = circuit_to_cnf(circuit, fixed_inputs, fixed_outputs,
+                                       wire2idx=wire2idx, constraints=constraints)
+    encode_time = time.perf_counter() - start
 
-    # 2) Chiama il solver
-    result = SOLVER.solve(clauses)
+    # 2) Chiama il solver (o recupera il risultato dalla cache)
+    kwargs = _backend_kwargs(propagation_budget, conflict_budget)
+    if hints is not None and hints.phases:
+        kwargs['phases'] = hints.phase_literals(wire2idx)
+    chosen = _resolve_backend(backend)
+    name = chosen if isinstance(chosen, str) else \
+        getattr(chosen, 'name', None) or getattr(chosen, '__name__', type(chosen).__name__)
+    key = formula_fingerprint(clauses, backend=name) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        sat, model = cached
+        if wire2idx is not None:
+            model = _to_default_numbering(model, wire2idx, index_wires(circuit))
+        if not return_stats:
+            return sat, model
+        stats = SolveStats(
+            backend=name, result=_result_label(sat), num_vars=num_vars,
+            encode_time=encode_time, solve_time=0.0, tags={'cache': 'hit'},
+            **formula_size(clauses)
+        )
+        return sat, model, stats
+    with (DEFAULT_POOL.borrow(chosen) if isinstance(chosen, str) else nullcontext(chosen)) as instance:
+        kwargs = _supported_kwargs(instance, kwargs, name)
+        start = time.perf_counter()
+        if timeout is None and cancel is None:
+            result = instance.solve(clauses, **kwargs)
+            solver_stats = dict(getattr(instance, 'last_stats', None) or {})
+        else:
+            result = _solve_with_watchdog(instance, clauses, kwargs, timeout, cancel)
+            solver_stats = {}
+        solve_time = time.perf_counter() - start
 
     # 3) Interpreta il risultato
-    if isinstance(result, str) and result.upper().startswith('UNSAT'):
-        return False, None
-    if isinstance(result, list):
-        return True, result
-    # Alcuni solver ritornano liste vuote per UNSAT, gestiamo genericamente:
-    return bool(result), result if result else None
+    sat, model = _interpret(result)
+    if cache is not None:
+        cache.put(key, sat, model)
+    if wire2idx is not None:
+        model = _to_default_numbering(model, wire2idx, index_wires(circuit))
+    if not return_stats:
+        return sat, model
+    stats = SolveStats(
+        backend=name, result=_result_label(sat), num_vars=num_vars,
+        encode_time=encode_time, solve_time=solve_time, solver_stats=solver_stats,
+        tags={'cache': 'miss'} if cache is not None else None, **formula_size(clauses)
+    )
+    return sat, model, stats
+
+
+class SolverSession:
+    """
+    Sessione SAT incrementale legata a un Circuit.
+
+    Le clausole del circuito vengono caricate una sola volta in un solver
+    pysat; input e output fissati vengono passati a ogni interrogazione come
+    assunzioni, così le clausole apprese restano valide tra le chiamate.
+
+    Attributes:
+        circuit: circuito di riferimento
+        var_map: mappa wire -> variabile CNF
+        num_vars: numero di variabili (ausiliarie incluse)
+        backend: nome del solver pysat (es. 'g3', 'cd19', 'm22')
+        encode_time: secondi spesi per generare il CNF
+        size: numero di clausole e letterali caricati nel solver
+    """
+    def __init__(
+        self,
+        circuit: Circuit,
+        backend: str = 'g3',
+        order: str = 'name',
+        constraints: Optional[List[CardinalityConstraint]] = None,
+        hints: Optional[DecisionHints] = None
+    ):
+        self.circuit = circuit
+        self.backend = backend
+        start = time.perf_counter()
+        self.var_map = index_wires(circuit, order, hints.priority if hints is not None else ())
+        self.num_vars, clauses = circuit_to_cnf(
+            circuit, order=order, wire2idx=self.var_map, constraints=constraints
+        )
+        self.encode_time = time.perf_counter() - start
+        self.size = formula_size(clauses)
+        self.solver = Solver(name=backend, bootstrap_with=clauses)
+        if hints is not None and hints.phases:
+            self.set_phases(hints.phases)
+        # Se True (vedi interrupt_on_signal) la risoluzione gira in un thread
+        # ausiliario, così il thread principale può gestire i segnali
+        self._signal_safe = False
+
+    def assumptions(
+        self,
+        fixed_inputs: Optional[Dict[str, bool]] = None,
+        fixed_outputs: Optional[Dict[str, bool]] = None
+    ) -> List[int]:
+        """
+        Traduce i valori fissati in una lista di letterali da assumere.
+        """
+        lits = []
+        for fixed in (fixed_inputs, fixed_outputs):
+            for wire, val in (fixed or {}).items():
+                idx = self.var_map.get(wire)
+                if idx is None:
+                    raise KeyError(f"Wire {wire} non trovato nella mappatura")
+                lits.append(idx if val else -idx)
+        return lits
+
+    def set_phases(self, phases: Dict[str, bool]) -> None:
+        """
+        Polarità da provare per prima nelle decisioni sui wire dati (es. una
+        chiave ipotizzata); a differenza delle assunzioni non vincola nulla.
+        """
+        self.solver.set_phases(DecisionHints(phases=phases).phase_literals(self.var_map))
+
+    def add_constraint(self, fixed: Dict[str, bool]) -> None:
+        """
+        Fissa in modo permanente alcuni wire (clausole unitarie), per i vincoli
+        comuni a tutte le interrogazioni successive.
+        """
+        for lit in self.assumptions(fixed):
+            self.solver.add_clause([lit])
+            self.size['num_clauses'] += 1
+            self.size['num_literals'] += 1
+
+    def solve(
+        self,
+        fixed_inputs: Optional[Dict[str, bool]] = None,
+        fixed_outputs: Optional[Dict[str, bool]] = None,
+        timeout: Optional[float] = None,
+        conflict_budget: Optional[int] = None,
+        propagation_budget: Optional[int] = None,
+        return_stats: bool = False
+    ):
+        """
+        Come is_satisfiable, ma sul solver già caricato.
+
+        Args:
+            fixed_inputs: mappa wire->bool per fissare alcuni input
+            fixed_outputs: mappa wire->bool per fissare alcuni output
+            timeout: tempo massimo in secondi, poi il solver viene interrotto
+            conflict_budget: numero massimo di conflitti
+            propagation_budget: numero massimo di propagazioni
+            return_stats: se True ritorna anche un record SolveStats
+        Returns:
+            (is_sat, model) oppure (is_sat, model, stats) nello stesso formato
+            di is_satisfiable; is_sat vale UNKNOWN se un limite è stato
+            raggiunto o se la risoluzione è stata interrotta con interrupt().
+            encode_time in stats è quello (unico) della sessione e i contatori
+            del backend si riferiscono alla sola chiamata corrente.
+        """
+        assumptions = self.assumptions(fixed_inputs, fixed_outputs)
+        solver = self.solver
+        # I budget valgono per una sola chiamata (vengono azzerati con -1 alla
+        # fine); non tutti i backend li supportano, es. CaDiCaL le propagazioni
+        if conflict_budget is not None:
+            solver.conf_budget(conflict_budget)
+        if propagation_budget is not None:
+            solver.prop_budget(propagation_budget)
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, self.interrupt)
+            timer.daemon = True
+            timer.start()
+        before = _accum_stats(solver) if return_stats else {}
+        start = time.perf_counter()
+        limited = timeout is not None or conflict_budget is not None or propagation_budget is not None
+
+        def call():
+            # solve_limited anche senza limiti: solo così interrupt() da un
+            # altro thread ferma la risoluzione
+            try:
+                return solver.solve_limited(assumptions=assumptions, expect_interrupt=True)
+            except NotImplementedError:
+                # es. Lingeling: solve semplice, non interrompibile
+                if limited:
+                    raise
+                return solver.solve(assumptions=assumptions)
+
+        try:
+            sat = _call_in_thread(call) if self._signal_safe else call()
+        finally:
+            # Il timer va fermato (e atteso, se sta già scattando) prima di
+            # azzerare l'interruzione, altrimenti la chiamata successiva
+            # potrebbe ritornare UNKNOWN senza motivo
+            if timer is not None:
+                timer.cancel()
+                timer.join()
+            try:
+                solver.clear_interrupt()
+            except NotImplementedError:
+                pass
+            if conflict_budget is not None:
+                solver.conf_budget(-1)
+            if propagation_budget is not None:
+                solver.prop_budget(-1)
+        solve_time = time.perf_counter() - start
+        model = solver.get_model() if sat else None
+        if not return_stats:
+            return sat, model
+        stats = SolveStats(
+            backend=self.backend, result=_result_label(sat), num_vars=self.num_vars,
+            encode_time=self.encode_time, solve_time=solve_time,
+            solver_stats=stats_delta(_accum_stats(solver), before), **self.size
+        )
+        return sat, model, stats
+
+    def interrupt(self) -> None:
+        """
+        Interrompe la risoluzione in corso; può essere chiamato da un altro
+        thread o da un gestore di segnali. La solve in corso ritorna UNKNOWN.
+        """
+        if self.solver is not None:
+            self.solver.interrupt()
+
+    def iter_models(
+        self,
+        wires: Sequence[str],
+        fixed_inputs: Optional[Dict[str, bool]] = None,
+        fixed_outputs: Optional[Dict[str, bool]] = None,
+        max_count: Optional[int] = None
+    ) -> Iterator[Dict[str, bool]]:
+        """
+        Enumera gli assegnamenti distinti dei wire `wires` (proiezione dei
+        modelli, es. sui bit di chiave) compatibili con i valori fissati.
+
+        Ogni soluzione trovata viene esclusa con una clausola di blocco
+        aggiunta allo stesso solver, quindi ogni passo è una risoluzione
+        incrementale. Le clausole di blocco sono condizionate da un
+        letterale di attivazione e vengono disattivate al termine, così la
+        sessione resta utilizzabile per altre interrogazioni.
+
+        Args:
+            wires: wire su cui proiettare i modelli
+            fixed_inputs: mappa wire->bool per fissare alcuni input
+            fixed_outputs: mappa wire->bool per fissare alcuni output
+            max_count: numero massimo di soluzioni (None = tutte)
+        Yields:
+            dizionari wire->bool, uno per soluzione distinta
+        """
+        idx = self.assumptions({w: True for w in wires})
+        self.num_vars += 1
+        act = self.num_vars
+        assumptions = self.assumptions(fixed_inputs, fixed_outputs) + [act]
+        count = 0
+        try:
+            while max_count is None or count < max_count:
+                if not self.solver.solve(assumptions=assumptions):
+                    break
+                model = self.solver.get_model()
+                values = {w: model[i - 1] > 0 for w, i in zip(wires, idx)}
+                count += 1
+                yield values
+                self.solver.add_clause([-act] + [-i if values[w] else i for w, i in zip(wires, idx)])
+        finally:
+            # Disattiva in modo permanente le clausole di blocco
+            if self.solver is not None:
+                self.solver.add_clause([-act])
+
+    def value(self, model: List[int], wire: str) -> bool:
+        """Valore di un wire nel modello restituito da solve."""
+        return model[self.var_map[wire] - 1] > 0
+
+    def probe_values(self, model: List[int], names: Optional[Sequence[str]] = None) -> Dict[str, List[bool]]:
+        """
+        Valori delle sonde del circuito (Circuit.add_probe) nel modello: le
+        wire interne hanno già una variabile, quindi non serve ricodificare.
+        """
+        return decode_probes(self.circuit, model, self.var_map, names)
+
+    def close(self) -> None:
+        """Libera il solver."""
+        if self.solver is not None:
+            self.solver.delete()
+            self.solver = None
+
+    def __enter__(self) -> 'SolverSession':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def enumerate_models(
+    circuit: Circuit,
+    wires: Sequence[str],
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    max_count: Optional[int] = None,
+    backend: str = 'g3'
+) -> Iterator[Dict[str, bool]]:
+    """
+    Generatore delle soluzioni del circuito proiettate su `wires`, su un
+    unico solver incrementale (vedi SolverSession.iter_models).
+    Esempio: chiavi compatibili con alcune coppie di un DES a round ridotti
+        for key in enumerate_models(circ, key_wires, fi, fo, max_count=10): ...
+    """
+    with SolverSession(circuit, backend) as session:
+        yield from session.iter_models(wires, fixed_inputs, fixed_outputs, max_count)
+
+
+def _call_in_thread(fn: Callable[[], object]) -> object:
+    """
+    Esegue fn in un thread ausiliario e lo attende a piccoli passi, così il
+    thread chiamante resta libero di eseguire i gestori dei segnali.
+    """
+    outcome: Dict[str, object] = {}
+
+    def target() -> None:
+        try:
+            outcome['value'] = fn()
+        except BaseException as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    while worker.is_alive():
+        worker.join(0.05)
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+@contextmanager
+def interrupt_on_signal(session: SolverSession, signum: int = signal.SIGINT) -> Iterator[SolverSession]:
+    """
+    Context manager che interrompe le risoluzioni della sessione alla
+    ricezione del segnale `signum` (default SIGINT, Ctrl-C): la solve in
+    corso ritorna UNKNOWN invece di sollevare KeyboardInterrupt.
+    Va usato dal thread principale.
+    """
+    previous = signal.signal(signum, lambda *_: session.interrupt())
+    session._signal_safe = True
+    try:
+        yield session
+    finally:
+        session._signal_safe = False
+        signal.signal(signum, previous)
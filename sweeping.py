@@ -0,0 +1,249 @@
+# sweeping.py
+"""
+SAT sweeping (fraiging): individua wire funzionalmente equivalenti o
+complementari e le fonde in un circuito più piccolo.
+
+1. Simulazione casuale bit-parallela (simulate_packed) per raggruppare le
+   wire con la stessa firma (a meno di complemento) in classi candidate.
+2. Ogni candidata viene confrontata con il rappresentante della sua classe
+   tramite chiamate SAT incrementali con assunzioni su un unico solver.
+3. I controesempi trovati vengono aggiunti ai pattern di simulazione per
+   raffinare le classi rimanenti.
+4. Le equivalenze dimostrate vengono applicate al circuito e le gate
+   rimaste senza uscite utili vengono eliminate.
+"""
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pysat.solvers import Solver
+
+from new_ExtendedCircuitgraph import Circuit, Gate, simulate_packed
+from new_circuit_to_cnf import circuit_to_cnf, index_wires
+
+# Rappresentante speciale per le wire costanti
+CONST = '<const>'
+
+
+def _signature_key(sig: int, mask: int) -> Tuple[int, bool]:
+    """Firma normalizzata (bit 0 a zero) e flag di complemento."""
+    if sig & 1:
+        return sig ^ mask, True
+    return sig, False
+
+
+def sweep_equivalences(
+    circuit: Circuit,
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    n_patterns: int = 256,
+    seed: Optional[int] = None,
+    backend: str = 'g3',
+    conflict_limit: Optional[int] = 1000,
+    refine_every: int = 64
+) -> Dict[str, Tuple[str, bool]]:
+    """
+    Calcola le equivalenze dimostrate tra le wire del circuito.
+
+    Args:
+        circuit: istanza di Circuit
+        fixed_inputs: ingressi fissati (propagati come costanti)
+        n_patterns: numero di vettori casuali della simulazione iniziale
+        seed: seme del generatore casuale
+        backend: nome del solver pysat
+        conflict_limit: budget di conflitti per ogni prova (None = illimitato);
+            le prove che lo esauriscono vengono scartate
+        refine_every: numero di controesempi dopo cui ri-simulare e ricostruire le classi
+    Returns:
+        dizionario wire -> (rappresentante, complementata); il rappresentante
+        è CONST per le wire costanti (complementata=True significa costante 1)
+    """
+    fixed_inputs = fixed_inputs or {}
+    rng = random.Random(seed)
+    order = circuit.topo_sort()
+    inputs = circuit.inputs()
+    # Posizione topologica: gli ingressi precedono tutte le gate
+    position = {w: i for i, w in enumerate(inputs)}
+    for i, g in enumerate(order):
+        position[g.output] = len(inputs) + i
+    candidates = [g.output for g in order]
+
+    # Pattern di simulazione: per ogni ingresso un intero con un bit per vettore
+    width = n_patterns
+    patterns = {}
+    for w in inputs:
+        if w in fixed_inputs:
+            patterns[w] = (1 << width) - 1 if fixed_inputs[w] else 0
+        else:
+            patterns[w] = rng.getrandbits(width)
+
+    wire2idx = index_wires(circuit)
+    _, clauses = circuit_to_cnf(circuit, fixed_inputs=fixed_inputs, wire2idx=wire2idx)
+    solver = Solver(name=backend, bootstrap_with=clauses)
+    if conflict_limit is not None:
+        solver.conf_budget(conflict_limit)
+
+    def differ(assumptions: List[int]) -> Optional[bool]:
+        # True se esiste un assegnamento con le assunzioni (wire diverse),
+        # False se dimostrato impossibile, None se il budget è esaurito
+        if conflict_limit is None:
+            return solver.solve(assumptions=assumptions)
+        solver.conf_budget(conflict_limit)
+        return solver.solve_limited(assumptions=assumptions)
+
+    proven: Dict[str, Tuple[str, bool]] = {}
+    # Wire separate dal rappresentante in questa passata / prove abbandonate
+    refuted = set()
+    unknown = set()
+    counterexamples: List[Dict[str, bool]] = []
+
+    try:
+        while True:
+            mask = (1 << width) - 1
+            sims = simulate_packed(circuit, patterns, width)
+            # Classi: firma normalizzata -> rappresentante (il primo in ordine topologico)
+            classes: Dict[int, str] = {}
+            for w in sorted(position, key=position.get):
+                key, _ = _signature_key(sims[w], mask)
+                classes.setdefault(key, CONST if key == 0 else w)
+
+            for w in candidates:
+                if w in proven or w in refuted or w in unknown:
+                    continue
+                key, compl = _signature_key(sims[w], mask)
+                rep = classes[key]
+                if rep == w:
+                    continue
+                lit = wire2idx[w]
+                if rep == CONST:
+                    # w vale costantemente `compl`: cerca un assegnamento opposto
+                    results = [differ([-lit if compl else lit])]
+                else:
+                    rep_compl = _signature_key(sims[rep], mask)[1]
+                    r = wire2idx[rep]
+                    same = compl == rep_compl
+                    results = []
+                    for sign in (1, -1):
+                        res = differ([sign * r, -sign * lit if same else sign * lit])
+                        results.append(res)
+                        if res is not False:
+                            break
+                    compl = not same
+                if all(res is False for res in results):
+                    proven[w] = (rep, compl)
+                    # L'equivalenza dimostrata entra nel solver: le prove
+                    # successive (più profonde) partono da quelle già fatte
+                    if rep == CONST:
+                        solver.add_clause([lit if compl else -lit])
+                    else:
+                        s = -1 if compl else 1
+                        solver.add_clause([-r, s * lit])
+                        solver.add_clause([r, -s * lit])
+                elif results[-1] is None:
+                    unknown.add(w)
+                else:
+                    refuted.add(w)
+                    model = set(solver.get_model())
+                    counterexamples.append({i: wire2idx[i] in model for i in inputs})
+                    if len(counterexamples) >= refine_every:
+                        break
+
+            if not counterexamples:
+                break
+            # Raffinamento: aggiunge i controesempi ai pattern e riprova le
+            # wire separate con le nuove classi
+            for j, cex in enumerate(counterexamples):
+                for i in inputs:
+                    if cex[i]:
+                        patterns[i] |= 1 << (width + j)
+            width += len(counterexamples)
+            counterexamples = []
+            refuted = set()
+    finally:
+        solver.delete()
+    return proven
+
+
+def apply_equivalences(
+    circuit: Circuit,
+    equivalences: Dict[str, Tuple[str, bool]],
+    keep: Optional[Iterable[str]] = None
+) -> Circuit:
+    """
+    Ricostruisce il circuito sostituendo ogni wire equivalente con il suo
+    rappresentante ed elimina la logica non più necessaria.
+
+    Args:
+        circuit: istanza di Circuit
+        equivalences: risultato di sweep_equivalences
+        keep: wire da preservare (default: le uscite del circuito); se fuse,
+            vengono ricollegate al rappresentante con una BUF o una NOT
+    Returns:
+        nuovo Circuit
+    """
+    keep = set(circuit.outputs() if keep is None else keep)
+    swept = Circuit()
+
+    def resolve(w: str) -> Tuple[str, bool]:
+        rep, compl = equivalences.get(w, (w, False))
+        if rep == CONST:
+            return swept.constant(compl), False
+        return rep, compl
+
+    # Wire complementate: un'unica NOT per rappresentante
+    negated: Dict[str, str] = {}
+
+    def negation(rep: str) -> str:
+        if rep not in negated:
+            name = f"{rep}_n"
+            while name in circuit.wires:
+                name += "_"
+            negated[rep] = name
+            new_gates.append(Gate('NOT', [rep], name))
+        return negated[rep]
+
+    new_gates: List[Gate] = []
+    for gate in circuit.topo_sort():
+        if gate.output in equivalences:
+            if gate.output in keep:
+                rep, compl = resolve(gate.output)
+                new_gates.append(Gate('NOT' if compl else 'BUF', [rep], gate.output))
+            continue
+        fanin = []
+        for w in gate.inputs:
+            rep, compl = resolve(w)
+            fanin.append(negation(rep) if compl else rep)
+        new_gates.append(Gate(gate.gate_type, fanin, gate.output))
+
+    # Eliminazione della logica morta, a ritroso
+    needed = set(keep)
+    alive: List[Gate] = []
+    for gate in reversed(swept.gates + new_gates):
+        if gate.output in needed:
+            alive.append(gate)
+            needed.update(gate.inputs)
+    swept.gates = []
+    swept.wires = {}
+    for gate in reversed(alive):
+        swept.add_gate(gate.gate_type, gate.inputs, gate.output)
+    # Le wire da preservare restano nel circuito anche se scollegate
+    # (es. ingressi fissati le cui conseguenze sono diventate costanti)
+    for w in keep:
+        if w in circuit.wires:
+            swept.wires.setdefault(w, {})
+    return swept
+
+
+def sat_sweep(
+    circuit: Circuit,
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    keep: Optional[Iterable[str]] = None,
+    **kwargs
+) -> Circuit:
+    """
+    Esegue lo sweeping completo e ritorna il circuito ridotto.
+    Gli argomenti aggiuntivi vengono passati a sweep_equivalences.
+
+    Gli ingressi primari non vengono mai fusi: restano disponibili per
+    fixed_inputs, mentre le loro conseguenze costanti vengono propagate.
+    """
+    equivalences = sweep_equivalences(circuit, fixed_inputs, **kwargs)
+    return apply_equivalences(circuit, equivalences, keep)
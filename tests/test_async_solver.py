@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from async_solver import AsyncSolverPool, solve_async
+from multi_des import build_multi_des, random_des_pairs
+from new_ExtendedCircuitgraph import Circuit
+from solver import UNKNOWN
+
+
+def _and_circuit():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    return cir
+
+
+def _hard_instance():
+    # 5-round DES key recovery: far beyond the time limits used here
+    pairs = random_des_pairs(0x0123456789ABCDEF, 2, 5, seed=0)
+    return build_multi_des(pairs, 5)
+
+
+def test_solve_async_results():
+    async def run():
+        cir = _and_circuit()
+        jobs = [
+            solve_async(cir, fixed_outputs={'d': True}),
+            solve_async(cir, {'a': False}, {'d': True}),
+            solve_async(cir, fixed_outputs={'d': True}, backend='g3'),
+        ]
+        return await asyncio.gather(*jobs)
+
+    (sat1, model1), (sat2, model2), (sat3, _) = asyncio.run(run())
+    assert sat1 is True and set(model1) >= {1, 2, 3}
+    assert sat2 is False and model2 is None
+    assert sat3 is True
+    # The shared pool survives a new event loop
+    assert asyncio.run(solve_async(_and_circuit()))[0] is True
+
+
+def test_timeout_and_cancellation_kill_worker():
+    circ, fi, fo = _hard_instance()
+
+    async def run():
+        async with AsyncSolverPool(max_workers=2) as pool:
+            start = time.perf_counter()
+            assert await pool.solve(circ, fi, fo, timeout=0.3) == (UNKNOWN, None)
+            assert time.perf_counter() - start < 5
+            # The worker is killed whatever the backend
+            start = time.perf_counter()
+            assert await pool.solve(circ, fi, fo, backend='g3', timeout=0.3) == (UNKNOWN, None)
+            assert time.perf_counter() - start < 5
+            task = await pool.submit(circ, fi, fo)
+            await asyncio.sleep(0.3)
+            assert pool.running == 1
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert pool.running == 0 and pool.pending == 0
+
+    asyncio.run(run())
+
+
+def test_workers_are_reused():
+    async def run():
+        async with AsyncSolverPool(max_workers=1) as pool:
+            for _ in range(3):
+                assert (await pool.solve(_and_circuit(), fixed_outputs={'d': True}))[0] is True
+            assert len(pool._idle) == 1
+            first = pool._idle[0]
+            await pool.solve(_and_circuit())
+            assert pool._idle == [first]
+        assert pool._idle == [] and not first.proc.is_alive()
+
+    asyncio.run(run())
+
+
+def test_backpressure_and_worker_limit():
+    circ, fi, fo = _hard_instance()
+
+    async def run():
+        async with AsyncSolverPool(max_workers=1, max_pending=2) as pool:
+            first = await pool.submit(circ, fi, fo)
+            second = await pool.submit(_and_circuit())
+            # The queue is full: a third submission has to wait
+            third = asyncio.ensure_future(pool.submit(_and_circuit()))
+            await asyncio.sleep(0.3)
+            assert not third.done()
+            assert pool.running == 1 and pool.pending == 2
+            first.cancel()
+            assert (await second)[0] is True
+            assert (await (await third))[0] is True
+
+    asyncio.run(run())
+
+
+def test_invalid_limits_and_errors():
+    with pytest.raises(ValueError):
+        AsyncSolverPool(max_workers=4, max_pending=2)
+    with pytest.raises(RuntimeError):
+        asyncio.run(solve_async(_and_circuit(), backend='no-such-solver'))
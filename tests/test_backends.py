@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from backends import (BackendPool, PycosatBackend, PysatBackend, available_backends,
+                      create_backend, register_backend, use_backend, current_backend)
+from multi_des import build_multi_des, random_des_pairs
+from new_ExtendedCircuitgraph import Circuit
+from solver import UNKNOWN, DecisionHints, is_satisfiable
+
+
+def _and_circuit():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    return cir
+
+
+class RecordingBackend:
+    # Backend wrapper that remembers which thread used it
+    name = 'recording'
+
+    def __init__(self):
+        self.calls = []
+
+    def solve(self, clauses, **kwargs):
+        self.calls.append(threading.get_ident())
+        return PycosatBackend().solve(clauses, **kwargs)
+
+
+def test_registry_and_create():
+    assert isinstance(create_backend('pycosat'), PycosatBackend)
+    assert isinstance(create_backend('g3'), PysatBackend)
+    assert {'pycosat', 'g3', 'cd19'} <= set(available_backends())
+    with pytest.raises(KeyError):
+        create_backend('no-such-solver')
+    register_backend('recording', RecordingBackend)
+    assert isinstance(create_backend('recording'), RecordingBackend)
+
+
+def test_pool_reuses_instances():
+    pool = BackendPool()
+    with pool.borrow('g3') as first:
+        with pool.borrow('g3') as second:
+            assert first is not second
+    with pool.borrow('g3') as again:
+        assert again in (first, second)
+    assert pool.created == {'g3': 2}
+
+
+def test_per_call_and_context_backend():
+    cir = _and_circuit()
+    _, _, stats = is_satisfiable(cir, fixed_outputs={'d': True}, backend='g3', return_stats=True)
+    assert stats.backend == 'g3'
+    assert 'conflicts' in stats.solver_stats
+    with use_backend('cd19'):
+        assert current_backend() == 'cd19'
+        sat, _, stats = is_satisfiable(cir, {'a': False}, {'d': True}, return_stats=True)
+        assert sat is False and stats.backend == 'cd19'
+    assert current_backend() is None
+    assert is_satisfiable(cir, return_stats=True)[2].backend == 'pycosat'
+
+
+def test_conflict_budget_with_pysat_backend():
+    pairs = random_des_pairs(0x0123456789ABCDEF, 2, 5, seed=0)
+    circ, fi, fo = build_multi_des(pairs, 5)
+    assert is_satisfiable(circ, fi, fo, conflict_budget=100, backend='g3')[0] is UNKNOWN
+    with pytest.raises(ValueError):
+        is_satisfiable(circ, fi, fo, conflict_budget=100, backend='pycosat')
+
+
+def test_threads_use_their_own_backend():
+    cir = _and_circuit()
+    backends = {name: RecordingBackend() for name in ('x', 'y')}
+    results = {}
+
+    def job(name):
+        with use_backend(backends[name]):
+            for _ in range(20):
+                results.setdefault(name, []).append(
+                    is_satisfiable(cir, fixed_outputs={'d': True})[0])
+
+    threads = [threading.Thread(target=job, args=(n,)) for n in backends]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {'x': [True] * 20, 'y': [True] * 20}
+    for backend in backends.values():
+        # Each backend was only ever used by the thread that selected it
+        assert len(backend.calls) == 20 and len(set(backend.calls)) == 1
+
+
+def test_pysat_backend_keeps_live_solver():
+    cir = _and_circuit()
+    pool = BackendPool()
+    backend = pool.acquire('g3')
+    pool.release('g3', backend)
+    # Only the fixed values change: the pooled solver is reused via assumptions
+    with use_backend(backend):
+        assert is_satisfiable(cir, {'a': True, 'b': True}, {'d': True})[0] is True
+        assert is_satisfiable(cir, {'a': False}, {'d': True})[0] is False
+        assert is_satisfiable(cir, {'b': False}, {'d': False})[0] is True
+    assert backend.reused == 2
+    with pool.borrow('g3') as again:
+        assert again is backend
+    backend.close()
+    assert backend.solve([[1, 2], [-1]]) == [-1, 2]
+
+
+class PlainModule:
+    # Minimal backend following the documented solve(clauses) contract
+    name = 'plain'
+
+    @staticmethod
+    def solve(clauses):
+        return PycosatBackend().solve(clauses)
+
+
+def test_plain_backend_gets_only_clauses():
+    cir = _and_circuit()
+    hints = DecisionHints(phases={'a': False})
+    assert is_satisfiable(cir, fixed_outputs={'d': True}, hints=hints, backend=PlainModule)[0] is True
+    with pytest.raises(ValueError):
+        is_satisfiable(cir, fixed_outputs={'d': True}, propagation_budget=10, backend=PlainModule)
@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from bitsim import BitSimulator, levelize, pack_vectors, simulate_batch, unpack_words
+from new_ExtendedCircuitgraph import Circuit, simulate_circuit
+
+
+def _mixed_circuit():
+    cir = Circuit()
+    cir.add_gate('NAND', ['a', 'b', 'c'], 'n1')
+    cir.add_gate('XNOR', ['a', 'n1'], 'x')
+    cir.mux('c', 'x', 'b', 'm')
+    cir.maj('a', 'm', 'n1', 'y')
+    cir.add_gate('NOR', ['y', 'b'], 'z')
+    cir.add_gate('XOR', ['a', 'b', 'c'], 'p')
+    cir.add_gate('OR', ['p', cir.constant(True)], 't')
+    cir.add_gate('AND', ['z', 'p'], 'u')
+    cir.add_gate('NOT', ['u'], 'v')
+    cir.add_gate('BUF', ['v'], 'w')
+    return cir
+
+
+def test_pack_roundtrip():
+    rng = np.random.default_rng(1)
+    for n in (1, 63, 64, 65, 1000):
+        bits = rng.random((3, n)) < 0.5
+        words = pack_vectors(bits)
+        assert words.dtype == np.uint64 and words.shape == (3, (n + 63) // 64)
+        assert np.array_equal(unpack_words(words, n), bits)
+    # Bit j of word w is vector 64*w + j
+    assert pack_vectors([True, False, True])[0] == 5
+
+
+def test_levelize():
+    levels = levelize(_mixed_circuit())
+    assert [g.output for g in levels[0]][:1] == ['n1']
+    position = {g.output: i for i, lv in enumerate(levels) for g in lv}
+    for lv in levels:
+        for g in lv:
+            assert all(position.get(w, -1) < position[g.output] for w in g.inputs)
+
+
+def test_matches_simulate_circuit():
+    cir = _mixed_circuit()
+    vectors = list(itertools.product([False, True], repeat=3)) * 30
+    batch = simulate_batch(cir, {w: [v[i] for v in vectors] for i, w in enumerate('abc')})
+    for j, v in enumerate(vectors[:8]):
+        single = simulate_circuit(cir, dict(zip('abc', v)))
+        for w, val in single.items():
+            assert batch[w][j] == val
+
+
+def test_scalar_inputs_chunks_and_outputs():
+    cir = _mixed_circuit()
+    sim = BitSimulator(cir)
+    rng = np.random.default_rng(2)
+    a = rng.random(5000) < 0.5
+    b = rng.random(5000) < 0.5
+    full = sim.simulate({'a': a, 'b': b, 'c': True})
+    chunked = sim.simulate({'a': a, 'b': b, 'c': True}, outputs=['w', 't'], chunk_words=3)
+    assert set(chunked) == {'w', 't'}
+    assert np.array_equal(chunked['w'], full['w'])
+    assert chunked['t'].all()
+    with pytest.raises(KeyError):
+        sim.simulate({'a': a, 'b': b})
@@ -0,0 +1,90 @@
+import itertools
+import pytest
+import pycosat
+from cardinality import (
+    encode_atmost, encode_atleast, encode_exactly, encode_pb_atmost,
+    bdd_pb_atmost, swc_pb_atmost, at_most, at_least, exactly, pseudo_boolean
+)
+from new_ExtendedCircuitgraph import Circuit
+from solver import is_satisfiable
+
+
+def _accepts(clauses, n, bits):
+    # True if clauses are satisfiable with variables 1..n fixed to bits
+    units = [[i + 1 if b else -(i + 1)] for i, b in enumerate(bits)]
+    return pycosat.solve(clauses + units) != 'UNSAT'
+
+
+def _check(clauses, n, predicate):
+    for bits in itertools.product([False, True], repeat=n):
+        assert _accepts(clauses, n, bits) == predicate(bits), bits
+
+
+@pytest.mark.parametrize('encoding', ['seqcounter', 'totalizer', 'cardnet', None])
+@pytest.mark.parametrize('n,k', [(2, 1), (4, 1), (5, 2), (6, 3), (7, 5)])
+def test_atmost_encodings(encoding, n, k):
+    lits = list(range(1, n + 1))
+    clauses, top = encode_atmost(lits, k, n, encoding)
+    assert top >= n
+    _check(clauses, n, lambda bits: sum(bits) <= k)
+
+
+@pytest.mark.parametrize('n,k', [(4, 0), (4, 1), (5, 3), (5, 5), (3, 4)])
+def test_atleast_exactly(n, k):
+    lits = list(range(1, n + 1))
+    clauses, _ = encode_atleast(lits, k, n)
+    _check(clauses, n, lambda bits: sum(bits) >= k)
+    clauses, _ = encode_exactly(lits, k, n)
+    _check(clauses, n, lambda bits: sum(bits) == k)
+
+
+def test_atmost_negative_literals():
+    # at most one of (¬x1, ¬x2, ¬x3) false-valued -> at least two true
+    clauses, _ = encode_atmost([-1, -2, -3], 1, 3)
+    _check(clauses, 3, lambda bits: sum(bits) >= 2)
+
+
+@pytest.mark.parametrize('weights,bound', [
+    ([3, 2, 2, 1], 4),
+    ([5, 1, 1, 1, 1], 5),
+    ([4, -2, 3, 1], 3),
+    ([2, 2, 2], 0),
+])
+def test_pb_atmost(weights, bound):
+    n = len(weights)
+    lits = list(range(1, n + 1))
+    expected = lambda bits: sum(w for w, b in zip(weights, bits) if b) <= bound
+    clauses, _ = encode_pb_atmost(weights, lits, bound, n)
+    _check(clauses, n, expected)
+
+
+def test_pb_encoders_positive_weights():
+    weights, bound = [4, 3, 3, 2, 1], 6
+    lits = [1, 2, 3, 4, 5]
+    expected = lambda bits: sum(w for w, b in zip(weights, bits) if b) <= bound
+    for encoder in (bdd_pb_atmost, swc_pb_atmost):
+        clauses, _ = encoder(weights, lits, bound, 5)
+        _check(clauses, 5, expected)
+
+
+def test_constraints_in_circuit():
+    # Key wires k0..k3 feed an AND; Hamming weight <= 2 makes y=1 impossible
+    cir = Circuit()
+    keys = [f"k{i}" for i in range(4)]
+    cir.add_gate('AND', keys, 'y')
+    sat, _ = is_satisfiable(cir, fixed_outputs={'y': True}, constraints=[at_most(keys, 2)])
+    assert sat is False
+    sat, _ = is_satisfiable(cir, fixed_outputs={'y': True}, constraints=[at_least(keys, 4)])
+    assert sat is True
+    sat, _ = is_satisfiable(cir, fixed_outputs={'y': False}, constraints=[exactly(keys, 4)])
+    assert sat is False
+    weighted = pseudo_boolean({'k0': 2, 'k1': 2, 'k2': 1, 'k3': 1}, '>=', 7)
+    sat, _ = is_satisfiable(cir, constraints=[weighted])
+    assert sat is False
+
+
+def test_constraint_unknown_wire():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'y')
+    with pytest.raises(KeyError):
+        is_satisfiable(cir, constraints=[at_most(['a', 'z'], 1)])
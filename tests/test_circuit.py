@@ -0,0 +1,223 @@
+import itertools
+from collections import OrderedDict
+
+import pytest
+
+import new_ExtendedCircuitgraph
+from new_ExtendedCircuitgraph import Circuit, simulate_circuit, simulate_packed
+
+
+def test_inputs():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    cir.add_gate('OR', ['d', 'c'], 'y')
+    assert sorted(cir.inputs()) == ['a', 'b', 'c']
+
+
+def test_topo_sort_out_of_order():
+    cir = Circuit()
+    # y is added before the gate that drives its input d
+    cir.add_gate('OR', ['d', 'c'], 'y')
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    order = [g.output for g in cir.topo_sort()]
+    assert order == ['d', 'y']
+
+
+def test_topo_sort_cycle():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'y'], 'x')
+    cir.add_gate('BUF', ['x'], 'y')
+    with pytest.raises(ValueError):
+        cir.topo_sort()
+
+
+def test_simulate_native_gates():
+    cir = Circuit()
+    cir.add_gate('NAND', ['a', 'b'], 'n1')
+    cir.add_gate('NOR', ['a', 'b'], 'n2')
+    cir.mux('s', 'n1', 'n2', 'm')
+    cir.maj('a', 'b', 'm', 'y')
+    values = simulate_circuit(cir, {'a': True, 'b': False, 's': True})
+    assert values['n1'] is True
+    assert values['n2'] is False
+    assert values['m'] is True
+    assert values['y'] is True
+    values = simulate_circuit(cir, {'a': True, 'b': False, 's': False})
+    assert values['m'] is False
+    assert values['y'] is False
+
+
+def test_simulate_missing_input():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    with pytest.raises(KeyError):
+        simulate_circuit(cir, {'a': True})
+
+
+def _word(prefix, n):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+def _assign(wires, value):
+    n = len(wires)
+    return {w: bool((value >> (n - 1 - i)) & 1) for i, w in enumerate(wires)}
+
+
+def _read(values, wires):
+    return int("".join('1' if values[w] else '0' for w in wires), 2)
+
+
+@pytest.mark.parametrize('x,y', [(0, 0), (0xFF, 1), (0x5A, 0xC3), (0x80, 0x80), (3, 0xFE)])
+def test_add_sub_mod(x, y):
+    cir = Circuit()
+    a, b = _word('a', 8), _word('b', 8)
+    s, d = _word('s', 8), _word('d', 8)
+    cir.add_mod(a, b, s)
+    cir.sub_mod(a, b, d)
+    values = simulate_circuit(cir, {**_assign(a, x), **_assign(b, y)})
+    assert _read(values, s) == (x + y) % 256
+    assert _read(values, d) == (x - y) % 256
+
+
+def test_rotations_are_aliases():
+    cir = Circuit()
+    a = _word('a', 8)
+    assert Circuit.rotl(a, 3) == a[3:] + a[:3]
+    assert Circuit.rotr(a, 3) == a[5:] + a[:5]
+    assert cir.gates == []
+    with pytest.raises(ValueError):
+        Circuit.rotl([], 1)
+    with pytest.raises(ValueError):
+        Circuit.rotr([], 1)
+
+
+def test_word_operators_edge_cases():
+    cir = Circuit()
+    a = _word('a', 4)
+    # A zero shift is a plain copy and adds no constant wire
+    assert cir.shl(a, 0) == a and cir.shr(a, 0) == a
+    assert cir.shl([], 2) == []
+    assert cir.gates == [] and 'const0' not in cir.wires
+    with pytest.raises(ValueError):
+        cir.add_mod([], [], [])
+    with pytest.raises(ValueError):
+        cir.sub_mod([], [], [])
+
+
+def test_shifts_and_constants():
+    cir = Circuit()
+    a, o1, o2 = _word('a', 8), _word('o', 8), _word('p', 8)
+    cir.xor_vector(cir.shl(a, 3), cir.const_vector(0x0F, 8), o1)
+    cir.and_vector(cir.shr(a, 2), cir.const_vector(0xFF, 8), o2)
+    # Only one gate per constant wire
+    assert sum(g.gate_type.startswith('CONST') for g in cir.gates) == 2
+    values = simulate_circuit(cir, _assign(a, 0xB7))
+    assert _read(values, o1) == ((0xB7 << 3) & 0xFF) ^ 0x0F
+    assert _read(values, o2) == 0xB7 >> 2
+
+
+def test_outputs():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    cir.add_gate('OR', ['d', 'c'], 'y')
+    cir.add_gate('NOT', ['d'], 'z')
+    assert cir.outputs() == ['y', 'z']
+
+
+def test_simulate_packed_matches_simulate():
+    cir = Circuit()
+    cir.add_gate('NAND', ['a', 'b', 'c'], 'n1')
+    cir.add_gate('XNOR', ['a', 'n1'], 'x')
+    cir.mux('c', 'x', 'b', 'm')
+    cir.maj('a', 'm', 'n1', 'y')
+    cir.add_gate('NOR', ['y', 'b'], 'z')
+    vectors = list(itertools.product([False, True], repeat=3))
+    words = {w: sum(1 << j for j, v in enumerate(vectors) if v[i]) for i, w in enumerate('abc')}
+    packed = simulate_packed(cir, words, len(vectors))
+    for j, v in enumerate(vectors):
+        single = simulate_circuit(cir, dict(zip('abc', v)))
+        for w in ['n1', 'x', 'm', 'y', 'z']:
+            assert bool((packed[w] >> j) & 1) == single[w]
+
+
+def test_compile_matches_simulation():
+    cir = Circuit()
+    cir.add_gate('NAND', ['a', 'b', 'c'], 'n1')
+    cir.add_gate('XNOR', ['a', 'n1'], 'x')
+    cir.mux('c', 'x', 'b', 'm')
+    cir.maj('a', 'm', 'n1', 'y')
+    cir.add_gate('NOR', ['y', 'b'], 'z')
+    cir.add_gate('OR', ['z', cir.constant(False)], 'o')
+    fn = cir.compile(['n1', 'x', 'm', 'y', 'z', 'o'])
+    vectors = list(itertools.product([False, True], repeat=3))
+    words = {w: sum(1 << j for j, v in enumerate(vectors) if v[i]) for i, w in enumerate('abc')}
+    packed = fn(words, len(vectors))
+    for j, v in enumerate(vectors):
+        single = simulate_circuit(cir, dict(zip('abc', v)))
+        assert bool(fn(dict(zip('abc', v)))['y']) == single['y']
+        for w in packed:
+            assert bool((packed[w] >> j) & 1) == single[w]
+    # Default outputs are the circuit outputs
+    assert set(cir.compile()({'a': 1, 'b': 0, 'c': 1})) == {'o'}
+
+
+def test_compile_cache_by_structure():
+    def build():
+        cir = Circuit()
+        cir.add_gate('AND', ['a', 'b'], 'd')
+        return cir
+    first, second = build(), build()
+    assert first.structural_hash() == second.structural_hash()
+    assert first.compile() is second.compile()
+    second.add_gate('NOT', ['d'], 'e')
+    assert second.structural_hash() != first.structural_hash()
+    assert second.compile()({'a': 1, 'b': 1}) == {'e': 0}
+    with pytest.raises(KeyError):
+        first.compile(['missing'])
+    with pytest.raises(KeyError):
+        first.compile()({'a': 1})
+
+
+def test_structural_hash_memo_and_lru(monkeypatch):
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    digest = cir.structural_hash()
+    assert cir.structural_hash() is digest
+    # Registering a wire directly still invalidates the memoized hash
+    cir.wires.setdefault('spare', {})
+    assert cir.structural_hash() != digest
+    monkeypatch.setattr(new_ExtendedCircuitgraph, '_COMPILED', OrderedDict())
+    monkeypatch.setattr(new_ExtendedCircuitgraph, '_COMPILED_MAX', 2)
+    first = cir.compile(['d'])
+    cir.compile(['a'])
+    assert cir.compile(['d']) is first
+    cir.compile(['b'])
+    # 'a' was the least recently used entry
+    assert len(new_ExtendedCircuitgraph._COMPILED) == 2
+    assert cir.compile(['d']) is first
+    assert not any(k.endswith('#a') for k in new_ExtendedCircuitgraph._COMPILED)
+
+
+def test_probes_from_simulation():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'n0')
+    cir.add_gate('OR', ['a', 'b'], 'n1')
+    cir.add_gate('XOR', ['n0', 'n1'], 'y')
+    assert cir.add_probe('inner', 'n*') == ['n0', 'n1']
+    cir.add_probe('out', ['y'])
+    with pytest.raises(KeyError):
+        cir.add_probe('bad', ['zz'])
+    with pytest.raises(KeyError):
+        cir.add_probe('bad', 'zz*')
+    values = simulate_circuit(cir, {'a': True, 'b': False})
+    assert cir.read_probes(values) == {'inner': [False, True], 'out': [True]}
+    # Packed: vectors (a, b) = (1, 0), (1, 1)
+    assert cir.simulate_probes({'a': 0b11, 'b': 0b10}, width=2) == {'inner': [0b10, 0b11], 'out': [0b01]}
+    assert cir.simulate_probes({'a': 1, 'b': 1}, names=['out']) == {'out': [0]}
+    # Probes do not change the structure
+    plain = Circuit()
+    for g in cir.gates:
+        plain.add_gate(g.gate_type, list(g.inputs), g.output)
+    assert plain.structural_hash() == cir.structural_hash()
+    cir.remove_probe('out')
+    assert cir.probe_wires() == ['n0', 'n1']
@@ -1,9 +1,26 @@
+import itertools
+import pycosat
 import pytest
 from new_circuit_to_cnf import (
     index_wires, cnf_and, cnf_or, cnf_xor, cnf_buf,
+    cnf_nand, cnf_nor, cnf_mux, cnf_maj, cnf_xor3,
     add_unit_clauses, circuit_to_cnf
 )
-from new_ExtendedCircuitgraph import Circuit
+from new_ExtendedCircuitgraph import Circuit, evaluate_gate, simulate_circuit
+
+
+def _satisfied(clauses, assignment):
+    # assignment: dict var -> bool
+    return all(any(assignment[abs(l)] == (l > 0) for l in cl) for cl in clauses)
+
+
+def _check_encoding(gate_type, clauses, n_inputs):
+    # Inputs are variables 1..n, output is n+1: the clauses must hold exactly
+    # when the output equals the gate function.
+    for bits in itertools.product([False, True], repeat=n_inputs + 1):
+        assignment = {i + 1: b for i, b in enumerate(bits)}
+        expected = evaluate_gate(gate_type, list(bits[:-1])) == bits[-1]
+        assert _satisfied(clauses, assignment) == expected
 
 
 def test_index_wires_empty():
@@ -21,15 +38,47 @@ def test_index_wires_non_empty():
     assert mapping == {'a': 1, 'b': 2, 'c': 3}
 
 
+@pytest.mark.parametrize('order', ['topo', 'bfs'])
+def test_index_wires_orders(order):
+    cir = Circuit()
+    cir.add_gate('OR', ['d', 'c'], 'y')
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    mapping = index_wires(cir, order)
+    # Same wires as the name order, numbered 1..n
+    assert set(mapping) == {'a', 'b', 'c', 'd', 'y'}
+    assert sorted(mapping.values()) == [1, 2, 3, 4, 5]
+    if order == 'topo':
+        # Every gate output comes after its inputs
+        assert mapping['a'] < mapping['d'] < mapping['y']
+        assert mapping['c'] < mapping['y']
+
+
+def test_index_wires_unknown_order():
+    with pytest.raises(ValueError):
+        index_wires(Circuit(), 'random')
+
+
+def test_circuit_to_cnf_order_with_map():
+    cir = Circuit()
+    cir.add_gate('OR', ['d', 'c'], 'y')
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    wire2idx = index_wires(cir, 'topo')
+    nvars, clauses = circuit_to_cnf(cir, fixed_inputs={'a': True}, order='topo', wire2idx=wire2idx)
+    assert nvars == 5
+    # Clauses of the AND gate (driving d) come before the OR gate ones
+    assert clauses[0] == [-wire2idx['a'], -wire2idx['b'], wire2idx['d']]
+    assert clauses[-1] == [wire2idx['a']]
+
+
 def test_cnf_and():
     # AND gate: y = a AND b
     clauses = cnf_and([1, 2], 3)
-    # Expect 2*(inputs) clauses: (¬a ∨ y), (¬b ∨ y), (¬y ∨ a), (¬y ∨ b)
-    assert [-1, 3] in clauses
-    assert [-2, 3] in clauses
+    # Expect 1 + inputs clauses: (¬a ∨ ¬b ∨ y), (¬y ∨ a), (¬y ∨ b)
+    assert [-1, -2, 3] in clauses
     assert [-3, 1] in clauses
     assert [-3, 2] in clauses
-    assert len(clauses) == 4
+    assert len(clauses) == 3
+    _check_encoding('AND', clauses, 2)
 
 
 def test_cnf_or():
@@ -60,6 +109,58 @@ def test_cnf_buf():
     assert len(clauses) == 2
 
 
+def test_cnf_nand_nor():
+    _check_encoding('NAND', cnf_nand([1, 2, 3], 4), 3)
+    _check_encoding('NOR', cnf_nor([1, 2, 3], 4), 3)
+    # Single clause with all inputs plus one binary clause per input
+    assert len(cnf_nand([1, 2, 3], 4)) == 4
+    assert len(cnf_nor([1, 2, 3], 4)) == 4
+
+
+def test_cnf_mux():
+    _check_encoding('MUX', cnf_mux(1, 2, 3, 4), 3)
+
+
+def test_cnf_maj():
+    _check_encoding('MAJ', cnf_maj(1, 2, 3, 4), 3)
+    assert len(cnf_maj(1, 2, 3, 4)) == 6
+
+
+def test_cnf_xor3():
+    _check_encoding('XOR', cnf_xor3(1, 2, 3, 4), 3)
+    assert len(cnf_xor3(1, 2, 3, 4)) == 8
+
+
+def test_adder_encoding_matches_simulation():
+    cir = Circuit()
+    a, b, s = (['%s%d' % (p, i) for i in range(4)] for p in 'abs')
+    cir.add_mod(a, b, s)
+    wire2idx = index_wires(cir)
+    for x, y in [(3, 5), (15, 1), (9, 9)]:
+        fixed = {w: bool((x >> (3 - i)) & 1) for i, w in enumerate(a)}
+        fixed.update({w: bool((y >> (3 - i)) & 1) for i, w in enumerate(b)})
+        _, clauses = circuit_to_cnf(cir, fixed_inputs=fixed)
+        model = set(pycosat.solve(clauses))
+        expected = simulate_circuit(cir, fixed)
+        assert all((wire2idx[w] in model) == expected[w] for w in s)
+
+
+def test_circuit_to_cnf_native_gates():
+    cir = Circuit()
+    cir.add_gate('NAND', ['a', 'b'], 'n')
+    cir.add_gate('ITE', ['s', 'n', 'c'], 'm')
+    cir.add_gate('MAJ', ['a', 'b', 'm'], 'y')
+    # ITE is stored as MUX
+    assert cir.gates[1].gate_type == 'MUX'
+    nvars, clauses = circuit_to_cnf(cir)
+    assert nvars == 7
+    assert len(clauses) == 3 + 6 + 6
+
+    cir.add_gate('MAJ', ['a', 'b'], 'z')
+    with pytest.raises(ValueError):
+        circuit_to_cnf(cir)
+
+
 def test_add_unit_clauses():
     clauses = []
     mapping = {'a': 1, 'b': 2}
@@ -78,9 +179,10 @@ def test_circuit_to_cnf_simple():
     # Wires: a,b,c,d,y -> 5 variables
     assert nvars == 5
     # Check some expected clauses
-    # from AND: (¬a ∨ d), (¬b ∨ d), (¬d ∨ a), (¬d ∨ b)
-    assert [-1, 4] in clauses
-    assert [-2, 4] in clauses
+    # from AND: (¬a ∨ ¬b ∨ d), (¬d ∨ a), (¬d ∨ b)
+    assert [-1, -2, 4] in clauses
+    assert [-4, 1] in clauses
+    assert [-4, 2] in clauses
     # from OR: (d ∨ c ∨ ¬y)
     # mapping: a:1,b:2,c:3,d:4,y:5
     assert [4, 3, -5] in clauses
@@ -0,0 +1,56 @@
+import pytest
+from new_ExtendedCircuitgraph import Circuit
+from new_circuit_to_cnf import index_wires
+from cube_and_conquer import cube_and_conquer, generate_cubes, select_cube_variables
+
+KEYS = [f"k{i}" for i in range(6)]
+
+
+def _lock():
+    # y = 1 only for the key 101101
+    cir = Circuit()
+    lits = []
+    for i, k in enumerate(KEYS):
+        if (0b101101 >> (5 - i)) & 1:
+            lits.append(k)
+        else:
+            cir.add_gate('NOT', [k], f"n{k}")
+            lits.append(f"n{k}")
+    cir.add_gate('AND', lits, 'y')
+    return cir
+
+
+@pytest.mark.parametrize('heuristic', ['lookahead', 'activity'])
+def test_cube_and_conquer_finds_key(heuristic):
+    cir = _lock()
+    sat, model, report = cube_and_conquer(cir, KEYS, fixed_outputs={'y': True},
+                                          n_cube_vars=3, heuristic=heuristic, processes=2)
+    assert sat is True
+    wire2idx = index_wires(cir)
+    key = ''.join('1' if model[wire2idx[k] - 1] > 0 else '0' for k in KEYS)
+    assert key == '101101'
+    assert len(report['cube_vars']) == 3
+    assert report['cubes'] + report['pruned'] == 8
+
+
+def test_cube_and_conquer_unsat():
+    cir = _lock()
+    sat, model, report = cube_and_conquer(cir, KEYS, fixed_inputs={'k0': False},
+                                          fixed_outputs={'y': True}, n_cube_vars=2, processes=2)
+    assert sat is False and model is None
+    # Every cube fails by propagation: the report still names the key wires
+    assert report['cubes'] == 0 and report['pruned'] == 4
+    assert len(report['cube_vars']) == 2 and set(report['cube_vars']) <= set(KEYS)
+
+
+def test_generate_cubes_prunes_by_propagation():
+    # Clause (¬1 ∨ ¬2): the cube [1, 2] fails by propagation
+    cubes, pruned = generate_cubes([[-1, -2], [1, 2, 3]], [1, 2])
+    assert pruned == 1
+    assert [1, 2] not in cubes
+    assert len(cubes) == 3
+
+
+def test_select_cube_variables_unknown_heuristic():
+    with pytest.raises(ValueError):
+        select_cube_variables([[1, 2]], [1, 2], 1, heuristic='random')
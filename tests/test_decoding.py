@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from decoding import ModelDecoder, bits_to_int, decode_block, decode_probes, model_bits
+from des_circuit import des_round, initial_permutation, key_schedule
+from des_python import des_encrypt_block
+from multi_des import build_multi_des, random_des_pairs, wires_to_block
+from new_ExtendedCircuitgraph import Circuit
+from new_circuit_to_cnf import index_wires
+from solver import SolverSession, is_satisfiable
+
+
+def test_model_bits_and_int():
+    bits = model_bits([1, -2, 3, -4])
+    assert bits.tolist() == [False, True, False, True, False]
+    assert model_bits([-1], num_vars=3).shape == (4,)
+    assert bits_to_int([True, False, True]) == 5
+    assert bits_to_int([True] + [False] * 63) == 1 << 63
+
+
+def test_decoder_groups():
+    var_map = {'x0': 3, 'x1': 1, 'x2': 2, 'y': 4}
+    dec = ModelDecoder(var_map)
+    model = [1, -2, 3, -4]
+    assert dec.values(model, ['x0', 'x1', 'x2']) == {'x0': True, 'x1': True, 'x2': False}
+    assert dec.word(model, ['x0', 'x1', 'x2']) == 0b110
+    assert dec.hex(model, ['x0', 'x1', 'x2', 'y']) == 'C'
+    assert dec.decode(model, {'x': ['x0', 'x1', 'x2'], 'y': ['y']}) == {'x': 6, 'y': 0}
+    with pytest.raises(KeyError):
+        dec.word(model, ['x0', 'z'])
+    assert dec.word(model, ['x0', 'z'], missing=True) == 0b11
+    assert dec.words_many([model, [-1, 2, -3, 4]], ['x0', 'x1', 'x2', 'y']) == [0b1100, 0b0011]
+    assert dec.words_many([], ['x0']) == []
+
+
+def test_decode_des_key_and_blocks():
+    key = 0x0123456789ABCDEF
+    circ, fixed_in, fixed_out = build_multi_des(random_des_pairs(key, 2, 2, seed=3), 2)
+    sat, model = is_satisfiable(circ, fixed_in, fixed_out)
+    assert sat
+    var_map = index_wires(circ)
+    dec = ModelDecoder(var_map)
+    found = decode_block(model, var_map, 'k')
+    values = {w: v for w, v in zip(var_map, dec.wires(model, list(var_map)))}
+    assert found == wires_to_block(values, 'k')
+    pt = decode_block(model, var_map, 'inst0_pt')
+    ct = decode_block(model, var_map, 'inst0_ct')
+    assert des_encrypt_block(pt, found, n_rounds=2) == ct
+
+
+def test_words_many_matches_iter_models():
+    key = 0x0123456789ABCDEF
+    circ, fixed_in, fixed_out = build_multi_des(random_des_pairs(key, 1, 1, seed=0), 1)
+    key_wires = [f"k{i}" for i in range(64) if f"k{i}" in circ.wires]
+    with SolverSession(circ) as session:
+        models = []
+        for _ in range(5):
+            sat, model = session.solve(fixed_in, fixed_out)
+            models.append(model)
+            # Block this key to get a different model next time
+            session.solver.add_clause([-session.var_map[w] if session.value(model, w) else session.var_map[w]
+                                       for w in key_wires])
+        words = ModelDecoder(session.var_map).words_many(models, key_wires)
+    assert words == [ModelDecoder(session.var_map).word(m, key_wires) for m in models]
+    assert len(set(words)) == 5
+
+
+def test_probe_round_states_from_model_and_simulation():
+    # Two DES rounds on the new Circuit, probing the right half after each round
+    cir = Circuit()
+    pt = [f"pt{i}" for i in range(64)]
+    key = [f"k{i}" for i in range(64)]
+    subkeys = key_schedule(cir, key)
+    perm = initial_permutation(cir, pt)
+    left, right = perm[:32], perm[32:]
+    for r in (1, 2):
+        left, right = des_round(cir, left, right, subkeys[r - 1], r)
+    cir.add_probe('R1', 'r1_R_*')
+    cir.add_probe('R2', 'r2_R_*')
+    assert len(cir.probes['R1']) == 32
+
+    inputs = {'CONST0': False, 'CONST1': True}
+    inputs.update({w: bool((0x0123456789ABCDEF >> (63 - i)) & 1) for i, w in enumerate(pt)})
+    inputs.update({w: bool((0x133457799BBCDFF1 >> (63 - i)) & 1) for i, w in enumerate(key)})
+    simulated = cir.simulate_probes({w: int(v) for w, v in inputs.items() if w in cir.wires})
+    # R1 of the classic worked example
+    assert bits_to_int(simulated['R1']) == 0xEF4A6544
+
+    fixed = {w: v for w, v in inputs.items() if w in cir.wires}
+    with SolverSession(cir) as session:
+        sat, model = session.solve(fixed_inputs=fixed)
+        assert sat
+        probes = session.probe_values(model)
+    assert probes == {n: [bool(v) for v in vals] for n, vals in simulated.items()}
+    assert decode_probes(cir, model, session.var_map, ['R2']) == {'R2': probes['R2']}
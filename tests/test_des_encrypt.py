@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from des_circuit import des_encrypt, des_encrypt_batch, des_structure
+from des_python import des_encrypt as python_encrypt
+
+
+def test_structure_is_cached_and_input_independent():
+    circuit, input_wires, key_wires, output_wires = des_structure()
+    assert des_structure()[0] is circuit
+    assert len(input_wires) == len(key_wires) == len(output_wires) == 64
+    assert set(input_wires + key_wires) <= set(circuit.inputs())
+
+
+def test_des_encrypt_matches_python():
+    assert des_encrypt("0123456789ABCDEF", "133457799BBCDFF1") == "85E813540F0AB405"
+    rng = random.Random(3)
+    for _ in range(20):
+        pt = f"{rng.getrandbits(64):016X}"
+        key = f"{rng.getrandbits(64):016X}"
+        assert des_encrypt(pt, key) == python_encrypt(pt, key)
+
+
+def test_des_encrypt_batch():
+    rng = random.Random(4)
+    pts = [f"{rng.getrandbits(64):016X}" for _ in range(200)]
+    keys = [f"{rng.getrandbits(64):016X}" for _ in range(200)]
+    assert des_encrypt_batch(pts, keys) == [python_encrypt(p, k) for p, k in zip(pts, keys)]
+    assert des_encrypt_batch(pts[:5], keys[0]) == [python_encrypt(p, keys[0]) for p in pts[:5]]
+    assert des_encrypt_batch([], keys[0]) == []
+    with pytest.raises(ValueError):
+        des_encrypt_batch(pts[:2], keys[:3])
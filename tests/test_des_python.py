@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from des_python import (des_encrypt, des_encrypt_bitsliced, des_encrypt_block,
+                        des_encrypt_reference, key_schedule)
+
+
+def test_reference_vectors():
+    assert des_encrypt("0000000000000000", "0000000000000000") == "8CA64DE9C1B123A7"
+    assert des_encrypt("0123456789ABCDEF", "133457799BBCDFF1") == "85E813540F0AB405"
+
+
+def test_integer_des_matches_string_reference():
+    rng = random.Random(7)
+    for n_rounds in (0, 1, 3, 8, 16):
+        for _ in range(10):
+            pt = f"{rng.getrandbits(64):016X}"
+            key = f"{rng.getrandbits(64):016X}"
+            assert des_encrypt(pt, key, n_rounds) == des_encrypt_reference(pt, key, n_rounds)
+            assert des_encrypt_block(int(pt, 16), int(key, 16), n_rounds) == int(des_encrypt(pt, key, n_rounds), 16)
+
+
+def test_key_schedule_is_cached():
+    subkeys = key_schedule(0x133457799BBCDFF1)
+    assert len(subkeys) == 16 and all(k < (1 << 48) for k in subkeys)
+    # First round subkey of the classic worked example
+    assert subkeys[0] == 0b000110110000001011101111111111000111000001110010
+    assert key_schedule(0x133457799BBCDFF1) is subkeys
+
+
+@pytest.mark.parametrize("n_rounds", [1, 4, 16])
+def test_bitsliced_matches_reference(n_rounds):
+    rng = random.Random(n_rounds)
+    # 130 blocks: two full 64-block words plus a partial one
+    pts = [rng.getrandbits(64) for _ in range(130)]
+    keys = [rng.getrandbits(64) for _ in range(130)]
+    ct = des_encrypt_bitsliced(pts, keys, n_rounds)
+    assert ct.dtype == np.uint64
+    assert [int(c) for c in ct] == [des_encrypt_block(p, k, n_rounds) for p, k in zip(pts, keys)]
+    # Single shared key, several chunks
+    ct = des_encrypt_bitsliced(pts, keys[0], n_rounds, chunk_words=1)
+    assert [int(c) for c in ct] == [des_encrypt_block(p, keys[0], n_rounds) for p in pts]
+
+
+def test_bitsliced_key_count_mismatch():
+    with pytest.raises(ValueError):
+        des_encrypt_bitsliced([1, 2, 3], [4, 5])
+
+
+@pytest.mark.parametrize("n_rounds", [-1, 17, 20])
+def test_round_count_out_of_range(n_rounds):
+    with pytest.raises(ValueError):
+        des_encrypt("0000000000000000", "0000000000000000", n_rounds)
+    with pytest.raises(ValueError):
+        des_encrypt_reference("0000000000000000", "0000000000000000", n_rounds)
+    with pytest.raises(ValueError):
+        des_encrypt_bitsliced([0], 0, n_rounds)
@@ -0,0 +1,104 @@
+import pytest
+
+from des_circuit import des_structure
+from equivalence import build_miter, check_equivalence, strash
+from multi_des_cnf import build_des_instance
+from new_ExtendedCircuitgraph import Circuit, simulate_circuit
+
+
+def _adder(carry_gate='OR'):
+    cir = Circuit()
+    cir.add_gate('XOR', ['a', 'b'], 's0')
+    cir.add_gate('XOR', ['s0', 'cin'], 'sum')
+    cir.add_gate('AND', ['a', 'b'], 'c1')
+    cir.add_gate('AND', ['s0', 'cin'], 'c2')
+    cir.add_gate(carry_gate, ['c1', 'c2'], 'cout')
+    return cir
+
+
+def _maj_adder():
+    cir = Circuit()
+    cir.add_gate('XNOR', ['b', 'a'], 'n')
+    cir.add_gate('XNOR', ['n', 'cin'], 'sum')
+    cir.maj('cin', 'b', 'a', 'cout')
+    return cir
+
+
+def _des(rounds, rewrite_xor=0):
+    cir = Circuit()
+    pt = [f"pt{i}" for i in range(64)]
+    ct = [f"ct{i}" for i in range(64)]
+    key = [f"k{i}" for i in range(64)]
+    build_des_instance(cir, pt, ct, key, rounds, "")
+    if rewrite_xor:
+        # Rewrite the first XOR gates as AND/OR/NOT: same function, different structure
+        rewritten = Circuit()
+        for g in cir.gates:
+            if g.gate_type == 'XOR' and len(g.inputs) == 2 and rewrite_xor:
+                rewrite_xor -= 1
+                x, y, o = g.inputs[0], g.inputs[1], g.output
+                rewritten.add_gate('NOT', [x], o + "_nx")
+                rewritten.add_gate('NOT', [y], o + "_ny")
+                rewritten.add_gate('AND', [x, o + "_ny"], o + "_t1")
+                rewritten.add_gate('AND', [o + "_nx", y], o + "_t2")
+                rewritten.add_gate('OR', [o + "_t1", o + "_t2"], o)
+            else:
+                rewritten.add_gate(g.gate_type, list(g.inputs), g.output)
+        cir = rewritten
+    # DES outputs are the first inputs of the eq_ XNOR gates
+    outputs = {g.output[3:]: g.inputs[0] for g in cir.gates if g.output.startswith("eq_")}
+    return cir, [outputs[f"ct{i}"] for i in range(64)]
+
+
+def test_build_miter_names():
+    miter, diffs = build_miter(_adder(), _maj_adder())
+    assert [(wa, wb) for _, wa, wb in diffs] == [('sum', 'sum'), ('cout', 'cout')]
+    assert set(miter.inputs()) == {'a', 'b', 'cin'}
+    assert 'a:s0' in miter.wires and 'b:n' in miter.wires
+    with pytest.raises(ValueError):
+        build_miter(_adder(), _maj_adder(), output_map=[])
+
+
+def test_strash_merges_identical_structure():
+    cir = Circuit()
+    cir.add_gate('AND', ['x', 'y'], 'p')
+    cir.add_gate('AND', ['y', 'x'], 'q')
+    cir.add_gate('BUF', ['q'], 'r')
+    reduced, rep = strash(cir)
+    assert rep['p'] == rep['q'] == rep['r'] == 'p'
+    assert len(reduced.gates) == 1
+
+
+def test_equivalent_by_sat():
+    # XOR carry equals OR carry because c1 and c2 are never both true
+    result = check_equivalence(_adder('OR'), _adder('XOR'), n_vectors=64)
+    assert result and result.equivalent is True
+    result = check_equivalence(_adder(), _maj_adder(), n_vectors=0, sweep=False)
+    assert result and result.method == 'sat' and result.proved['sat'] == 2
+
+
+@pytest.mark.parametrize("n_vectors", [256, 0])
+def test_counterexample(n_vectors):
+    a, b = _adder('OR'), _adder('AND')
+    result = check_equivalence(a, b, n_vectors=n_vectors, seed=1)
+    assert result.equivalent is False and not result
+    assert result.method == ('simulazione' if n_vectors else 'sat')
+    assert result.differing == [('cout', 'cout')]
+    cex = result.counterexample
+    assert simulate_circuit(a, cex)['cout'] != simulate_circuit(b, cex)['cout']
+
+
+def test_des_versions_structurally_equivalent():
+    a, inputs, keys, outputs = des_structure()
+    b, b_outputs = _des(16)
+    input_map = {w: f"pt{i}" for i, w in enumerate(inputs)}
+    input_map.update({w: f"k{i}" for i, w in enumerate(keys) if f"k{i}" in b.wires})
+    result = check_equivalence(a, b, input_map, list(zip(outputs, b_outputs)))
+    assert result and result.method == 'strutturale'
+
+
+def test_rewritten_des_proved_by_sweeping():
+    a, a_outputs = _des(3)
+    b, b_outputs = _des(3, rewrite_xor=100)
+    result = check_equivalence(a, b, output_map=list(zip(a_outputs, b_outputs)), seed=0)
+    assert result and result.method == 'sweeping' and result.proved['sweeping'] == 64
@@ -0,0 +1,80 @@
+import random
+
+from des_circuit import des_structure
+from des_python import des_encrypt
+from new_ExtendedCircuitgraph import Circuit, simulate_circuit
+from parallel_sim import (ParallelSimulator, deserialize_circuit, serialize_circuit,
+                          simulate_multiple_circuits_parallel)
+
+
+def _adder():
+    cir = Circuit()
+    cir.add_gate('XOR', ['a', 'b'], 's0')
+    cir.add_gate('XOR', ['s0', 'cin'], 'sum')
+    cir.add_gate('AND', ['a', 'b'], 'c1')
+    cir.add_gate('AND', ['s0', 'cin'], 'c2')
+    cir.add_gate('OR', ['c1', 'c2'], 'cout')
+    return cir
+
+
+def _parity():
+    cir = Circuit()
+    cir.add_gate('XNOR', ['x', 'y', 'z'], 'p')
+    cir.add_gate('NOT', ['p'], 'q')
+    return cir
+
+
+def test_serialize_roundtrip():
+    cir = _adder()
+    rebuilt, outputs = deserialize_circuit(serialize_circuit(cir))
+    assert rebuilt.structural_hash() == cir.structural_hash()
+    assert outputs == cir.outputs()
+    _, outputs = deserialize_circuit(serialize_circuit(cir, ['s0', 'cout']))
+    assert outputs == ['s0', 'cout']
+
+
+def test_simulate_multiple_circuits_parallel():
+    circuits = [_adder(), _parity(), _adder()]
+    inputs = [{'a': 1, 'b': 1, 'cin': 0}, {'x': 1, 'y': 0, 'z': 0}, {'a': 0, 'b': 1, 'cin': 1}]
+    results = simulate_multiple_circuits_parallel(circuits, inputs, processes=2)
+    for cir, values, res in zip(circuits, inputs, results):
+        expected = simulate_circuit(cir, values)
+        assert res == {w: expected[w] for w in cir.outputs()}
+
+
+def test_spawn_workers_use_serialized_payload():
+    # Under spawn nothing is inherited: workers rebuild circuits from the payload
+    cir = _parity()
+    with ParallelSimulator([cir, _adder()], start_method='spawn', processes=1) as sim:
+        assert sim.start_method == 'spawn'
+        out = sim.map([(0, {'x': 0b0110, 'y': 0b0101, 'z': 0b0011}, 4)])
+    expected = [simulate_circuit(cir, {'x': (0b0110 >> j) & 1, 'y': (0b0101 >> j) & 1,
+                                       'z': (0b0011 >> j) & 1}) for j in range(4)]
+    assert out[0]['q'] == sum(e['q'] << j for j, e in enumerate(expected))
+
+
+def test_streamed_packed_batches_des():
+    circuit, input_wires, key_wires, output_wires = des_structure()
+    rng = random.Random(5)
+    key = rng.getrandbits(64)
+    width = 64
+    pts = [rng.getrandbits(64) for _ in range(3 * width)]
+
+    def batches():
+        for start in range(0, len(pts), width):
+            words = {'CONST0': 0, 'CONST1': (1 << width) - 1}
+            for i, w in enumerate(input_wires):
+                bit = 63 - i
+                words[w] = sum(((p >> bit) & 1) << j for j, p in enumerate(pts[start:start + width]))
+            for i, w in enumerate(key_wires):
+                words[w] = -((key >> (63 - i)) & 1) & ((1 << width) - 1)
+            yield 0, words, width
+
+    with ParallelSimulator([circuit], [output_wires], processes=2) as sim:
+        results = list(sim.imap(batches()))
+    cts = []
+    for out in results:
+        for j in range(width):
+            cts.append(sum(((out[w] >> j) & 1) << (63 - i) for i, w in enumerate(output_wires)))
+    for p, c in zip(pts[:20], cts[:20]):
+        assert f"{c:016X}" == des_encrypt(f"{p:016X}", f"{key:016X}")
@@ -0,0 +1,48 @@
+import pytest
+from new_ExtendedCircuitgraph import Circuit
+from portfolio import solve_portfolio, is_satisfiable_portfolio, shuffle_clauses, member_label
+
+
+def _adder():
+    cir = Circuit()
+    cir.add_mod(['a1', 'a0'], ['b1', 'b0'], ['s1', 's0'])
+    return cir
+
+
+def test_portfolio_sat_and_unsat():
+    members = ['pycosat', 'g3', ('cd19', 7)]
+    sat, model, report = is_satisfiable_portfolio(
+        _adder(), {'a1': True, 'a0': True}, {'s1': False, 's0': False}, members=members)
+    assert sat is True
+    assert isinstance(model, list)
+    assert report['winner'] in {'pycosat', 'g3', 'cd19#7'}
+    assert set(report['times']) == {'pycosat', 'g3', 'cd19#7'}
+
+    sat, model, report = is_satisfiable_portfolio(
+        _adder(), {'a1': False, 'a0': False, 'b1': False, 'b0': False}, {'s0': True}, members=members)
+    assert sat is False and model is None
+    assert report['status'][report['winner']] == 'unsat'
+
+
+def test_portfolio_skips_broken_backend():
+    sat, _, report = solve_portfolio([[1, 2], [-1]], members=['no-such-solver', 'g3'])
+    assert sat is True
+    assert report['winner'] == 'g3'
+
+
+def test_portfolio_all_broken():
+    with pytest.raises(RuntimeError):
+        solve_portfolio([[1]], members=['no-such-solver'])
+
+
+def test_portfolio_rejects_duplicate_members():
+    # Duplicate labels are rejected before any process is started
+    with pytest.raises(ValueError):
+        solve_portfolio([[1]], members=['g3', ('cd19', 1), 'g3'])
+
+
+def test_shuffle_clauses_is_permutation():
+    clauses = [[1, 2, 3], [-1, 4], [2]]
+    shuffled = shuffle_clauses(clauses, seed=3)
+    assert sorted(sorted(c) for c in shuffled) == sorted(sorted(c) for c in clauses)
+    assert member_label(('g4', 3)) == 'g4#3'
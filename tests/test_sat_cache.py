@@ -0,0 +1,72 @@
+from archive.ExtendedCircuitgraph_0 import create_simple_circuit
+from new_ExtendedCircuitgraph import Circuit
+from partial_sat_solver import solve_partial
+from sat_cache import SatCache, formula_fingerprint
+from solver import is_satisfiable
+
+
+def _and_circuit():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    return cir
+
+
+def test_fingerprint_is_canonical():
+    base = formula_fingerprint([[1, -2], [2, 3]])
+    assert formula_fingerprint([[3, 2], [-2, 1], [1, -2]]) == base
+    assert formula_fingerprint([[1, -2], [2, 3]], backend='g3') != base
+    assert formula_fingerprint([[1, -2], [2, 3]], assumptions=[1]) != base
+    assert formula_fingerprint([[1, -2], [2, -3]]) != base
+
+
+def test_cache_roundtrip_and_counters(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    with SatCache(path) as cache:
+        assert cache.get('k') is None
+        cache.put('k', True, [1, -2, 3])
+        cache.put('u', False, None)
+        cache.put('x', None, None)  # UNKNOWN is never stored
+        assert cache.get('k') == (True, [1, -2, 3])
+        assert cache.get('u') == (False, None)
+        assert cache.get('x') is None
+        assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 2
+        assert len(cache) == 2
+    # Results persist across instances
+    with SatCache(path) as cache:
+        assert cache.get('k') == (True, [1, -2, 3])
+
+
+def test_eviction_drops_least_recently_used():
+    # Each entry takes 49 bytes: three of them fit
+    cache = SatCache(max_bytes=150)
+    for i in range(3):
+        cache.put(f"key{i}", True, list(range(1, 20)))
+    cache.get('key0')
+    cache.put('key3', True, list(range(1, 20)))
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['bytes'] <= 150
+    assert cache.get('key0') is not None
+    assert cache.get('key3') is not None
+    assert cache.get('key1') is None
+
+
+def test_is_satisfiable_uses_cache():
+    cache = SatCache()
+    cir = _and_circuit()
+    first = is_satisfiable(cir, fixed_outputs={'d': True}, cache=cache)
+    sat, model, stats = is_satisfiable(cir, fixed_outputs={'d': True}, cache=cache, return_stats=True)
+    assert (sat, model) == first
+    assert stats.tags == {'cache': 'hit'}
+    # A different backend is a different cache entry
+    is_satisfiable(cir, fixed_outputs={'d': True}, cache=cache, backend='g3')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+
+def test_solve_partial_uses_cache():
+    cache = SatCache()
+    adder = create_simple_circuit()
+    fin, fout = {'a': True, 'cin': False}, {'sum': True, 'carry': False}
+    first = solve_partial(adder, fin, fout, cache=cache)
+    assert solve_partial(adder, fin, fout, cache=cache) == first
+    assert cache.hits == 1 and cache.misses == 1
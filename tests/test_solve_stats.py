@@ -0,0 +1,56 @@
+import io
+
+from new_ExtendedCircuitgraph import Circuit
+from solve_stats import SolveStats, formula_size, read_jsonl, write_jsonl
+from solver import SolverSession, is_satisfiable
+
+
+def _and_circuit():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    return cir
+
+
+def test_is_satisfiable_returns_stats():
+    sat, model, stats = is_satisfiable(_and_circuit(), fixed_outputs={'d': True}, return_stats=True)
+    assert sat is True and model
+    assert stats.backend == 'pycosat'
+    assert stats.result == 'SAT'
+    assert stats.num_vars == 3
+    # 3 AND clauses + 1 unit clause for the fixed output
+    assert stats.num_clauses == 4
+    assert stats.num_literals == 3 + 2 + 2 + 1
+    assert stats.encode_time >= 0 and stats.solve_time >= 0
+    # Without the flag the return value is unchanged
+    assert len(is_satisfiable(_and_circuit())) == 2
+
+
+def test_session_stats_are_per_call():
+    with SolverSession(_and_circuit(), backend='g3') as session:
+        _, _, first = session.solve({'a': False}, {'d': True}, return_stats=True)
+        assert first.result == 'UNSAT'
+        assert first.backend == 'g3'
+        assert set(first.solver_stats) >= {'conflicts', 'decisions', 'propagations', 'restarts'}
+        _, _, second = session.solve(fixed_outputs={'d': True}, return_stats=True)
+        assert second.result == 'SAT'
+        assert second.encode_time == first.encode_time
+        assert all(v >= 0 for v in second.solver_stats.values())
+        session.add_constraint({'a': True})
+        _, _, third = session.solve(return_stats=True)
+        assert third.num_clauses == first.num_clauses + 1
+
+
+def test_jsonl_roundtrip(tmp_path):
+    records = [
+        SolveStats('g3', 'SAT', 3, 4, 8, 0.1, 0.2, {'conflicts': 5}, {'rounds': 2}),
+        SolveStats('pycosat', 'UNKNOWN', 10, 20, 50, 0.3, 1.5),
+    ]
+    path = str(tmp_path / 'stats.jsonl')
+    assert write_jsonl(records[:1], path) == 1
+    assert write_jsonl(records[1:], path) == 1
+    loaded = read_jsonl(path)
+    assert [r.to_dict() for r in loaded] == [r.to_dict() for r in records]
+    buf = io.StringIO()
+    write_jsonl(records, buf)
+    assert len(buf.getvalue().splitlines()) == 2
+    assert formula_size([[1, 2], [-1]]) == {'num_clauses': 2, 'num_literals': 3}
@@ -1,7 +1,16 @@
 import pytest
-from solver import is_satisfiable, set_solver
+from solver import (is_satisfiable, set_solver, SolverSession, interrupt_on_signal, UNKNOWN,
+                    enumerate_models, DecisionHints)
+from new_circuit_to_cnf import index_wires
+import signal
+import threading
+import time
 import pycosat
 from new_ExtendedCircuitgraph import Circuit
+from des_python import des_encrypt_block
+from multi_des import build_multi_des, random_des_pairs, wires_to_block
+from decoding import ModelDecoder
+from validation import validate_model
 
 import os, sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -60,5 +69,180 @@ def test_xor_circuit():
     # Check z is positive
     assert any(lit > 0 for lit in model if abs(lit) == model.index(lit)+1)
 
+def test_session_multiple_queries():
+    # Full adder queried several times on the same loaded solver
+    cir = Circuit()
+    cir.add_mod(['a1', 'a0'], ['b1', 'b0'], ['s1', 's0'])
+    with SolverSession(cir) as session:
+        sat, model = session.solve({'a1': False, 'a0': True, 'b1': False, 'b0': True})
+        assert sat is True
+        assert session.value(model, 's1') is True
+        assert session.value(model, 's0') is False
+        # Contradicting output: UNSAT, then the session is still usable
+        sat, model = session.solve({'a1': False, 'a0': True, 'b1': False, 'b0': True},
+                                   {'s0': True})
+        assert sat is False and model is None
+        sat, model = session.solve(fixed_outputs={'s1': True, 's0': True}, fixed_inputs={'a1': True})
+        assert sat is True
+        assert session.value(model, 's1') and session.value(model, 's0')
+
+
+def test_session_add_constraint_and_unknown_wire():
+    cir = Circuit()
+    cir.add_gate('XOR', ['a', 'b'], 'z')
+    session = SolverSession(cir, backend='cd19')
+    session.add_constraint({'a': True})
+    assert session.solve(fixed_outputs={'z': True}, fixed_inputs={'b': True})[0] is False
+    assert session.solve(fixed_outputs={'z': True})[0] is True
+    with pytest.raises(KeyError):
+        session.solve({'missing': True})
+    session.close()
+
+
+
+def _hard_instance():
+    # 5-round DES key recovery: takes minutes, so every limit below is hit
+    pairs = random_des_pairs(0x0123456789ABCDEF, 2, 5, seed=0)
+    return build_multi_des(pairs, 5)
+
+
+def test_is_satisfiable_budgets_and_timeout():
+    circ, fi, fo = _hard_instance()
+    assert is_satisfiable(circ, fi, fo, propagation_budget=1000) == (UNKNOWN, None)
+    start = time.perf_counter()
+    assert is_satisfiable(circ, fi, fo, timeout=0.3) == (UNKNOWN, None)
+    assert time.perf_counter() - start < 5
+    with pytest.raises(ValueError):
+        is_satisfiable(circ, fi, fo, conflict_budget=10)
+    # Limits large enough for an easy instance leave the answer unchanged
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    assert is_satisfiable(cir, fixed_outputs={'d': True}, timeout=30)[0] is True
+    assert is_satisfiable(cir, {'a': False}, {'d': True}, propagation_budget=10**6)[0] is False
+
+
+def test_is_satisfiable_cancel_event():
+    circ, fi, fo = _hard_instance()
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    start = time.perf_counter()
+    assert is_satisfiable(circ, fi, fo, cancel=cancel)[0] is UNKNOWN
+    assert time.perf_counter() - start < 5
+
+
+def test_session_budgets_timeout_and_interrupt():
+    circ, fi, fo = _hard_instance()
+    with SolverSession(circ) as session:
+        assert session.solve(fi, fo, conflict_budget=100) == (UNKNOWN, None)
+        assert session.solve(fi, fo, propagation_budget=1000) == (UNKNOWN, None)
+        assert session.solve(fi, fo, timeout=0.3) == (UNKNOWN, None)
+        threading.Timer(0.3, session.interrupt).start()
+        start = time.perf_counter()
+        assert session.solve(fi, fo, timeout=30)[0] is UNKNOWN
+        assert time.perf_counter() - start < 5
+        # interrupt() from another thread also stops a call with no limits
+        threading.Timer(0.3, session.interrupt).start()
+        start = time.perf_counter()
+        assert session.solve(fi, fo)[0] is UNKNOWN
+        assert time.perf_counter() - start < 5
+        # Budgets are per call: the session is still usable afterwards
+        fixed = dict(fi, **{w: False for w in session.var_map if w[0] == "k" and w[1:].isdigit()})
+        assert session.solve(fixed, fo)[0] is False
+
+
+def test_interrupt_on_signal():
+    circ, fi, fo = _hard_instance()
+    with SolverSession(circ) as session, interrupt_on_signal(session, signal.SIGUSR1):
+        threading.Timer(0.3, os.kill, (os.getpid(), signal.SIGUSR1)).start()
+        start = time.perf_counter()
+        assert session.solve(fi, fo)[0] is UNKNOWN
+        assert time.perf_counter() - start < 5
+
+
+
+def test_iter_models_projection_and_limit():
+    cir = Circuit()
+    cir.add_gate('OR', ['a', 'b'], 'z')
+    cir.add_gate('AND', ['z', 'c'], 'y')
+    with SolverSession(cir) as session:
+        models = list(session.iter_models(['a', 'b'], fixed_outputs={'z': True}))
+        assert len(models) == 3
+        assert {(m['a'], m['b']) for m in models} == {(True, False), (False, True), (True, True)}
+        # Projection: c is free but does not multiply the solutions
+        assert len(list(session.iter_models(['a'], fixed_outputs={'z': True}))) == 2
+        assert len(list(session.iter_models(['a', 'b', 'c'], max_count=4))) == 4
+        # Blocking clauses are dropped afterwards: the session is still usable
+        assert session.solve({'a': True, 'b': False}, {'z': True})[0] is True
+        with pytest.raises(KeyError):
+            list(session.iter_models(['missing']))
+
+
+def test_enumerate_des_keys():
+    key = 0x133457799BBCDFF1
+    pairs = random_des_pairs(key, 1, 1, seed=0)
+    circ, fi, fo = build_multi_des(pairs, 1)
+    key_wires = [f"k{i}" for i in range(64) if i % 8 != 7]
+    gen = enumerate_models(circ, key_wires, fi, fo, max_count=20)
+    keys = [wires_to_block(k, 'k') for k in gen]
+    assert len(keys) == len(set(keys)) == 20
+    pt = wires_to_block(pairs[0][0], 'pt')
+    ct = wires_to_block(pairs[0][1], 'ct')
+    for k in keys:
+        assert des_encrypt_block(pt, k, n_rounds=1) == ct
+
+
+
+def test_priority_numbering():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'd')
+    cir.add_gate('OR', ['d', 'c'], 'z')
+    idx = index_wires(cir, priority=['c', 'b'])
+    assert idx['c'] == 1 and idx['b'] == 2
+    assert sorted(idx.values()) == list(range(1, 6))
+    assert index_wires(cir, 'topo', priority=['z'])['z'] == 1
+    with pytest.raises(KeyError):
+        index_wires(cir, priority=['missing'])
+
+
+def test_decision_hints():
+    cir = Circuit()
+    cir.add_gate('OR', ['a', 'b'], 'z')
+    hints = DecisionHints(priority=['b', 'a'], phases={'a': False, 'b': True})
+    for backend in ('g3', 'pycosat'):
+        sat, model = is_satisfiable(cir, fixed_outputs={'z': True}, hints=hints, backend=backend)
+        assert sat is True
+    with SolverSession(cir, hints=hints) as session:
+        sat, model = session.solve(fixed_outputs={'z': True})
+        # Phases only steer the search: the first model follows them
+        assert (session.value(model, 'a'), session.value(model, 'b')) == (False, True)
+        session.set_phases({'a': True, 'b': False})
+        sat, model = session.solve(fixed_outputs={'z': True})
+        assert sat is True
+        assert session.solve({'a': False, 'b': False}, {'z': True})[0] is False
+        with pytest.raises(KeyError):
+            session.set_phases({'missing': True})
+
+
+def test_hinted_model_uses_default_numbering():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 't')
+    cir.add_gate('NOT', ['t'], 'z')
+    hints = DecisionHints(priority=['z', 't'])
+    fixed = {'a': True, 'b': False}
+    for backend in ('g3', 'pycosat'):
+        sat, model = is_satisfiable(cir, fixed_inputs=fixed, hints=hints, backend=backend)
+        assert sat is True
+        var_map = index_wires(cir)
+        assert ModelDecoder(var_map).values(model, ['a', 'b', 't', 'z']) == \
+            {'a': True, 'b': False, 't': False, 'z': True}
+        assert validate_model(cir, model, fixed, {'z': True, 't': False})
+    # A registered wire that appears in no clause is missing from the raw model
+    cir.wires['spare'] = {}
+    for priority in (['z'], ['spare', 'z']):
+        sat, model = is_satisfiable(cir, fixed_inputs=fixed, hints=DecisionHints(priority=priority))
+        assert sat is True and len(model) == len(cir.wires)
+        assert ModelDecoder(index_wires(cir)).values(model, ['z', 'spare']) == {'z': True, 'spare': False}
+
+
 if __name__ == '__main__':
     pytest.main()
@@ -0,0 +1,46 @@
+import itertools
+from new_ExtendedCircuitgraph import Circuit, simulate_circuit
+from sweeping import CONST, sat_sweep, sweep_equivalences
+
+
+def _redundant_circuit():
+    cir = Circuit()
+    cir.add_gate('AND', ['a', 'b'], 'x1')
+    cir.add_gate('NAND', ['a', 'b'], 'x2')        # complement of x1
+    cir.add_gate('NOT', ['x2'], 'x3')             # equivalent to x1
+    cir.add_gate('OR', ['x3', 'c'], 'y1')
+    cir.add_gate('OR', ['x1', 'c'], 'y2')         # equivalent to y1
+    cir.add_gate('XOR', ['a', 'a'], 'zero')       # constant 0
+    cir.add_gate('OR', ['zero', 'b'], 'y3')       # equivalent to input b
+    cir.add_gate('AND', ['y1', 'y2', 'y3'], 'out')
+    return cir
+
+
+def test_sweep_equivalences():
+    eq = sweep_equivalences(_redundant_circuit(), seed=1)
+    assert eq['x2'] == ('x1', True)
+    assert eq['x3'] == ('x1', False)
+    assert eq['y2'] == ('y1', False)
+    assert eq['zero'] == (CONST, False)
+    assert eq['y3'] == ('b', False)
+
+
+def test_sat_sweep_preserves_function():
+    cir = _redundant_circuit()
+    swept = sat_sweep(cir, seed=1)
+    assert len(swept.gates) < len(cir.gates)
+    assert swept.outputs() == ['out']
+    for bits in itertools.product([False, True], repeat=3):
+        inputs = dict(zip('abc', bits))
+        assert simulate_circuit(swept, inputs)['out'] == simulate_circuit(cir, inputs)['out']
+
+
+def test_sat_sweep_fixed_inputs_keep_wires():
+    cir = _redundant_circuit()
+    # With a=0 everything feeding from x1 is constant: only c and b matter
+    swept = sat_sweep(cir, fixed_inputs={'a': False}, keep=['out', 'a'], seed=1)
+    assert 'a' in swept.wires
+    assert len(swept.gates) <= 3
+    for b, c in itertools.product([False, True], repeat=2):
+        inputs = {'a': False, 'b': b, 'c': c}
+        assert simulate_circuit(swept, inputs)['out'] == simulate_circuit(cir, inputs)['out']
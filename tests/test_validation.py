@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from des_circuit import des_structure
+from des_python import des_encrypt_block
+from multi_des import build_multi_des, random_des_pairs
+from new_ExtendedCircuitgraph import Circuit
+from new_circuit_to_cnf import index_wires
+from solver import is_satisfiable
+from validation import (ModelValidator, model_inputs, validate_assignment, validate_model,
+                        validate_pairs)
+
+
+def _adder():
+    cir = Circuit()
+    cir.add_gate('XOR', ['a', 'b'], 's0')
+    cir.add_gate('XOR', ['s0', 'cin'], 'sum')
+    cir.add_gate('AND', ['a', 'b'], 'c1')
+    cir.add_gate('AND', ['s0', 'cin'], 'c2')
+    cir.add_gate('OR', ['c1', 'c2'], 'cout')
+    return cir
+
+
+def test_validate_model_from_solver():
+    cir = _adder()
+    fixed_in, fixed_out = {'a': True}, {'sum': False, 'cout': True}
+    sat, model = is_satisfiable(cir, fixed_in, fixed_out)
+    assert sat
+    report = validate_model(cir, model, fixed_in, fixed_out)
+    assert report and report.checked == 3
+
+
+def test_validate_reports_wire_names():
+    cir = _adder()
+    report = validate_assignment(cir, {'a': 1, 'b': 0, 'cin': 0}, {'a': True, 'sum': False, 'cout': False})
+    assert not report
+    assert report.mismatches == [(0, 'sum', False, True)]
+    assert 'sum' in repr(report)
+    with pytest.raises(KeyError):
+        validate_assignment(cir, {'a': 1, 'b': 0}, {'sum': True})
+
+
+def test_corrupted_model_is_caught():
+    key = 0x0123456789ABCDEF
+    circ, fixed_in, fixed_out = build_multi_des(random_des_pairs(key, 2, 2, seed=1), 2)
+    sat, model = is_satisfiable(circ, fixed_in, fixed_out)
+    assert sat and validate_model(circ, model, fixed_in, fixed_out)
+    # Flip one plaintext bit in the model: the encoding no longer matches the circuit
+    inputs = model_inputs(circ, model)
+    inputs['inst0_pt5'] = not inputs['inst0_pt5']
+    report = validate_assignment(circ, inputs, {**fixed_in, **fixed_out})
+    assert (0, 'inst0_pt5', fixed_in['inst0_pt5'], not fixed_in['inst0_pt5']) in report.mismatches
+
+
+def test_validate_key_on_many_pairs():
+    circuit, input_wires, key_wires, output_wires = des_structure()
+    rng = random.Random(2)
+    key = rng.getrandbits(64)
+
+    def bits(value, wires):
+        return {w: bool((value >> (63 - i)) & 1) for i, w in enumerate(wires)}
+
+    pairs = []
+    for _ in range(100):
+        pt = rng.getrandbits(64)
+        pairs.append(({**bits(pt, input_wires), 'CONST0': False, 'CONST1': True},
+                      bits(des_encrypt_block(pt, key), output_wires)))
+    report = validate_pairs(circuit, bits(key, key_wires), pairs)
+    assert report and report.checked == 100 * 64
+    wrong = validate_pairs(circuit, bits(key ^ (1 << 62), key_wires), pairs)
+    assert not wrong and {p for p, *_ in wrong.mismatches} == set(range(100))
+
+
+def test_model_validator_reuse():
+    cir = _adder()
+    validator = ModelValidator(cir, {'a': True}, {'sum': True})
+    sat, model = is_satisfiable(cir, {'a': True}, {'sum': True})
+    assert sat and validator.check(model)
+    # Flip input b in the model: sum changes, the constraint on it is reported
+    b = index_wires(cir)['b']
+    flipped = [-lit if abs(lit) == b else lit for lit in model]
+    report = validator.check(flipped)
+    assert [m[1] for m in report.mismatches] == ['sum']
@@ -0,0 +1,193 @@
+# validation.py
+"""
+Validazione dei modelli SAT per simulazione.
+
+Dopo una risposta SAT si prende l'assegnamento degli ingressi primari dal
+modello (es. la chiave recuperata), si simula il circuito con la funzione
+generata da Circuit.compile e si confrontano i valori simulati con i vincoli
+imposti. Un vincolo violato indica un errore nella codifica CNF (o nel
+solver): il modello soddisfa la formula ma non il circuito.
+
+Più coppie (es. più plaintext/ciphertext con la stessa chiave) si validano
+insieme: ogni coppia occupa un bit delle parole della simulazione.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from decoding import ModelDecoder
+from new_ExtendedCircuitgraph import Circuit
+from new_circuit_to_cnf import index_wires
+
+# (indice della coppia, wire, valore atteso, valore simulato)
+Mismatch = Tuple[int, str, bool, bool]
+
+
+class ValidationReport:
+    """
+    Esito di una validazione; vale True se non ci sono discrepanze.
+    Attributes:
+        mismatches: lista di (coppia, wire, atteso, simulato)
+        checked: numero di vincoli controllati
+    """
+    def __init__(self, mismatches: List[Mismatch], checked: int):
+        self.mismatches = mismatches
+        self.checked = checked
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def __repr__(self) -> str:
+        if self.ok:
+            return f"ValidationReport(ok, checked={self.checked})"
+        shown = ", ".join(f"#{p} {w}: atteso {int(e)}, simulato {int(a)}"
+                          for p, w, e, a in self.mismatches[:5])
+        more = f", ... (+{len(self.mismatches) - 5})" if len(self.mismatches) > 5 else ""
+        return f"ValidationReport({len(self.mismatches)} discrepanze su {self.checked}: {shown}{more})"
+
+
+def validate_pairs(
+    circuit: Circuit,
+    shared_inputs: Dict[str, bool],
+    pairs: Sequence[Tuple[Dict[str, bool], Dict[str, bool]]]
+) -> ValidationReport:
+    """
+    Simula il circuito su tutte le coppie in un solo passaggio bit-parallelo.
+
+    Args:
+        circuit: istanza di Circuit
+        shared_inputs: ingressi comuni a tutte le coppie (es. la chiave)
+        pairs: lista di (ingressi della coppia, valori attesi); i valori
+            attesi possono riguardare sia wire pilotate sia ingressi
+    Returns:
+        ValidationReport con le discrepanze per coppia e wire
+    """
+    width = len(pairs)
+    mask = (1 << width) - 1
+    inputs = circuit.inputs()
+    input_set = set(inputs)
+    words: Dict[str, int] = {}
+    for w in inputs:
+        if w in shared_inputs:
+            words[w] = mask if shared_inputs[w] else 0
+            continue
+        word = 0
+        for j, (pair_in, _) in enumerate(pairs):
+            if w not in pair_in:
+                raise KeyError(f"Valore mancante per l'ingresso {w} (coppia {j})")
+            if pair_in[w]:
+                word |= 1 << j
+        words[w] = word
+    checked = list(dict.fromkeys(w for _, expected in pairs for w in expected))
+    for w in checked:
+        if w not in circuit.wires:
+            raise KeyError(f"Wire {w} non trovato nel circuito")
+    values = dict(circuit.compile([w for w in checked if w not in input_set])(words, width))
+    values.update((w, words[w]) for w in checked if w in input_set)
+    mismatches: List[Mismatch] = []
+    count = 0
+    for j, (_, expected) in enumerate(pairs):
+        for w, exp in expected.items():
+            count += 1
+            got = bool((values[w] >> j) & 1)
+            if got != bool(exp):
+                mismatches.append((j, w, bool(exp), got))
+    return ValidationReport(mismatches, count)
+
+
+def validate_assignment(
+    circuit: Circuit,
+    inputs: Dict[str, bool],
+    expected: Dict[str, bool]
+) -> ValidationReport:
+    """Validazione di un singolo assegnamento completo degli ingressi."""
+    return validate_pairs(circuit, inputs, [({}, expected)])
+
+
+def model_inputs(
+    circuit: Circuit,
+    model: List[int],
+    var_map: Optional[Dict[str, int]] = None
+) -> Dict[str, bool]:
+    """
+    Assegnamento degli ingressi primari contenuto nel modello.
+
+    Args:
+        circuit: istanza di Circuit
+        model: modello SAT (letterali positivi = vero)
+        var_map: mappa wire -> variabile usata nella codifica
+            (default: index_wires(circuit), la numerazione di is_satisfiable)
+    """
+    if var_map is None:
+        var_map = index_wires(circuit)
+    return ModelDecoder(var_map).values(model, circuit.inputs())
+
+
+class ModelValidator:
+    """
+    Validatore riusabile per molti modelli della stessa istanza (es. tutte
+    le chiavi enumerate): numerazione, ingressi e funzione compilata vengono
+    preparati una volta, e ogni check costa una simulazione.
+
+    Esempio:
+        validator = ModelValidator(circ, fixed_in, fixed_out)
+        for model in models:
+            assert validator.check(model)
+    """
+    def __init__(
+        self,
+        circuit: Circuit,
+        fixed_inputs: Optional[Dict[str, bool]] = None,
+        fixed_outputs: Optional[Dict[str, bool]] = None,
+        var_map: Optional[Dict[str, int]] = None
+    ):
+        if var_map is None:
+            var_map = index_wires(circuit)
+        self.expected = {**(fixed_inputs or {}), **(fixed_outputs or {})}
+        for w in self.expected:
+            if w not in circuit.wires:
+                raise KeyError(f"Wire {w} non trovato nel circuito")
+        self._inputs = circuit.inputs()
+        self._decoder = ModelDecoder(var_map)
+        input_set = set(self._inputs)
+        self._simulate = circuit.compile([w for w in self.expected if w not in input_set])
+
+    def check(self, model: List[int]) -> ValidationReport:
+        """
+        Simula il circuito con gli ingressi del modello e confronta tutti i
+        vincoli (coppia sempre 0 nelle discrepanze).
+        """
+        words = dict(zip(self._inputs, self._decoder.wires(model, self._inputs).astype(int).tolist()))
+        values = self._simulate(words)
+        mismatches: List[Mismatch] = []
+        for w, exp in self.expected.items():
+            got = bool(values[w] if w in values else words[w])
+            if got != bool(exp):
+                mismatches.append((0, w, bool(exp), got))
+        return ValidationReport(mismatches, len(self.expected))
+
+
+def validate_model(
+    circuit: Circuit,
+    model: List[int],
+    fixed_inputs: Optional[Dict[str, bool]] = None,
+    fixed_outputs: Optional[Dict[str, bool]] = None,
+    var_map: Optional[Dict[str, int]] = None
+) -> ValidationReport:
+    """
+    Verifica un modello ritornato da is_satisfiable: gli ingressi vengono
+    presi dal modello, il circuito viene simulato e tutti i vincoli
+    (fixed_inputs e fixed_outputs) vengono confrontati con la simulazione.
+    Per molti modelli della stessa istanza conviene ModelValidator.
+
+    Args:
+        circuit: istanza di Circuit
+        model: modello SAT
+        fixed_inputs, fixed_outputs: i vincoli passati al solver
+        var_map: numerazione delle variabili (default: index_wires(circuit))
+    Returns:
+        ValidationReport (coppia sempre 0)
+    """
+    return ModelValidator(circuit, fixed_inputs, fixed_outputs, var_map).check(model)